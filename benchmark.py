@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Các phép đo hiệu năng nhỏ (microbenchmark) cho những đoạn mã nóng của dự án.
+
+Cách chạy:
+    python benchmark.py check_win -n 19 -k 5
+    python benchmark.py select
+"""
+import random
+import argparse
+import math
+import timeit
+from typing import List, Tuple
+
+import numpy as np
+
+from lib.game import game_provider
+from lib.game.mnk import mnk_helpers as helpers
+from lib.game.mnk.mnk import MNKGame
+
+
+def random_positions(n: int, k: int, count: int, seed: int = 0) -> List[Tuple[List[List[int]], int, int]]:
+    """
+    Tạo các thế cờ giữa ván bằng cách chơi ngẫu nhiên (chưa ai thắng trước nước cuối)
+
+    Đối số:
+        n (int): Số ô vuông cho mỗi bên của bàn cờ
+        k (int): Số lượng quân cờ liên tiếp để thắng
+        count (int): Số thế cờ cần tạo
+        seed (int, tùy chọn): Hạt giống ngẫu nhiên. Mặc định là 0.
+
+    Trả về:
+        List: Danh sách (ma trận, nước đi cuối, người chơi của nước đi cuối)
+    """
+    rng = random.Random(seed)
+    positions: List[Tuple[List[List[int]], int, int]] = []
+    while len(positions) < count:
+        board = [[2] * n for _ in range(n)]
+        moves = list(range(n * n))
+        rng.shuffle(moves)
+        n_moves = rng.randrange(1, n * n // 2)
+        for turn, move in enumerate(moves[:n_moves]):
+            row, col = divmod(move, n)
+            board[row][col] = turn % 2
+            if helpers.check_win(board, (row, col), k, turn % 2):
+                break
+        positions.append((board, move, turn % 2))
+    return positions
+
+
+def bench_check_win(args) -> None:
+    n, k = args.n, args.k
+    positions = random_positions(n, k, args.positions)
+    table = helpers.build_line_table(n, k)
+    flat = [(''.join(str(c) for row in board for c in row), move, str(token))
+            for board, move, token in positions]
+    # thế cờ ngay trước nước cuối ở dạng MCTS, để đo cả MNKGame.move
+    game = MNKGame(n, k)
+    before = []
+    for board, move, token in positions:
+        prev = [row[:] for row in board]
+        prev[move // n][move % n] = game.empty
+        before.append((game.encode_game_state(prev), move, token))
+
+    def full_lines():
+        for board, move, token in positions:
+            helpers.check_win(board, divmod(move, n), k, token)
+
+    def windowed():
+        for cells, move, token in flat:
+            helpers.check_win_lines(cells, table[move], k, token)
+
+    def legacy_move():
+        # move() trước khi tối ưu: giải mã ma trận, kiểm tra đầy đủ rồi mã hóa lại
+        for state, move, token in before:
+            board = game.convert_mcts_state_to_list_state(state)
+            board[move // n][move % n] = token
+            helpers.check_win(board, divmod(move, n), k, token)
+            game.encode_game_state(board)
+
+    def incremental_move():
+        for state, move, token in before:
+            game.move(state, move, token)
+
+    for (board, move, token), (cells, _, token_str), (state, _, _) in zip(positions, flat, before):
+        won = helpers.check_win(board, divmod(move, n), k, token)
+        assert won == helpers.check_win_lines(cells, table[move], k, token_str)
+        assert game.move(state, move, token) == (game.encode_game_state(board), won)
+
+    calls = args.repeat * len(positions)
+    t_full = timeit.timeit(full_lines, number=args.repeat) / calls * 1e6
+    t_window = timeit.timeit(windowed, number=args.repeat) / calls * 1e6
+    t_legacy = timeit.timeit(legacy_move, number=args.repeat) / calls * 1e6
+    t_move = timeit.timeit(incremental_move, number=args.repeat) / calls * 1e6
+    print("check_win %dx%d, k=%d" % (n, n, k))
+    print("  hàng/cột/chéo đầy đủ: %8.2f us/lần" % t_full)
+    print("  cửa sổ tính trước:    %8.2f us/lần" % t_window)
+    print("  tăng tốc:             %8.2fx" % (t_full / t_window))
+    print("MNKGame.move %dx%d, k=%d" % (n, n, k))
+    print("  giải mã ma trận:      %8.2f us/lần" % t_legacy)
+    print("  cập nhật một chữ số:  %8.2f us/lần" % t_move)
+    print("  tăng tốc:             %8.2fx" % (t_legacy / t_move))
+
+
+def legacy_select(game, state_int: int, stats: Tuple[List, List, List], c_puct: float) -> int:
+    """
+    Bước chọn hành động như trước khi vector hóa: danh sách Python, tính lại
+    tổng số lần truy cập và mặt nạ hợp lệ ở mỗi bước, dùng làm mốc so sánh
+    """
+    counts, values_avg, probs = stats
+    total_sqrt = math.sqrt(sum(counts))
+    scores = np.array([value + c_puct * prob * total_sqrt / (1 + count)
+                       for value, prob, count in zip(values_avg, probs, counts)])
+    scores[~game.legal_moves_mask(state_int)] = -np.inf
+    return int(np.argmax(scores))
+
+
+def bench_select(args) -> None:
+    # lib.mcts kéo theo torch, chỉ nhập khi cần
+    from lib.mcts import make_mcts
+
+    rng = np.random.RandomState(0)
+    print("Chọn hành động PUCT (us/lần)")
+    print("  %-12s %10s %10s %10s %8s" % ("trò chơi", "cũ", "dict", "array", "tăng tốc"))
+    for game_id in sorted(game_provider.GAMES):
+        name, class_path, n, k = game_provider.GAMES[game_id]
+        game = game_provider.load_class(class_path)(n, k)
+        # một thế cờ giữa ván: khoảng một phần tư bàn cờ đã có quân
+        state, player = game.initial_state, 1
+        for move in rng.permutation(game.action_space)[:game.action_space // 4]:
+            state, _ = game.move(state, int(move), player)
+            player = 1 - player
+        timings = []
+        for store in ("dict", "array"):
+            tree = make_mcts(game, store)
+            tree._create_node(state, rng.dirichlet([1.0] * game.action_space))
+            legal_moves = game.possible_moves(state)
+            for _ in range(args.visits):
+                tree._backup(rng.uniform(-1, 1), [state], [int(rng.choice(legal_moves))])
+            stats = tuple(np.asarray(x).tolist() for x in tree._node_stats(state))
+            assert legacy_select(game, state, stats, tree.c_puct) == tree._select_action(state, False)
+            if store == "dict":
+                timings.append(timeit.timeit(lambda: legacy_select(game, state, stats, tree.c_puct),
+                                             number=args.repeat))
+            timings.append(timeit.timeit(lambda: tree._select_action(state, False),
+                                         number=args.repeat))
+        t_legacy, t_dict, t_array = (t / args.repeat * 1e6 for t in timings)
+        print("  %-12s %10.2f %10.2f %10.2f %7.2fx" %
+              (name, t_legacy, t_dict, t_array, t_legacy / min(t_dict, t_array)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(dest="bench", required=True)
+
+    parser_win = subparsers.add_parser("check_win", help="So sánh check_win đầy đủ với check_win_lines và MNKGame.move")
+    parser_win.add_argument("-n", type=int, default=19, help="Kích thước bàn cờ")
+    parser_win.add_argument("-k", type=int, default=5, help="Số quân liên tiếp để thắng")
+    parser_win.add_argument("--positions", type=int, default=500, help="Số thế cờ ngẫu nhiên")
+    parser_win.add_argument("--repeat", type=int, default=20, help="Số lần lặp lại phép đo")
+    parser_win.set_defaults(func=bench_check_win)
+
+    parser_select = subparsers.add_parser(
+        "select", help="So sánh bước chọn PUCT cũ với bản vector hóa cho mọi kích thước bàn cờ")
+    parser_select.add_argument("--visits", type=int, default=200, help="Số lượt truy cập giả lập mỗi nút")
+    parser_select.add_argument("--repeat", type=int, default=2000, help="Số lần lặp lại phép đo")
+    parser_select.set_defaults(func=bench_select)
+
+    args = parser.parse_args()
+    args.func(args)
@@ -2,6 +2,14 @@
 PLAY_EPISODES = 5              # Giảm mạnh để tạo dữ liệu nhanh
 MCTS_SEARCHES = 50             # AI "suy nghĩ" ít hơn cho mỗi nước đi
 MCTS_BATCH_SIZE = 64
+PLAY_PARALLEL_GAMES = 1         # Số ván tự chơi song song theo nhịp, lá của mọi ván gộp vào một lô mạng
+SELF_PLAY_WORKERS = 0           # Số tiến trình tự chơi (lib/actors.py), 0 - tự chơi trong tiến trình huấn luyện
+SELF_PLAY_WORKER_THREADS = 1    # Số luồng torch của mỗi tiến trình tự chơi
+SELF_PLAY_INFERENCE_SERVER = False  # Các tiến trình tự chơi gửi lá tới một máy chủ suy luận chung thay vì giữ mạng riêng
+PLAYOUT_FULL_FRACTION = 1.0     # Tỷ lệ nước đi tự chơi được tìm kiếm đầy đủ và dùng làm mục tiêu chính sách
+PLAYOUT_CHEAP_SEARCHES = 10     # Số lô nhỏ của nước đi tìm kiếm rẻ (không có mục tiêu chính sách)
+MCTS_TIME_LIMIT = 0.0           # >0: giới hạn thời gian (giây) mỗi nước đi tự chơi thay cho MCTS_SEARCHES
+MCTS_MAX_VISITS = 0             # >0: giới hạn lượt truy cập gốc mỗi nước đi tự chơi thay cho MCTS_SEARCHES
 REPLAY_BUFFER = 10000            # Giảm kích thước bộ nhớ đệm
 LEARNING_RATE = 0.1
 BATCH_SIZE = 128
@@ -16,15 +24,49 @@ STEPS_BEFORE_TAU_0 = 12         # Chơi ngẫu nhiên trong ít bước hơn
 # play.py
 PLAY_MCTS_SEARCHES = 200
 PLAY_MCTS_BATCH_SIZE = 64
+PLAY_TIME_LIMIT = 0.0           # >0: giới hạn thời gian (giây) mỗi nước đi thay cho PLAY_MCTS_SEARCHES
+PLAY_MAX_VISITS = 0             # >0: giới hạn lượt truy cập gốc mỗi nước đi thay cho PLAY_MCTS_SEARCHES
 
 # telegram-bot.py
 BOT_MCTS_SEARCHES = 200
 BOT_MCTS_BATCH_SIZE = 64
+BOT_TIME_LIMIT = 0.0            # >0: giới hạn thời gian (giây) mỗi nước đi của bot thay cho BOT_MCTS_SEARCHES
+BOT_MAX_VISITS = 0              # >0: giới hạn lượt truy cập gốc mỗi nước đi của bot thay cho BOT_MCTS_SEARCHES
+BOT_PONDER = False              # Tìm kiếm ở luồng nền trong lượt của người chơi, dùng lại kết quả cho nước của bot
+BOT_PONDER_MAX_VISITS = 20000   # Dừng suy nghĩ trước khi gốc đạt số lượt truy cập này
+BOT_MAX_BYTES = 512 * 1024 ** 2 # Giới hạn bộ nhớ ước tính của cây của bot, kể cả khi suy nghĩ trước (0 - không giới hạn)
 
 # lib/mcts.py
 C_PUCT = 1.5
 ALPHA = 0.03
 EXPLORE = 0.25
+MCTS_NODE_STORE = "dict"        # "dict" - dict các danh sách, "array" - ma trận NumPy (ArrayMCTS),
+                                # "sparse" - mảng gọn chỉ trên các nước hợp lệ (SparseMCTS)
+MCTS_NODE_CHUNK = 1024          # Số nút tối thiểu được thêm mỗi lần ArrayMCTS nới rộng bộ nhớ
+VIRTUAL_LOSS = 3                # Số lượt thua ảo cộng vào mỗi cạnh trên đường đi khi gom lá (0 - tắt)
+VIRTUAL_LOSS_ADAPTIVE = False   # Tự điều chỉnh thua ảo theo tỷ lệ lấp đầy lô
+VIRTUAL_LOSS_MAX = 32           # Giới hạn trên của thua ảo khi tự điều chỉnh
+BATCH_FILL_TARGET = 0.9         # Tỷ lệ lấp đầy lô mong muốn khi tự điều chỉnh thua ảo
+MCTS_REROOT = True              # Sau mỗi nước đi, chuyển gốc cây và giải phóng các nút không còn dùng
+MCTS_MAX_NODES = 0              # Giới hạn số nút của mỗi cây MCTS (0 - không giới hạn)
+MCTS_MAX_BYTES = 0              # Giới hạn bộ nhớ ước tính của mỗi cây, tính bằng byte (0 - không giới hạn)
+MCTS_EVICTION = "lru"           # Chọn nút để loại khi vượt giới hạn: "lru" - lâu chưa dùng nhất, "visits" - ít lượt nhất
+MCTS_EVICT_FRACTION = 0.1       # Loại xuống dưới giới hạn thêm tỷ lệ này để không phải loại ở mỗi lô
+MCTS_PIPELINE = False           # Gom lô lá tiếp theo trong khi mạng đánh giá lô hiện tại ở luồng nền
+MCTS_EARLY_STOP = True          # search_budget dừng sớm khi hành động tốt nhất tại gốc không thể bị vượt
+GUMBEL_SIMULATIONS = 0          # >0: play_game chọn nước đi bằng tìm kiếm Gumbel với số lượt duyệt này thay cho PUCT
+GUMBEL_TOP_K = 16               # Số hành động được xét tại gốc trong tìm kiếm Gumbel
+GUMBEL_C_VISIT = 50             # Hằng số của sigma(q) = (c_visit + max N) * c_scale * q
+GUMBEL_C_SCALE = 1.0
+
+# lib/evaluator.py
+EVAL_CACHE_SIZE = 20000         # Số thế cờ tối đa trong bộ nhớ đệm đánh giá dùng chung của tiến trình (0 - tắt)
+EVAL_CACHE_SYMMETRY = False     # Gộp 8 thế cờ đối xứng (quay/lật) vào cùng một mục của bộ nhớ đệm
+
+# lib/inference_server.py
+INFERENCE_MAX_BATCH = 512       # Số trạng thái tối đa mỗi lô của máy chủ suy luận
+INFERENCE_MAX_WAIT = 0.002      # Thời gian chờ gom lô tối đa (giây) tính từ yêu cầu đầu tiên
+INFERENCE_THREADS = 4           # Số luồng torch của tiến trình máy chủ suy luận
 
 # lib/model.py
 NUM_FILTERS = 64
@@ -15,11 +15,7 @@ import argparse
 import sys
 import time
 
-from lib.play_session import Session
 from lib.game import game_provider
-from lib.game.tictactoe.tictactoe import TicTacToe
-from lib.game.caro.caro_19x19 import Caro19x19
-from lib.game.caro_5x5.caro_5x5 import Caro5x5
 
 # --- Cấu hình Pygame và Giao diện ---
 SCREEN_WIDTH = 400
@@ -81,13 +77,15 @@ def convert_coords_to_move(pos, rows, cols):
     return r * cols + c
 
 def get_list_state(game, state):
-    if isinstance(game, (TicTacToe, Caro5x5)):
+    if hasattr(game, 'convert_mcts_state_to_list_state'):
         return game.convert_mcts_state_to_list_state(state)
     raise TypeError(f"Loại game không xác định: {type(game).__name__}")
 
 # === HÀM MỚI ĐỂ CHƠI LẠI ===
 def reset_game(game, model_path):
     """Khởi tạo lại session và các biến trạng thái để bắt đầu ván mới."""
+    # Session kéo theo torch, chỉ nhập khi thực sự bắt đầu chơi
+    from lib.play_session import Session
     print("---------------------------------")
     print("Bắt đầu ván mới!")
     new_session = Session(game, model_path, player_moves_first=True)
@@ -116,7 +114,7 @@ def main():
 
     rows, cols = get_board_dimensions(game)
     
-    if isinstance(game, TicTacToe):
+    if rows <= 3:
         BOARD_SIZE = 760
         SCREEN_WIDTH = 760
         SCREEN_HEIGHT = 820
@@ -125,8 +123,11 @@ def main():
     screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
     pygame.display.set_caption(f"AlphaZero - Chơi với AI ({type(game).__name__})")
     
+    # giới hạn số khung hình để vòng lặp giao diện không chiếm CPU của luồng suy nghĩ trước
+    clock = pygame.time.Clock()
     running = True
     while running:
+        clock.tick(30)
         # === VÒNG LẶP SỰ KIỆN ĐÃ CẬP NHẬT ===
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -150,6 +151,7 @@ def main():
             # Xử lý input khi game đã kết thúc (để chơi lại)
             if game_over and event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_SPACE:
+                    session.close()
                     session, game_over, player_turn, status_message = reset_game(game, args.model)
         # ========================================
 
@@ -175,6 +177,7 @@ def main():
             else:
                 status_message = "Lượt của bạn!"
 
+    session.close()
     pygame.quit()
     sys.exit()
 
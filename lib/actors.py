@@ -0,0 +1,214 @@
+"""
+Tự chơi bằng nhiều tiến trình: mỗi tác nhân (actor) là một tiến trình riêng chơi các ván
+với trọng số tốt nhất hiện tại và gửi các ván đã xong về tiến trình huấn luyện qua hàng đợi.
+"""
+import collections
+import queue
+import time
+from typing import Deque, List, Optional, Tuple
+
+import numpy as np
+import torch
+import torch.multiprocessing as mp
+
+import config as cfg
+from lib import mcts
+from lib.evaluator import Evaluator
+from lib.game.game import BaseGame
+from lib.inference_server import InferenceClient, InferenceServer
+from lib.model import Net, SharedWeights
+
+def _actor_loop(worker_idx: int, game: BaseGame, weights: SharedWeights,
+                client: Optional[InferenceClient], games_queue, stop_event, threads: int,
+                parallel_games: int, steps_before_tau_0: int, mcts_searches: int,
+                mcts_batch_size: int, full_search_fraction: float) -> None:
+    """
+    Vòng lặp của một tiến trình tác nhân: trước mỗi lượt chơi, chép trọng số dùng chung nếu
+    phiên bản đã đổi, rồi chơi và gửi từng ván về hàng đợi cho tới khi có tín hiệu dừng.
+    Với client, lá được gửi tới máy chủ suy luận và tác nhân không giữ mạng riêng.
+    """
+    from lib.utils import play_game, play_games_lockstep
+
+    torch.set_num_threads(threads)
+    np.random.seed((int(time.time() * 1000) + worker_idx * 7919) % 2 ** 32)
+    net = None
+    if client is None:
+        net = Net(game.obs_shape, game.action_space)
+        evaluator = Evaluator(net, game, batch_size=mcts_batch_size * parallel_games)
+    else:
+        evaluator = client
+    stores = [mcts.make_mcts(game) for _ in range(parallel_games)]
+    version = -1
+    while not stop_event.is_set():
+        if weights.version != version:
+            # máy chủ tự nạp trọng số mới, tác nhân chỉ cần ghi nhận phiên bản
+            version = weights.version if net is None else weights.load_into(net, version)
+            for store in stores:
+                store.clear()
+        buffer: Deque[Tuple] = collections.deque()
+        # số bản ghi của từng ván trong buffer, theo thứ tự
+        lengths: List[int] = []
+        if parallel_games > 1:
+            play_games_lockstep(game, stores, buffer, evaluator, parallel_games,
+                                steps_before_tau_0, mcts_searches, mcts_batch_size,
+                                full_search_fraction=full_search_fraction, episode_lengths=lengths)
+        else:
+            play_game(game, stores[0], buffer, evaluator, evaluator,
+                      steps_before_tau_0, mcts_searches, mcts_batch_size,
+                      full_search_fraction=full_search_fraction)
+            lengths.append(len(buffer))
+        # mỗi ván gửi về: (bản ghi (trạng thái, người chơi, xác suất, kết quả), số bước,
+        # phiên bản trọng số đã dùng để chơi)
+        for record in _split_games(buffer, lengths):
+            # số bước tính như play_game: số nước đi trừ một
+            game_steps = len(record) - 1
+            while not stop_event.is_set():
+                try:
+                    games_queue.put((record, game_steps, version), timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+    for store in stores:
+        store.close()
+
+
+def _split_games(buffer: Deque[Tuple], lengths: List[int]) -> List[List[Tuple]]:
+    """
+    Tách các bản ghi của nhiều ván liên tiếp trong bộ đệm theo ranh giới tường minh: các bản
+    ghi của một ván nằm liền nhau, lengths[i] là số bản ghi của ván thứ i.
+    """
+    assert sum(lengths) == len(buffer)
+    items = iter(buffer)
+    return [[next(items) for _ in range(length)] for length in lengths]
+
+
+class SelfPlayActors:
+    """
+    Nhóm các tiến trình tự chơi. Trọng số tốt nhất được đặt trong bộ nhớ dùng chung kèm
+    số phiên bản (SharedWeights); publish() chép trọng số mới vào đó và tăng phiên bản, mỗi
+    tác nhân tự nạp lại trọng số trước lượt chơi kế tiếp khi thấy phiên bản thay đổi. Khi dùng
+    máy chủ suy luận, chỉ máy chủ giữ mạng và các tác nhân gửi lá tới đó.
+    """
+
+    def __init__(self, game: BaseGame, net: Net, workers: int = cfg.SELF_PLAY_WORKERS,
+                 threads: int = cfg.SELF_PLAY_WORKER_THREADS,
+                 parallel_games: int = cfg.PLAY_PARALLEL_GAMES,
+                 steps_before_tau_0: int = cfg.STEPS_BEFORE_TAU_0,
+                 mcts_searches: int = cfg.MCTS_SEARCHES,
+                 mcts_batch_size: int = cfg.MCTS_BATCH_SIZE,
+                 inference_server: bool = cfg.SELF_PLAY_INFERENCE_SERVER,
+                 full_search_fraction: float = cfg.PLAYOUT_FULL_FRACTION):
+        """
+        Đối số:
+            game (BaseGame): Trò chơi
+            net (Net): Mạng tốt nhất hiện tại, trọng số được chép sang bộ nhớ dùng chung
+            workers (int, tùy chọn): Số tiến trình tác nhân. Mặc định là cfg.SELF_PLAY_WORKERS.
+            threads (int, tùy chọn): Số luồng torch của mỗi tác nhân. Mặc định là cfg.SELF_PLAY_WORKER_THREADS.
+            parallel_games (int, tùy chọn): Số ván mỗi tác nhân chơi song song theo nhịp.
+            Mặc định là cfg.PLAY_PARALLEL_GAMES.
+            steps_before_tau_0 (int, tùy chọn): Mặc định là cfg.STEPS_BEFORE_TAU_0.
+            mcts_searches (int, tùy chọn): Mặc định là cfg.MCTS_SEARCHES.
+            mcts_batch_size (int, tùy chọn): Mặc định là cfg.MCTS_BATCH_SIZE.
+            inference_server (bool, tùy chọn): Đánh giá lá của mọi tác nhân trong một máy chủ
+            suy luận chung (InferenceServer). Mặc định là cfg.SELF_PLAY_INFERENCE_SERVER.
+            full_search_fraction (float, tùy chọn): Tỷ lệ nước đi được tìm kiếm đầy đủ.
+            Mặc định là cfg.PLAYOUT_FULL_FRACTION.
+        """
+        assert workers > 0
+        self.game = game
+        self.workers = workers
+        # spawn thay vì fork: tiến trình con không kế thừa trạng thái luồng OpenMP của torch
+        self._ctx = mp.get_context("spawn")
+        self.server = None
+        if inference_server:
+            self.server = InferenceServer(game, net, clients=workers, ctx=self._ctx)
+            self.weights = self.server.weights
+        else:
+            self.weights = SharedWeights(net, self._ctx)
+        self._queue = self._ctx.Queue(maxsize=max(4, workers * 4))
+        self._stop = self._ctx.Event()
+        self._args = (threads, max(1, parallel_games), steps_before_tau_0, mcts_searches, mcts_batch_size,
+                      full_search_fraction)
+        self._processes: List = []
+
+    @property
+    def version(self) -> int:
+        return self.weights.version
+
+    def start(self) -> None:
+        if self.server is not None:
+            self.server.start()
+        for idx in range(self.workers):
+            client = None if self.server is None else self.server.client(idx)
+            process = self._ctx.Process(
+                target=_actor_loop, daemon=True,
+                args=(idx, self.game, self.weights, client, self._queue, self._stop) + self._args)
+            process.start()
+            self._processes.append(process)
+
+    def publish(self, net: Net) -> int:
+        """
+        Đưa trọng số mới cho các tác nhân
+
+        Đối số:
+            net (Net): Mạng tốt nhất mới
+
+        Trả về:
+            int: Phiên bản trọng số mới
+        """
+        return self.weights.publish(net)
+
+    def collect(self, replay_buffer: Optional[collections.deque], games: int,
+                timeout: Optional[float] = None) -> Tuple[int, int, float]:
+        """
+        Nhận ít nhất `games` ván đã xong từ các tác nhân và thêm vào bộ đệm phát lại
+
+        Đối số:
+            replay_buffer (deque): Bộ đệm phát lại, None để bỏ qua dữ liệu
+            games (int): Số ván cần nhận
+            timeout (float, tùy chọn): Thời gian chờ tối đa (giây). Mặc định là None (chờ mãi).
+
+        Trả về:
+            Tuple[int, int, float]: số ván đã nhận, tổng số bước của chúng, độ trễ phiên bản
+            trung bình (số phiên bản mà trọng số dùng để chơi cũ hơn trọng số hiện tại)
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        received, steps, lag = 0, 0, 0
+        while received < games:
+            if any(not p.is_alive() for p in self._processes):
+                raise RuntimeError("Một tiến trình tự chơi đã dừng bất thường")
+            wait = 1.0 if deadline is None else min(1.0, deadline - time.time())
+            if wait <= 0:
+                break
+            try:
+                records, game_steps, version = self._queue.get(timeout=wait)
+            except queue.Empty:
+                continue
+            if replay_buffer is not None:
+                replay_buffer.extend(records)
+            received += 1
+            steps += game_steps
+            lag += self.weights.version - version
+        return received, steps, lag / received if received else 0.0
+
+    def stop(self) -> None:
+        self._stop.set()
+        # rút cạn hàng đợi để các tiến trình không bị chặn khi đang gửi
+        while any(p.is_alive() for p in self._processes):
+            try:
+                self._queue.get(timeout=0.1)
+            except queue.Empty:
+                pass
+            for process in self._processes:
+                process.join(timeout=0.1)
+        self._processes = []
+        # máy chủ dừng sau cùng: tác nhân có thể đang chờ phản hồi khi nhận tín hiệu dừng
+        if self.server is not None:
+            self.server.stop()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
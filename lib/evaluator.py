@@ -0,0 +1,240 @@
+"""
+Bộ đánh giá thế cờ bằng mạng nơ-ron cho MCTS và các vòng chơi.
+"""
+import collections
+from typing import Callable, Dict, Hashable, List, Optional, Tuple, Union
+
+import numpy as np
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+
+import config as cfg
+from lib.game.game import BaseGame
+
+
+class EvalCache:
+    """
+    Bộ nhớ đệm LRU các kết quả (chính sách, giá trị) của mạng, khóa theo
+    (phiên bản trọng số, thế cờ, người chơi đến lượt). Vì phiên bản trọng số
+    thay đổi mỗi khi mạng được huấn luyện hoặc đồng bộ (Net.bump_version),
+    các mục cũ tự động không còn được dùng và dần bị đẩy ra.
+    """
+
+    def __init__(self, max_size: int = cfg.EVAL_CACHE_SIZE, symmetry: bool = cfg.EVAL_CACHE_SYMMETRY):
+        """
+        Đối số:
+            max_size (int, tùy chọn): Số mục tối đa. Mặc định là cfg.EVAL_CACHE_SIZE.
+            symmetry (bool, tùy chọn): Gộp các thế cờ đối xứng vào cùng một mục (chỉ với
+            các trò chơi có bảng đối xứng). Mặc định là cfg.EVAL_CACHE_SYMMETRY.
+        """
+        self.max_size = max_size
+        self.symmetry = symmetry
+        self._entries: collections.OrderedDict = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def hit_rate(self) -> float:
+        """
+        Trả về:
+            float: Tỷ lệ tra cứu trúng kể từ lần đặt lại gần nhất, 0 nếu chưa tra cứu
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def reset_stats(self) -> None:
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, game: BaseGame, version: int, state: int,
+            player: int) -> Tuple[Hashable, Optional[np.ndarray]]:
+        """
+        Khóa của một thế cờ. Khi gộp đối xứng, khóa là bàn cờ nhỏ nhất (theo thứ tự
+        từ điển) trong 8 phép biến đổi, kèm hoán vị để đưa chính sách về bàn cờ gốc.
+
+        Đối số:
+            game (BaseGame): Trò chơi
+            version (int): Phiên bản trọng số của mạng
+            state (int): Trạng thái trò chơi ở dạng MCTS
+            player (int): Người chơi đến lượt
+
+        Trả về:
+            Tuple: (khóa, hoán vị) - hoán vị p sao cho chính sách gốc = chính sách chuẩn[p],
+            None nếu không gộp đối xứng
+        """
+        tables = getattr(game, "tables", None)
+        if not self.symmetry or tables is None:
+            return (version, state, player), None
+        candidates = game.state_cells(state)[tables.symmetries]
+        best = 0
+        for idx in range(1, len(candidates)):
+            diff = np.flatnonzero(candidates[idx] != candidates[best])
+            if len(diff) and candidates[idx][diff[0]] < candidates[best][diff[0]]:
+                best = idx
+        return (version, candidates[best].tobytes(), player), tables.inverse_symmetries[best]
+
+    def get(self, key: Hashable) -> Optional[Tuple[np.ndarray, float]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: Hashable, probs: np.ndarray, value: float) -> None:
+        self._entries[key] = (probs, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+
+_shared_cache: Optional[EvalCache] = None
+
+
+def shared_cache() -> Optional[EvalCache]:
+    """
+    Bộ nhớ đệm đánh giá dùng chung cho mọi cây MCTS và ván chơi trong tiến trình
+
+    Trả về:
+        EvalCache: Bộ nhớ đệm, None nếu bị tắt (cfg.EVAL_CACHE_SIZE = 0)
+    """
+    global _shared_cache
+    if _shared_cache is None and cfg.EVAL_CACHE_SIZE > 0:
+        _shared_cache = EvalCache()
+    return _shared_cache
+
+
+class Evaluator:
+    """
+    Đánh giá các lô trạng thái lá bằng mạng nơ-ron, chỉ để suy luận:
+    - chạy trong torch.inference_mode (không xây đồ thị gradient),
+    - luôn đặt mô hình ở chế độ eval (BatchNorm dùng thống kê đã học),
+    - mã hóa trạng thái vào một bộ đệm cấp phát sẵn và đưa vào mạng bằng
+      torch.from_numpy, không sao chép thêm,
+    - trả về xác suất chính sách và giá trị dưới dạng mảng NumPy,
+    - dùng lại kết quả đã có trong bộ nhớ đệm đánh giá dùng chung (EvalCache)
+      cho các mạng có phiên bản trọng số (Net.version).
+    """
+
+    def __init__(self, net: Union[nn.Module, Callable], game: BaseGame, device: str = "cpu",
+                 batch_size: int = 64, use_cache: bool = True):
+        """
+        Đối số:
+            net (nn.Module hoặc Callable): Mạng nơ-ron, hoặc hàm nhận tensor đầu vào
+            và trả về (logits, giá trị)
+            game (BaseGame): Trò chơi, dùng để mã hóa trạng thái
+            device (str, tùy chọn): Thiết bị PyTorch. Mặc định là "cpu".
+            batch_size (int, tùy chọn): Kích thước ban đầu của bộ đệm đầu vào,
+            bộ đệm được nới rộng khi gặp lô lớn hơn. Mặc định là 64.
+            use_cache (bool, tùy chọn): Dùng bộ nhớ đệm đánh giá dùng chung của tiến trình.
+            Mặc định là True.
+        """
+        self.net = net
+        self.game = game
+        self.device = device
+        # hàm thay cho mạng (không có phiên bản trọng số) không được lưu đệm
+        self.cache = shared_cache() if use_cache and hasattr(net, "version") else None
+        # bộ đệm ghim (pinned) giúp sao chép sang GPU nhanh và không đồng bộ
+        self._pin = device != "cpu" and torch.cuda.is_available()
+        self._buffer: Optional[np.ndarray] = None
+        self._reserve(batch_size)
+
+    def _reserve(self, batch_size: int) -> None:
+        """
+        Đảm bảo bộ đệm đầu vào chứa được ít nhất batch_size trạng thái
+
+        Đối số:
+            batch_size (int): Số trạng thái của lô
+        """
+        if self._buffer is not None and self._buffer.shape[0] >= batch_size:
+            return
+        shape = (batch_size,) + tuple(self.game.obs_shape)
+        if self._pin:
+            self._buffer = torch.empty(shape, dtype=torch.float32, pin_memory=True).numpy()
+        else:
+            self._buffer = np.empty(shape, dtype=np.float32)
+
+    def __call__(self, states: List[int], players: List[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Đánh giá một lô trạng thái
+
+        Đối số:
+            states (List[int]): Các trạng thái trò chơi ở dạng MCTS
+            players (List[int]): Người chơi đến lượt ở mỗi trạng thái
+
+        Trả về:
+            Tuple[np.ndarray, np.ndarray]: xác suất chính sách (len(states), action_space)
+            và giá trị (len(states),) cho người chơi đến lượt
+        """
+        if self.cache is None:
+            return self._evaluate(states, players)
+
+        # chỉ mạng có phiên bản trọng số (Net.version) mới được lưu đệm, xem __init__
+        version: int = getattr(self.net, "version")
+        keys = [self.cache.key(self.game, version, state, player)
+                for state, player in zip(states, players)]
+        probs = np.empty((len(states), self.game.action_space), dtype=np.float32)
+        values = np.empty(len(states), dtype=np.float32)
+        # các thế cờ chưa có trong bộ nhớ đệm, mỗi khóa chỉ đánh giá một lần
+        missing: Dict[Hashable, List[int]] = collections.OrderedDict()
+        for idx, (key, perm) in enumerate(keys):
+            entry = self.cache.get(key)
+            if entry is None:
+                missing.setdefault(key, []).append(idx)
+            else:
+                cached_probs, values[idx] = entry
+                probs[idx] = cached_probs if perm is None else cached_probs[perm]
+        if missing:
+            first = [indices[0] for indices in missing.values()]
+            new_probs, new_values = self._evaluate([states[i] for i in first],
+                                                   [players[i] for i in first])
+            for (key, indices), prob, value in zip(missing.items(), new_probs, new_values):
+                perm = keys[indices[0]][1]
+                # lưu chính sách theo bàn cờ chuẩn: chuẩn[j] = gốc[symmetries[best][j]]
+                # sao chép để mục trong bộ nhớ đệm không giữ lại cả lô đầu ra của mạng
+                canonical = prob.copy() if perm is None else prob[np.argsort(perm)]
+                self.cache.put(key, canonical, float(value))
+                for idx in indices:
+                    probs[idx] = canonical if perm is None else canonical[keys[idx][1]]
+                    values[idx] = value
+        return probs, values
+
+    def _evaluate(self, states: List[int], players: List[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Đánh giá một lô trạng thái bằng mạng, không qua bộ nhớ đệm
+        """
+        self._reserve(len(states))
+        batch = self.game.states_to_training_batch(states, players, out=self._buffer)
+        # mạng có thể đã được chuyển về chế độ train bởi vòng huấn luyện
+        if isinstance(self.net, nn.Module) and self.net.training:
+            self.net.eval()
+        with torch.inference_mode():
+            batch_tensor = torch.from_numpy(batch).to(self.device, non_blocking=self._pin)
+            logits_v, values_v = self.net(batch_tensor)
+            probs_v = F.softmax(logits_v, dim=1)
+            return probs_v.cpu().numpy(), values_v[:, 0].cpu().numpy()
+
+
+def as_evaluator(net: Union[Evaluator, nn.Module, Callable], game: BaseGame,
+                 device: str = "cpu") -> Evaluator:
+    """
+    Trả về net nếu nó đã là Evaluator, nếu không bọc nó trong một Evaluator mới
+
+    Đối số:
+        net (Evaluator, nn.Module hoặc Callable): Bộ đánh giá hoặc mạng nơ-ron
+        game (BaseGame): Trò chơi
+        device (str, tùy chọn): Thiết bị PyTorch. Mặc định là "cpu".
+
+    Trả về:
+        Evaluator: Bộ đánh giá
+    """
+    if isinstance(net, Evaluator):
+        return net
+    return Evaluator(net, game, device)
@@ -3,7 +3,7 @@
 """
 
 from abc import ABC, abstractmethod
-from typing import Tuple, List, Union
+from typing import Tuple, List, Optional, Union
 import numpy as np
 
 class BaseGame(ABC):
@@ -78,8 +78,55 @@ class BaseGame(ABC):
         """
         pass
 
+    def legal_moves_mask(self, mcts_state: int) -> np.ndarray:
+        """
+        Mặt nạ các nước đi hợp lệ trên toàn bộ không gian hành động.
+        Cài đặt mặc định dựng lại từ possible_moves; các trò chơi nên ghi đè
+        để suy ra trực tiếp từ trạng thái. MCTS gọi hàm này một lần khi tạo
+        mỗi nút và lưu mặt nạ bên cạnh nút.
+        Mảng trả về không được sửa đổi.
+
+        Đối số:
+            mcts_state (int): Trạng thái trò chơi ở dạng MCTS
+
+        Trả về:
+            np.ndarray: Mảng bool độ dài action_space, True tại các nước đi hợp lệ
+        """
+        mask = np.zeros(self.action_space, dtype=bool)
+        mask[self.possible_moves(mcts_state)] = True
+        return mask
+
+    def state_cells(self, mcts_state: int) -> np.ndarray:
+        """
+        Bàn cờ phẳng dưới dạng mảng NumPy, mỗi phần tử là giá trị của một ô.
+        Chỉ cần cho các trò chơi bàn cờ có bảng đối xứng (mnk_helpers.get_tables),
+        ví dụ để gộp các thế cờ đối xứng trong bộ nhớ đệm đánh giá (EvalCache).
+
+        Đối số:
+            mcts_state (int): Trạng thái trò chơi ở dạng MCTS
+
+        Trả về:
+            np.ndarray: Mảng độ dài action_space
+        """
+        raise NotImplementedError("%s không hỗ trợ state_cells" % type(self).__name__)
+
+    def empty_count(self, mcts_state: int) -> int:
+        """
+        Số nước đi hợp lệ còn lại (số ô trống với các trò chơi bàn cờ).
+        Bằng 0 nghĩa là ván cờ hòa nếu chưa ai thắng. MCTS gọi hàm này một lần
+        cho mỗi cạnh mới của cây và ghi nhớ kết quả trên cạnh.
+
+        Đối số:
+            mcts_state (int): Trạng thái trò chơi ở dạng MCTS
+
+        Trả về:
+            int: Số nước đi hợp lệ
+        """
+        return len(self.possible_moves(mcts_state))
+
     @abstractmethod
-    def states_to_training_batch(self, mcts_lists: List, who_moves_lists: List[int]) -> np.ndarray:
+    def states_to_training_batch(self, mcts_lists: List, who_moves_lists: List[int],
+                                 out: Optional[np.ndarray] = None) -> np.ndarray:
         """
         Chuyển đổi trạng thái trò chơi thành dạng có thể được sử dụng làm dữ liệu đào tạo
         cho mạng nơ-ron.
@@ -88,6 +135,9 @@ class BaseGame(ABC):
             state_lists (Danh sách): Danh sách các trạng thái trò chơi ở dạng MCTS
             who_moves_lists (Danh sách[int]): Danh sách tương ứng của người chơi đã thực hiện
             nước đi ở trạng thái trò chơi đó.
+            out (np.ndarray, tùy chọn): Bộ đệm float32 cấp phát sẵn, hình dạng
+            (>= len(mcts_lists),) + obs_shape. Nếu có, kết quả được ghi trực tiếp vào
+            out[:len(mcts_lists)] và phần đó được trả về, tránh cấp phát ở mỗi lô.
 
         Trả về:
             np.ndarray: Đối với trò chơi 2 người chơi với bàn cờ m x n, mỗi trạng thái trò chơi
@@ -1,47 +1,106 @@
-from lib.game.caro_19x19.caro_19x19 import Caro19x19
-from lib.game.caro_17x17.caro_17x17 import Caro17x17
-from lib.game.caro_15x15.caro_15x15 import Caro15x15
-from lib.game.caro_13x13.caro_13x13 import Caro13x13
-from lib.game.caro_9x9.caro_9x9 import Caro9x9
-from lib.game.caro_7x7.caro_7x7 import Caro7x7
-from lib.game.caro_5x5.caro_5x5 import Caro5x5
-from lib.game.tictactoe.tictactoe import TicTacToe
+"""
+Danh mục các trò chơi có sẵn.
+Mô-đun của mỗi trò chơi chỉ được nhập khi trò chơi đó được chọn, để các công cụ
+chỉ cần logic trò chơi (hiển thị, đo hiệu năng, chuyển đổi dữ liệu) và `--help`
+khởi động nhanh mà không kéo theo torch.
+"""
+import argparse
+import importlib
+from typing import Dict, Tuple
+
+# Các trò chơi có sẵn: id -> (tên hiển thị, đường dẫn lớp "mô-đun:Lớp", n, k)
+# với n là kích thước bàn cờ và k là số quân liên tiếp để thắng
+GAMES: Dict[str, Tuple[str, str, int, int]] = {
+    '0': ("TicTacToe", "lib.game.tictactoe.tictactoe:TicTacToe", 3, 3),
+    '1': ("Caro 5x5", "lib.game.caro_5x5.caro_5x5:Caro5x5", 5, 4),
+    '2': ("Caro 7x7", "lib.game.caro_7x7.caro_7x7:Caro7x7", 7, 4),
+    '3': ("Caro 9x9", "lib.game.caro_9x9.caro_9x9:Caro9x9", 9, 5),
+    '4': ("Caro 13x13", "lib.game.caro_13x13.caro_13x13:Caro13x13", 13, 5),
+    '5': ("Caro 15x15", "lib.game.caro_15x15.caro_15x15:Caro15x15", 15, 5),
+    '6': ("Caro 17x17", "lib.game.caro_17x17.caro_17x17:Caro17x17", 17, 5),
+    '7': ("Caro 19x19", "lib.game.caro_19x19.caro_19x19:Caro19x19", 19, 5),
+}
+
+BITBOARD_CLASS = "lib.game.mnk_bitboard.mnk_bitboard:MNKBitboard"
+
+
+def register_game(game_id: str, name: str, class_path: str, n: int, k_to_win: int) -> None:
+    """
+    Đăng ký một trò chơi m,n,k mới để có thể chọn bằng `-g game_id`
+
+    Đối số:
+        game_id (str): Mã trò chơi dùng với cờ -g
+        name (str): Tên hiển thị trong trợ giúp
+        class_path (str): Đường dẫn lớp dạng "mô-đun:Lớp", lớp nhận (n, k_to_win)
+        n (int): Số ô vuông cho mỗi bên của bàn cờ
+        k_to_win (int): Số lượng quân cờ liên tiếp để thắng
+    """
+    GAMES[game_id] = (name, class_path, n, k_to_win)
+
+
+def load_class(class_path: str):
+    """
+    Nhập mô-đun và trả về lớp theo đường dẫn "mô-đun:Lớp"
+
+    Đối số:
+        class_path (str): Ví dụ "my_games.connect4:Connect4"
+
+    Trả về:
+        type: Lớp được chỉ định
+    """
+    module_name, _, class_name = class_path.partition(':')
+    if not module_name or not class_name:
+        raise ValueError("Đường dẫn lớp phải có dạng 'mô-đun:Lớp': %s" % class_path)
+    module = importlib.import_module(module_name)
+    return getattr(module, class_name)
+
+
+def _game_type(value: str) -> str:
+    """
+    Kiểm tra giá trị của cờ --game: mã trò chơi đã đăng ký hoặc đường dẫn "mô-đun:Lớp"
+    """
+    if value in GAMES or ':' in value:
+        return value
+    raise argparse.ArgumentTypeError(
+        "trò chơi không hợp lệ: %s (chọn trong %s hoặc 'mô-đun:Lớp')" % (value, ', '.join(sorted(GAMES))))
+
 
 def add_game_argument(parser):
     """
-    Thêm đối số --game vào trình phân tích đối số với các trò chơi có sẵn    
-    
+    Thêm đối số --game vào trình phân tích đối số với các trò chơi có sẵn
+
     Đối số:
         parser (argparse.ArgumentParser): Trình phân tích đối số để thêm đối số trò chơi
     """
-    parser.add_argument("-g", "--game", required=True, choices=['0', '1', '2', '3', '4', '5', '6', '7'],
-                        help="Loại trò chơi: 0 - TicTacToe, 1 - Caro 5x5, 2 - Caro 7x7, 3 - Caro 9x9, 4 - Caro 13x13, 5 - Caro 15x15, 6 - Caro 17x17, 7 - Caro 19x19")
+    choices = ", ".join("%s - %s" % (game_id, GAMES[game_id][0]) for game_id in sorted(GAMES))
+    parser.add_argument("-g", "--game", required=True, type=_game_type,
+                        help="Loại trò chơi: %s. Trò chơi bên ngoài có thể được chỉ định bằng "
+                             "đường dẫn lớp 'mô-đun:Lớp' (lớp được khởi tạo không có đối số)" % choices)
+    parser.add_argument("--board-repr", default="digits", choices=['digits', 'bitboard'],
+                        help="Cách biểu diễn trạng thái MCTS: digits - số nguyên mỗi ô một chữ số, "
+                             "bitboard - một bitmask cho mỗi người chơi")
+
+
 def get_game(args):
     """
-    Trả về trò chơi dựa trên đối số đã phân tích
-    
+    Trả về trò chơi dựa trên đối số đã phân tích. Chỉ mô-đun của trò chơi được chọn
+    mới được nhập.
+
     Đối số:
         args (argparse.Namespace): Đối tượng chứa các đối số đã phân tích
-    
+
     Trả về:
         game: Trò chơi tương ứng với đối số đã phân tích
     """
     game_type = args.game
-    if game_type == '0':
-        return TicTacToe()
-    elif game_type == '1':
-        return Caro5x5()
-    elif game_type == '2':
-        return Caro7x7()
-    elif game_type == '3':
-        return Caro9x9()
-    elif game_type == '4':
-        return Caro13x13()
-    elif game_type == '5':
-        return Caro15x15()
-    elif game_type == '6':
-        return Caro17x17()
-    elif game_type == '7':
-        return Caro19x19()
-    else:
-        raise ValueError("Trò chơi không hợp lệ")
\ No newline at end of file
+    board_repr = getattr(args, "board_repr", "digits")
+    if game_type not in GAMES:
+        if ':' not in game_type:
+            raise ValueError("Trò chơi không hợp lệ")
+        if board_repr != "digits":
+            raise ValueError("--board-repr chỉ áp dụng cho các trò chơi m,n,k đã đăng ký")
+        return load_class(game_type)()
+    _, class_path, n, k_to_win = GAMES[game_type]
+    if board_repr == "bitboard":
+        class_path = BITBOARD_CLASS
+    return load_class(class_path)(n, k_to_win)
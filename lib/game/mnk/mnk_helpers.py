@@ -0,0 +1,379 @@
+import functools
+from typing import List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+
+Matrix = List[List[int]]
+Coord = Tuple[int, int]
+
+# Bốn hướng có thể tạo thành một hàng: ngang, dọc, chéo chính, chéo phụ
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (-1, 1))
+# 4 cặp (nhánh lùi, nhánh tiến) chỉ số ô lân cận của một ô, xem build_line_table
+LineTable = Tuple[Tuple[Tuple[int, ...], Tuple[int, ...]], ...]
+
+
+def check_win(matrix: Matrix, move: Coord, k: int, token: int) -> bool:
+    """
+        [tóm tắt]
+
+        Đối số:
+        matrix (Ma trận): [mô tả]
+        move (Coord): [mô tả]
+        k (int): [mô tả]
+        token (int): [mô tả]
+
+        Trả về:
+        bool: [mô tả]
+    """
+    for func in (get_row, get_col, get_diag, get_antidiag):
+        arr = func(matrix, move)
+        if k_in_a_row(arr, k, token):
+            return True
+    return False
+
+
+def build_line_table(n: int, k: int) -> List[LineTable]:
+    """
+    Tính trước, cho mỗi ô của bàn cờ n x n, chỉ số phẳng của các ô lân cận trên
+    4 đường đi qua ô đó. Mỗi hướng gồm 2 nhánh (lùi và tiến), mỗi nhánh có tối đa
+    k-1 ô xếp từ gần đến xa, tức là cửa sổ 2k-1 ô quanh nước đi, đã cắt theo biên.
+
+    Đối số:
+        n (int): Số ô vuông cho mỗi bên của bàn cờ
+        k (int): Số lượng quân cờ liên tiếp để thắng
+
+    Trả về:
+        List[LineTable]: table[idx] là 4 cặp (nhánh lùi, nhánh tiến) của ô idx
+    """
+    table = []
+    for move in range(n * n):
+        row, col = divmod(move, n)
+        lines = []
+        for d_row, d_col in DIRECTIONS:
+            branches = []
+            for sign in (-1, 1):
+                branch = []
+                for step in range(1, k):
+                    r = row + sign * step * d_row
+                    c = col + sign * step * d_col
+                    if not (0 <= r < n and 0 <= c < n):
+                        break
+                    branch.append(r * n + c)
+                branches.append(tuple(branch))
+            lines.append((branches[0], branches[1]))
+        table.append(tuple(lines))
+    return table
+
+
+def check_win_lines(cells: Sequence, lines: LineTable, k: int, token) -> bool:
+    """
+    Kiểm tra chiến thắng tại chỗ từ ô vừa được đánh bằng bảng chỉ số tính trước,
+    không tạo danh sách hàng/cột/đường chéo. Ô vừa đánh luôn được coi là của token,
+    kể cả khi cells chưa được cập nhật. Cho cùng kết quả với check_win ở mọi trạng thái
+    đạt được trong ván (trước nước đi chưa có ai thắng).
+
+    Đối số:
+        cells (Sequence): Các ô của bàn cờ dạng phẳng (ví dụ chuỗi chữ số đã thêm số 0)
+        lines (LineTable): Phần tử của build_line_table cho ô vừa đánh
+        k (int): Số lượng quân cờ liên tiếp để thắng
+        token: Giá trị của quân cờ trong cells
+
+    Trả về:
+        bool: Nước đi có tạo thành k quân liên tiếp hay không
+    """
+    for backward, forward in lines:
+        count = 1
+        for idx in backward:
+            if cells[idx] != token:
+                break
+            count += 1
+        for idx in forward:
+            if cells[idx] != token:
+                break
+            count += 1
+        if count >= k:
+            return True
+    return False
+
+
+def k_in_a_row(arr: List[int], k: int, token: int) -> bool:
+    """
+        [tóm tắt]
+
+        Đối số:
+        arr (Danh sách[int]): [mô tả]
+        k (int): [mô tả]
+        token (int): [mô tả]
+
+        Trả về:
+        bool: [mô tả]
+    """
+    assert k > 1, "Chúng tôi không xử lý các trường hợp tầm thường khi k <= 1"
+    if len(arr) < k:
+        # Không thể nào
+        return False
+
+    matchStartIndex = None
+    for i in range(len(arr)):
+        if arr[i] == token:
+            if matchStartIndex is None:
+                matchStartIndex = i
+            elif (i - matchStartIndex + 1) >= k:
+                # Có >= k mã token, chúng ta có thể trả về
+                return True
+        else:
+            # Đã tìm thấy mã token không khớp. Đặt lại
+            matchStartIndex = None
+            if i >= (len(arr) - k):
+                # Còn lại ít hơn k token, chúng tôi không thể khớp
+                return False
+    return False
+
+
+def get_row(matrix: Matrix, coord: Coord) -> List[int]:
+    """
+    [tóm tắt]
+
+    Đối số:
+        matrix (Ma trận): [mô tả]
+        coord (Coord): [mô tả]
+
+    Trả về:
+        [kiểu]: [mô tả]
+    """
+    return matrix[coord[0]]
+
+
+def get_col(matrix: Matrix, coord: Coord) -> List[int]:
+    """
+    [tóm tắt]
+
+    Đối số:
+        matrix (Ma trận): [mô tả]
+        coord (Coord): [mô tả]
+    """
+    col_idx = coord[1]
+    return [row[col_idx] for row in matrix]
+
+
+def get_diag(matrix: Matrix, coord: Coord) -> List[int]:
+    """
+    [tóm tắt]
+
+    _|0|1|2|3|
+
+    0|_|_|_|_|
+    1|_|_|_|_|
+    2|_|_|_|_|
+    3|_|_|_|_|
+
+    Đối số:
+        matrix (Ma trận): [mô tả]
+        coord (Coord): [mô tả]
+
+    Trả về:
+        List[int]: [mô tả]
+    """
+    row_idx = coord[0]
+    col_idx = coord[1]
+
+    if row_idx >= col_idx:
+        # Các giá trị này là đúng đối với đường chéo chính
+        # (từ trên cùng bên trái đến dưới cùng bên phải qua tâm bảng)
+        # và các đường chéo nhỏ hơn khác bên dưới nó
+        # Các đường chéo này luôn chứa cột đầu tiên
+        col_start = 0
+        row_start = row_idx - col_idx
+        # Các đường chéo này luôn chứa hàng cuối cùng
+        row_end = len(matrix) - 1
+        # Do tính đối xứng.
+        # Vẽ và quan sát hàng mà đường chéo kết thúc
+        # là chỉ số đảo ngược của cột nơi nó bắt đầu
+        col_end = row_end - col_start
+    else:
+        # Các đường chéo phía trên đường chéo chính luôn chứa hàng đầu tiên        
+        row_start = 0
+        col_start = col_idx - row_idx
+        # và cột cuối cùng
+        col_end = len(matrix) - 1
+        row_end = col_end - col_start
+
+    diag = []
+    x = row_start
+    y = col_start
+    while x <= row_end and y <= col_end:
+        diag.append(matrix[x][y])
+        x += 1
+        y += 1
+    return diag
+
+
+def get_antidiag(matrix: Matrix, coord: Coord) -> List[int]:
+    """
+    Chúng ta có các đường chéo ngược (từ dưới cùng bên trái đến trên cùng bên phải)
+
+    Đối số:
+        matrix (Ma trận): [description]
+        coord (Coord): [description]
+
+    Trả về:
+        List[int]: [description]
+    """
+    assert len(matrix) == len(matrix[0]), "chúng tôi chỉ xử lý hình vuông"
+    row_idx = coord[0]
+    col_idx = coord[1]
+
+    if row_idx + col_idx < len(matrix):
+        # Các giá trị này là đúng đối với đường chéo chính
+        # (từ dưới cùng bên trái đến trên cùng bên phải qua tâm bảng)
+        # và các đường chéo nhỏ hơn khác ở trên nó
+        # Các đường chéo này luôn chứa cột đầu tiên
+        col_start = 0
+        # hàng dưới cùng. Chúng ta bắt đầu giảm dần từ đây
+        row_start = row_idx + col_idx
+        # Các đường chéo đối này luôn chứa hàng cuối cùng
+        row_end = 0
+        # Do tính đối xứng.
+        # Vẽ và quan sát cột mà đường chéo ngược kết thúc
+        # có cùng chỉ số với hàng mà nó bắt đầu
+        col_end = row_start
+    else:
+        # Các đường chéo đối diện bên dưới đường chéo chính luôn chứa cột cuối cùng
+        col_end = len(matrix) - 1
+        col_start = col_idx + row_idx - col_end
+        # Và hàng cuối cùng. Chúng ta cũng bắt đầu giảm dần từ đây
+        row_start = len(matrix) - 1
+        row_end = col_start
+
+    anti = []
+    x = row_start
+    y = col_start
+    while x >= row_end and y <= col_end:
+        anti.append(matrix[x][y])
+        # Thu thập từ dưới cùng của ma trận lên trên cùng
+        x -= 1
+        # Chúng ta vẫn đang thu thập từ trái sang phải
+        # vì vậy chúng ta vẫn tăng y
+        y += 1
+    return anti
+
+
+def build_win_masks(n: int, k: int) -> List[List[int]]:
+    """
+    Với mỗi ô của bàn cờ n x n, tạo danh sách bitmask của mọi đoạn k ô liên tiếp
+    (theo 4 hướng) có chứa ô đó. Một nước đi thắng khi và chỉ khi các quân cờ của
+    người chơi phủ kín ít nhất một trong các bitmask của ô vừa đánh.
+
+    Đối số:
+        n (int): Số ô vuông cho mỗi bên của bàn cờ
+        k (int): Số lượng quân cờ liên tiếp để thắng
+
+    Trả về:
+        List[List[int]]: masks[idx] là danh sách các đoạn thắng đi qua ô idx
+    """
+    assert k > 1, "Chúng tôi không xử lý các trường hợp tầm thường khi k <= 1"
+    masks: List[List[int]] = [[] for _ in range(n * n)]
+    for row in range(n):
+        for col in range(n):
+            for d_row, d_col in DIRECTIONS:
+                end_row = row + (k - 1) * d_row
+                end_col = col + (k - 1) * d_col
+                if not (0 <= end_row < n and 0 <= end_col < n):
+                    continue
+                cells = [(row + i * d_row) * n + col + i * d_col
+                         for i in range(k)]
+                mask = 0
+                for idx in cells:
+                    mask |= 1 << idx
+                for idx in cells:
+                    masks[idx].append(mask)
+    return masks
+
+
+def build_neighbor_table(n: int) -> List[Tuple[int, ...]]:
+    """
+    Chỉ số phẳng của tối đa 8 ô kề với mỗi ô của bàn cờ n x n
+
+    Đối số:
+        n (int): Số ô vuông cho mỗi bên của bàn cờ
+
+    Trả về:
+        List[Tuple[int, ...]]: table[idx] là các ô kề với ô idx, tăng dần
+    """
+    table = []
+    for move in range(n * n):
+        row, col = divmod(move, n)
+        neighbors = []
+        for d_row in (-1, 0, 1):
+            for d_col in (-1, 0, 1):
+                r, c = row + d_row, col + d_col
+                if (d_row or d_col) and 0 <= r < n and 0 <= c < n:
+                    neighbors.append(r * n + c)
+        table.append(tuple(neighbors))
+    return table
+
+
+def build_symmetry_permutations(n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Hoán vị chỉ số ô cho 8 phép đối xứng của bàn cờ vuông (4 phép quay, có và
+    không lật). Với bàn cờ phẳng `cells`, `cells[perms[i]]` là bàn cờ sau phép
+    biến đổi i; `inverse[i]` đưa chỉ số về như cũ. Phép 0 là phép đồng nhất.
+
+    Đối số:
+        n (int): Số ô vuông cho mỗi bên của bàn cờ
+
+    Trả về:
+        Tuple[np.ndarray, np.ndarray]: (perms, inverse), mỗi mảng có hình dạng (8, n*n)
+    """
+    grid = np.arange(n * n).reshape(n, n)
+    perms = []
+    for flip in (False, True):
+        base = grid.T if flip else grid
+        for rot in range(4):
+            perms.append(np.rot90(base, rot).ravel())
+    perms_arr = np.stack(perms)
+    inverse = np.argsort(perms_arr, axis=1)
+    perms_arr.flags.writeable = False
+    inverse.flags.writeable = False
+    return perms_arr, inverse
+
+
+class MNKTables(NamedTuple):
+    """
+    Các bảng tra cứu của một cặp (n, k), dùng chung cho mọi phiên bản trò chơi
+    """
+    # Giá trị hàng của từng ô trong số nguyên thập phân: ô 0 là chữ số cao nhất
+    place_values: List[int]
+    # Chỉ số các ô trên 4 đường đi qua mỗi ô, xem build_line_table
+    lines: List[LineTable]
+    # Bitmask các đoạn thắng đi qua mỗi ô, xem build_win_masks
+    win_masks: List[List[int]]
+    # Các ô kề với mỗi ô, xem build_neighbor_table
+    neighbors: List[Tuple[int, ...]]
+    # Hoán vị của 8 phép đối xứng và nghịch đảo của chúng
+    symmetries: np.ndarray
+    inverse_symmetries: np.ndarray
+
+
+@functools.lru_cache(maxsize=None)
+def get_tables(n: int, k: int) -> MNKTables:
+    """
+    Tạo (một lần cho mỗi tiến trình) và trả về các bảng tra cứu cho bàn cờ n x n,
+    thắng khi có k quân liên tiếp
+
+    Đối số:
+        n (int): Số ô vuông cho mỗi bên của bàn cờ
+        k (int): Số lượng quân cờ liên tiếp để thắng
+
+    Trả về:
+        MNKTables: Các bảng tra cứu dùng chung
+    """
+    symmetries, inverse_symmetries = build_symmetry_permutations(n)
+    return MNKTables(
+        place_values=[10 ** (n * n - 1 - idx) for idx in range(n * n)],
+        lines=build_line_table(n, k),
+        win_masks=build_win_masks(n, k),
+        neighbors=build_neighbor_table(n),
+        symmetries=symmetries,
+        inverse_symmetries=inverse_symmetries,
+    )
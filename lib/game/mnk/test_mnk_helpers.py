@@ -0,0 +1,151 @@
+import pytest
+import random
+from lib.game.mnk import mnk_helpers
+
+
+class TestGetters:
+    @pytest.fixture
+    def tictactoe_board(self):
+        return [
+            [1, -1, 1],
+            [-1, -1, 0],
+            [0, -1, 1]
+        ]
+
+    def test_get_col(self, tictactoe_board):
+        assert mnk_helpers.get_col(tictactoe_board, [0, 0]) == [1, -1, 0]
+        assert mnk_helpers.get_col(tictactoe_board, [1, 0]) == [1, -1, 0]
+        assert mnk_helpers.get_col(
+            tictactoe_board, [2, 1]) == [-1, -1, -1]
+        assert mnk_helpers.get_col(tictactoe_board, [1, 2]) == [1, 0, 1]
+
+    def test_get_diag(self, tictactoe_board):
+        assert mnk_helpers.get_diag(
+            tictactoe_board, [0, 0]) == [1, -1, 1]
+        assert mnk_helpers.get_diag(tictactoe_board, [1, 0]) == [-1, -1]
+        assert mnk_helpers.get_diag(tictactoe_board, [2, 1]) == [-1, -1]
+        assert mnk_helpers.get_diag(tictactoe_board, [1, 2]) == [-1, 0]
+        assert mnk_helpers.get_diag(
+            tictactoe_board, [1, 1]) == [1, -1, 1]
+
+    def test_get_antidiag(self, tictactoe_board):
+        assert mnk_helpers.get_antidiag(tictactoe_board, [0, 0]) == [1]
+        assert mnk_helpers.get_antidiag(
+            tictactoe_board, [1, 0]) == [-1, -1]
+        assert mnk_helpers.get_antidiag(
+            tictactoe_board, [2, 1]) == [-1, 0]
+        assert mnk_helpers.get_antidiag(
+            tictactoe_board, [1, 2]) == [-1, 0]
+        assert mnk_helpers.get_antidiag(
+            tictactoe_board, [1, 1]) == [0, -1, 1]
+
+
+class TestKInARow:
+    def test_short_arr(self):
+        assert mnk_helpers.k_in_a_row([1, 1, 1], 3, 1) == True
+        assert mnk_helpers.k_in_a_row([-1, -1, -1], 3, -1) == True
+        assert mnk_helpers.k_in_a_row([1, 0, 1], 3, 1) == False
+        assert mnk_helpers.k_in_a_row([-1, -1, 1], 3, -1) == False
+
+    def test_long_arr(self):
+        assert mnk_helpers.k_in_a_row([1, 1, 1, 0], 3, 1) == True
+        assert mnk_helpers.k_in_a_row([0, -1, -1, -1], 3, -1) == True
+        assert mnk_helpers.k_in_a_row([1, 0, 1, 1], 3, 1) == False
+        assert mnk_helpers.k_in_a_row([-1, 1, -1, 1], 3, -1) == False
+
+
+class TestCheckWin:
+    def check_col_win(self):
+        board = [
+            [1, -1, 1],
+            [0, -1, 0],
+            [0, -1, 1]
+        ]
+        assert mnk_helpers.check_win(board, 3, -1) == True
+        assert mnk_helpers.check_win(board, 3, 1) == False
+
+    def check_row_win(self):
+        board = [
+            [1, 1, 1],
+            [0, -1, 0],
+            [0, -1, 1]
+        ]
+        assert mnk_helpers.check_win(board, 3, 1) == True
+        assert mnk_helpers.check_win(board, 3, -1) == False
+
+    def check_diag_win(self):
+        board = [
+            [1, -1, 1],
+            [0, 1, 0],
+            [0, -1, 1]
+        ]
+        assert mnk_helpers.check_win(board, 3, 1) == True
+        assert mnk_helpers.check_win(board, 3, -1) == False
+
+    def check_antidiag_win(self):
+        board = [
+            [0, -1, 1],
+            [0, 1, 0],
+            [1, -1, 1]
+        ]
+        assert mnk_helpers.check_win(board, 3, 1) == True
+        assert mnk_helpers.check_win(board, 3, -1) == False
+
+    def no_win(self):
+        board = [
+            [0, -1, 1],
+            [0, 0, 0],
+            [1, -1, 1]
+        ]
+        assert mnk_helpers.check_win(board, 3, 1) == False
+        assert mnk_helpers.check_win(board, 3, -1) == False
+
+
+class TestCheckWinLines:
+    def test_matches_check_win(self):
+        # Chơi các ván ngẫu nhiên cho đến khi có người thắng, so sánh ở từng nước đi
+        rng = random.Random(0)
+        for _ in range(100):
+            n = rng.choice([3, 5, 7])
+            k = rng.choice([3, 4])
+            board = [[2] * n for _ in range(n)]
+            table = mnk_helpers.build_line_table(n, k)
+            moves = list(range(n * n))
+            rng.shuffle(moves)
+            for turn, move in enumerate(moves):
+                token = turn % 2
+                row, col = divmod(move, n)
+                board[row][col] = token
+                cells = [cell for row_cells in board for cell in row_cells]
+                won = mnk_helpers.check_win(board, (row, col), k, token)
+                assert mnk_helpers.check_win_lines(
+                    cells, table[move], k, token) == won
+                if won:
+                    break
+
+
+class TestTables:
+    def test_tables_are_shared(self):
+        from lib.game.caro_15x15.caro_15x15 import Caro15x15
+        from lib.game.mnk_bitboard.mnk_bitboard import MNKBitboard
+        assert mnk_helpers.get_tables(15, 5) is mnk_helpers.get_tables(15, 5)
+        assert Caro15x15().tables is MNKBitboard(15, 5).tables
+
+    def test_neighbors(self):
+        table = mnk_helpers.build_neighbor_table(3)
+        assert table[0] == (1, 3, 4)
+        assert table[4] == (0, 1, 2, 3, 5, 6, 7, 8)
+        assert table[5] == (1, 2, 4, 7, 8)
+
+    def test_symmetries(self):
+        perms, inverse = mnk_helpers.build_symmetry_permutations(3)
+        cells = [0, 1, 2, 3, 4, 5, 6, 7, 8]
+        images = {tuple(perm) for perm in perms}
+        assert len(images) == 8
+        assert tuple(perms[0]) == tuple(cells)
+        # quay 90 độ ngược chiều kim đồng hồ
+        assert (2, 5, 8, 1, 4, 7, 0, 3, 6) in images
+        # lật qua đường chéo chính
+        assert (0, 3, 6, 1, 4, 7, 2, 5, 8) in images
+        for perm, inv in zip(perms, inverse):
+            assert list(perm[inv]) == cells
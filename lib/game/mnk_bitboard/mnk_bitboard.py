@@ -0,0 +1,275 @@
+import numpy as np
+from lib.game.game import BaseGame
+from lib.game.mnk import mnk_helpers
+from lib.game.mnk_bitboard import mnk_bitboard_helpers
+from typing import List, Optional, Tuple
+
+Matrix = List[List[int]]
+
+
+class MNKBitboard(BaseGame):
+    """
+    Trò chơi m,n,k (https://en.wikipedia.org/wiki/M,n,k-game) với n=m,
+    giống hệt các lớp Caro*/TicTacToe nhưng trạng thái MCTS được biểu diễn
+    bằng bitboard thay vì số nguyên thập phân mỗi ô một chữ số.
+    Mỗi người chơi có một bitmask n*n bit, bit thứ i tương ứng với ô thứ i
+    (từ trên xuống dưới, từ trái sang phải), ví dụ trên bàn cờ 3x3:
+    |0|1|2|
+    |3|4|5|
+    |6|7|8|
+    Trạng thái MCTS là một số nguyên duy nhất ghép hai bitmask:
+    bit [0, n*n) là quân của người chơi 0 (trắng),
+    bit [n*n, 2*n*n) là quân của người chơi 1 (đen).
+    Nhờ vậy khóa MCTS nhỏ hơn, băm nhanh hơn và các thao tác đi quân,
+    kiểm tra nước hợp lệ, mã hóa đầu vào mạng đều là phép toán bit.
+    """
+
+    def __init__(self, n: int = 15, k_to_win: int = 5):
+        """
+        Tạo một phiên bản của trò chơi.
+
+        Đối số:
+            n (int, tùy chọn): Số ô vuông cho mỗi bên của bàn cờ.
+            Mặc định là 15.
+            k_to_win (int, tùy chọn): Số lượng quân cờ liên tiếp để thắng.
+            Mặc định là 5.
+        """
+        super().__init__()
+        self.board_len = n
+        self.k_to_win = k_to_win
+        self.player_black = 1
+        self.player_white = 0
+        self.empty = 2
+        self.cells = n * n
+        self.full_mask = (1 << self.cells) - 1
+        # Các bảng tra cứu dùng chung với MNKGame, tính một lần cho mỗi tiến trình
+        self.tables = mnk_helpers.get_tables(n, k_to_win)
+        # Các đoạn thắng đi qua mỗi ô
+        self._win_masks = self.tables.win_masks
+
+    @property
+    def initial_state(self) -> int:
+        """
+        Trạng thái ban đầu của trò chơi ở dạng MCTS: cả hai bitmask đều rỗng.
+        """
+        return 0
+
+    @property
+    def obs_shape(self) -> Tuple[int, ...]:
+        """
+        Hình dạng của mạng nơ-ron dạng trạng thái trò chơi:
+        2 người chơi x board_len x board_len
+        """
+        return (2, self.board_len, self.board_len)
+
+    @property
+    def action_space(self) -> int:
+        """
+        Tổng số tất cả các hành động có thể thực hiện được, tức là số ô trên bàn cờ
+
+        Trả về:
+        (int): tổng số các hành động có thể thực hiện được
+        """
+        return self.cells
+
+    def player_bits(self, mcts_state: int, player: int) -> int:
+        """
+        Lấy bitmask các quân cờ của một người chơi
+
+        Đối số:
+            mcts_state (int): Trạng thái trò chơi ở dạng MCTS
+            player (int): 0 hoặc 1
+
+        Trả về:
+            int: Bitmask n*n bit
+        """
+        return (mcts_state >> (player * self.cells)) & self.full_mask
+
+    def occupied_bits(self, mcts_state: int) -> int:
+        """
+        Bitmask các ô đã có quân (của bất kỳ người chơi nào)
+
+        Đối số:
+            mcts_state (int): Trạng thái trò chơi ở dạng MCTS
+
+        Trả về:
+            int: Bitmask n*n bit
+        """
+        return (mcts_state | (mcts_state >> self.cells)) & self.full_mask
+
+    def encode_game_state(self, state_list: Matrix) -> int:
+        """
+        Chuyển đổi trạng thái trò chơi từ dạng Ma trận (0, 1 là quân cờ, 2 là ô trống)
+        sang dạng bitboard
+
+        Đối số:
+            state_list (Ma trận): Trạng thái trò chơi dưới dạng danh sách các danh sách mã thông báo
+
+        Trả về:
+            int: Trạng thái trò chơi dưới dạng bitboard
+        """
+        state = 0
+        for row_idx, row in enumerate(state_list):
+            for col_idx, cell in enumerate(row):
+                if cell != self.empty:
+                    idx = row_idx * self.board_len + col_idx
+                    state |= 1 << (idx + cell * self.cells)
+        return state
+
+    def convert_mcts_state_to_list_state(self, mcts_state: int) -> Matrix:
+        """
+        Chuyển đổi trạng thái bitboard sang dạng Ma trận mã thông báo,
+        cùng quy ước với các lớp Caro* (0, 1 là quân cờ, 2 là ô trống)
+
+        Đối số:
+            mcts_state (int): Trạng thái trò chơi ở dạng MCTS
+
+        Trả về:
+            (Ma trận): Trạng thái trò chơi dạng danh sách danh sách mã thông báo
+        """
+        board = self.state_cells(mcts_state).astype(np.int64)
+        return board.reshape(self.board_len, self.board_len).tolist()
+
+    def state_cells(self, mcts_state: int) -> np.ndarray:
+        """
+        Bàn cờ phẳng dưới dạng mảng NumPy, cùng quy ước với MNKGame
+        (0, 1 là quân cờ, 2 là ô trống)
+
+        Đối số:
+            mcts_state (int): Trạng thái trò chơi ở dạng MCTS
+
+        Trả về:
+            np.ndarray: Mảng uint8 độ dài action_space
+        """
+        bits = mnk_bitboard_helpers.unpack_states(
+            [mcts_state], 2 * self.cells)[0]
+        board = np.full(self.cells, self.empty, dtype=np.uint8)
+        board[bits[:self.cells] == 1] = self.player_white
+        board[bits[self.cells:] == 1] = self.player_black
+        return board
+
+    def possible_moves(self, mcts_state: int) -> List:
+        """
+        Trả về chỉ số của các ô trống, từ trái sang phải, từ trên xuống dưới
+
+        Đối số:
+            mcts_state (int): Trạng thái trò chơi ở dạng MCTS
+
+        Trả về:
+            List: Danh sách các nước đi hợp lệ
+        """
+        empty_bits = self.full_mask ^ self.occupied_bits(mcts_state)
+        return mnk_bitboard_helpers.bit_indices(empty_bits, self.cells)
+
+    def invalid_moves(self, mcts_state: int) -> List:
+        """
+        Trả về các ô không trống
+
+        Đối số:
+            mcts_state (int): Trạng thái trò chơi ở dạng MCTS
+
+        Trả về:
+            List: Danh sách các nước đi không hợp lệ (ô đã chiếm)
+        """
+        return mnk_bitboard_helpers.bit_indices(self.occupied_bits(mcts_state), self.cells)
+
+    def legal_moves_mask(self, mcts_state: int) -> np.ndarray:
+        """
+        Mặt nạ các ô trống, giải nén trực tiếp từ bitmask các ô chưa có quân
+
+        Đối số:
+            mcts_state (int): Trạng thái trò chơi ở dạng MCTS
+
+        Trả về:
+            np.ndarray: Mảng bool độ dài action_space
+        """
+        empty_bits = self.full_mask ^ self.occupied_bits(mcts_state)
+        return mnk_bitboard_helpers.unpack_states([empty_bits], self.cells)[0].astype(bool)
+
+    def empty_count(self, mcts_state: int) -> int:
+        """
+        Số ô trống của bàn cờ: số ô trừ số bit đã bật
+
+        Đối số:
+            mcts_state (int): Trạng thái trò chơi ở dạng MCTS
+
+        Trả về:
+            int: Số ô trống
+        """
+        return self.cells - mnk_bitboard_helpers.popcount(mcts_state)
+
+    def states_to_training_batch(self, state_ints: List[int],
+                                 who_moves_lists: List[int],
+                                 out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Chuyển đổi trạng thái trò chơi thành các mảng có thể đưa vào mạng nơ-ron
+        bằng cách giải nén bit hàng loạt
+
+        Đối số:
+            state_ints (List[int]): Danh sách các trạng thái trò chơi ở dạng MCTS
+            who_moves_lists (List[int]): Danh sách tương ứng của người chơi có nước đi
+            out (np.ndarray, tùy chọn): Bộ đệm float32 cấp phát sẵn có ít nhất
+            len(state_ints) hàng để ghi kết quả vào. Mặc định là None (cấp phát mới).
+
+        Trả về:
+            np.array: mảng (len(state_ints), 2, board_len, board_len), kênh 0 là
+            quân của người chơi có nước đi, kênh 1 là quân của đối thủ
+        """
+        batch_size = len(state_ints)
+        bits = mnk_bitboard_helpers.unpack_states(list(state_ints), 2 * self.cells)
+        planes = bits.reshape((batch_size, 2) + self.obs_shape[1:])
+        who_move = np.asarray(who_moves_lists, dtype=np.int64)
+        rows = np.arange(batch_size)
+        if out is None:
+            batch = np.empty((batch_size,) + self.obs_shape, dtype=np.float32)
+        else:
+            assert out.shape[1:] == self.obs_shape and out.dtype == np.float32
+            batch = out[:batch_size]
+        batch[:, 0] = planes[rows, who_move]
+        batch[:, 1] = planes[rows, 1 - who_move]
+        return batch
+
+    def move(self, mcts_state: int, move: int, player: int) -> Tuple[int, bool]:
+        """
+        Ở trạng thái trò chơi nhất định, thực hiện một nước đi (hợp lệ) của một người chơi được chỉ định
+
+        Đối số:
+            mcts_state (int): Trạng thái trò chơi ở dạng MCTS
+            move (int): Chỉ số ô vuông trên bàn cờ
+            player (int): 0 hoặc 1, người chơi nào đang thực hiện nước đi
+
+        Trả về:
+            Tuple[int, bool]: Trạng thái trò chơi mới & nếu trò chơi đã được thắng bởi
+            người chơi vừa thực hiện nước đi
+        """
+        assert player == self.player_white or player == self.player_black
+        assert move >= 0 and move < self.action_space
+        assert not (self.occupied_bits(mcts_state) >> move) & 1
+
+        new_mcts_state = mcts_state | (1 << (move + player * self.cells))
+        own = self.player_bits(new_mcts_state, player)
+        won = any(own & mask == mask for mask in self._win_masks[move])
+        return new_mcts_state, won
+
+    def render(self, mcts_state: int) -> str:
+        """
+        Biểu diễn chuỗi của bảng, để tương tác với người chơi
+
+        Đối số:
+            mcts_state (int): Trạng thái trò chơi ở dạng MCTS
+
+        Trả về:
+            str: Biểu diễn chuỗi của trạng thái trò chơi
+        """
+        list_state = self.convert_mcts_state_to_list_state(mcts_state)
+        for row_idx, row in enumerate(list_state):
+            for col_idx, cell in enumerate(row):
+                if cell == self.empty:
+                    list_state[row_idx][col_idx] = str(
+                        row_idx * self.board_len + col_idx)
+                elif cell == self.player_white:
+                    list_state[row_idx][col_idx] = "❌"
+                elif cell == self.player_black:
+                    list_state[row_idx][col_idx] = "⭕"
+        list_str = [f'|{"|".join(row)}|' for row in list_state]
+        return '\n'.join(list_str)
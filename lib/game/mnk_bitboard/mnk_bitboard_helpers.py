@@ -0,0 +1,67 @@
+from typing import Iterator, List
+
+import numpy as np
+
+
+def popcount(x: int) -> int:
+    """
+    Đếm số bit 1 trong một số nguyên không âm
+
+    Đối số:
+        x (int): Bitmask
+
+    Trả về:
+        int: Số bit được bật
+    """
+    return bin(x).count("1")
+
+
+def iter_bits(x: int) -> Iterator[int]:
+    """
+    Duyệt qua chỉ số của các bit được bật, từ bit thấp đến bit cao
+
+    Đối số:
+        x (int): Bitmask
+
+    Trả về:
+        Iterator[int]: Chỉ số của từng bit 1
+    """
+    while x:
+        low = x & -x
+        yield low.bit_length() - 1
+        x ^= low
+
+
+def bit_indices(x: int, n_bits: int) -> List[int]:
+    """
+    Danh sách chỉ số của các bit được bật, tăng dần. Với bitmask dày (ví dụ
+    các ô trống đầu ván) giải nén bằng NumPy nhanh hơn duyệt từng bit.
+
+    Đối số:
+        x (int): Bitmask
+        n_bits (int): Số bit thấp cần xét
+
+    Trả về:
+        List[int]: Chỉ số của từng bit 1
+    """
+    if popcount(x) < 16:
+        return list(iter_bits(x))
+    return np.flatnonzero(unpack_states([x], n_bits)[0]).tolist()
+
+
+def unpack_states(states: List[int], n_bits: int) -> np.ndarray:
+    """
+    Giải nén hàng loạt các số nguyên thành ma trận bit bằng NumPy
+
+    Đối số:
+        states (List[int]): Danh sách các số nguyên không âm
+        n_bits (int): Số bit thấp cần lấy từ mỗi số nguyên
+
+    Trả về:
+        np.ndarray: Mảng uint8 kích thước (len(states), n_bits),
+        cột i là bit thứ i của mỗi số
+    """
+    n_bytes = (n_bits + 7) // 8
+    raw = b''.join(state.to_bytes(n_bytes, 'little') for state in states)
+    packed = np.frombuffer(raw, dtype=np.uint8).reshape(len(states), n_bytes)
+    return np.unpackbits(packed, axis=1, bitorder='little')[:, :n_bits]
@@ -0,0 +1,82 @@
+import random
+import pytest
+import numpy as np
+from lib.game.mnk_bitboard.mnk_bitboard import MNKBitboard
+from lib.game.tictactoe.tictactoe import TicTacToe
+from lib.game.caro_7x7.caro_7x7 import Caro7x7
+
+
+@pytest.fixture
+def game():
+    return MNKBitboard(3, 3)
+
+
+def play_random(game, digits_game, seed):
+    """Chơi ngẫu nhiên song song trên hai cách biểu diễn, so sánh từng bước"""
+    rng = random.Random(seed)
+    state = game.initial_state
+    digits_state = digits_game.initial_state
+    player = 0
+    while True:
+        moves = game.possible_moves(state)
+        assert moves == digits_game.possible_moves(digits_state)
+        assert game.invalid_moves(state) == digits_game.invalid_moves(digits_state)
+        np.testing.assert_equal(game.legal_moves_mask(state),
+                                digits_game.legal_moves_mask(digits_state))
+        assert game.empty_count(state) == digits_game.empty_count(digits_state)
+        if not moves:
+            return
+        action = rng.choice(moves)
+        state, won = game.move(state, action, player)
+        digits_state, digits_won = digits_game.move(digits_state, action, player)
+        assert won == digits_won
+        assert game.convert_mcts_state_to_list_state(state) == \
+            digits_game.convert_mcts_state_to_list_state(digits_state)
+        np.testing.assert_equal(
+            game.states_to_training_batch([state, state], [0, 1]),
+            digits_game.states_to_training_batch([digits_state, digits_state], [0, 1]))
+        if won:
+            return
+        player = 1 - player
+
+
+class TestEncoding:
+    def test_encode_roundtrip(self, game):
+        state = [
+            [0, 1, 0],
+            [2, 2, 0],
+            [0, 1, 1],
+        ]
+        mcts_state = game.encode_game_state(state)
+        assert game.convert_mcts_state_to_list_state(mcts_state) == state
+        assert game.possible_moves(mcts_state) == [3, 4]
+        assert game.invalid_moves(mcts_state) == [0, 1, 2, 5, 6, 7, 8]
+
+    def test_initial_state(self, game):
+        assert game.initial_state == 0
+        assert game.possible_moves(game.initial_state) == list(range(9))
+
+
+class TestMove:
+    def test_winning_moves(self, game):
+        board = game.encode_game_state([[0, 0, 2], [1, 1, 2], [1, 2, 2]])
+        new_board, won = game.move(board, 2, 0)
+        assert won == True
+        assert game.convert_mcts_state_to_list_state(new_board) == \
+            [[0, 0, 0], [1, 1, 2], [1, 2, 2]]
+
+        board = game.encode_game_state([[1, 2, 0], [1, 0, 2], [2, 1, 2]])
+        _, won = game.move(board, 6, 0)
+        assert won == True
+
+        board = game.encode_game_state([[1, 2, 0], [1, 0, 2], [0, 1, 2]])
+        _, won = game.move(board, 8, 1)
+        assert won == False
+
+    def test_same_as_digits_tictactoe(self, game):
+        for seed in range(20):
+            play_random(game, TicTacToe(3, 3), seed)
+
+    def test_same_as_digits_caro(self):
+        for seed in range(10):
+            play_random(MNKBitboard(7, 4), Caro7x7(), seed)
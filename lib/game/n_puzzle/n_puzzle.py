@@ -1,7 +1,7 @@
 # lib/game/n_puzzle/n_puzzle.py
 
 import numpy as np
-from typing import Tuple, List, Dict
+from typing import Tuple, List, Dict, Optional
 from lib.game.game import BaseGame
 from lib.game.n_puzzle.n_puzzle_helper import NPuzzleHelper, DIRECTIONS
 
@@ -76,13 +76,17 @@ class NPuzzle(BaseGame):
             
         return new_mcts_state, won
 
-    def states_to_training_batch(self, mcts_states: List[int], who_moves_lists: List[int]) -> np.ndarray:
+    def states_to_training_batch(self, mcts_states: List[int], who_moves_lists: List[int],
+                                 out: Optional[np.ndarray] = None) -> np.ndarray:
         """
         Chuyển đổi danh sách các trạng thái MCTS thành một lô để huấn luyện.
-        `who_moves_lists` bị bỏ qua.
+        `who_moves_lists` bị bỏ qua. Nếu có `out`, kết quả được ghi vào đó.
         """
         batch_size = len(mcts_states)
-        batch = np.zeros((batch_size, *self.obs_shape), dtype=np.float32)
+        if out is None:
+            batch = np.zeros((batch_size, *self.obs_shape), dtype=np.float32)
+        else:
+            batch = out[:batch_size]
         for i, state_hash in enumerate(mcts_states):
             board = self._get_board_from_state(state_hash)
             # Bình thường hóa các giá trị ô để cải thiện việc huấn luyện
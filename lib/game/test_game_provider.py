@@ -0,0 +1,35 @@
+import argparse
+import pytest
+from lib.game import game_provider
+
+
+def parse(argv):
+    parser = argparse.ArgumentParser()
+    game_provider.add_game_argument(parser)
+    return parser.parse_args(argv)
+
+
+class TestGetGame:
+    def test_registered_games(self):
+        for game_id, (_, _, n, k_to_win) in game_provider.GAMES.items():
+            game = game_provider.get_game(parse(["-g", game_id]))
+            assert (game.board_len, game.k_to_win) == (n, k_to_win)
+            bitboard = game_provider.get_game(parse(["-g", game_id, "--board-repr", "bitboard"]))
+            assert type(bitboard).__name__ == "MNKBitboard"
+            assert (bitboard.board_len, bitboard.k_to_win) == (n, k_to_win)
+
+    def test_module_path(self):
+        game = game_provider.get_game(parse(["-g", "lib.game.caro_7x7.caro_7x7:Caro7x7"]))
+        assert type(game).__name__ == "Caro7x7"
+
+    def test_register_game(self):
+        game_provider.register_game("test-4x4", "Caro 4x4", "lib.game.mnk.mnk:MNKGame", 4, 3)
+        try:
+            game = game_provider.get_game(parse(["-g", "test-4x4"]))
+            assert (game.board_len, game.k_to_win) == (4, 3)
+        finally:
+            del game_provider.GAMES["test-4x4"]
+
+    def test_invalid_game(self):
+        with pytest.raises(SystemExit):
+            parse(["-g", "42"])
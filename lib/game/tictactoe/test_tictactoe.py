@@ -58,6 +58,31 @@ class TestPossibleMoves:
         assert game.invalid_moves(mcts_state) == [1, 5, 6, 7]
 
 
+class TestLegalMoves:
+    def test_legal_moves_mask(self, game):
+        mcts_state = int("010220011")
+        np.testing.assert_equal(game.legal_moves_mask(mcts_state),
+                                [False, False, False, True, True, False, False, False, False])
+        assert game.empty_count(mcts_state) == 2
+        assert game.empty_count(game.initial_state) == 9
+
+    def test_mask_follows_moves(self, game):
+        other = TicTacToe(3, 3)
+        state = game.initial_state
+        played = []
+        for player, move in enumerate([4, 0, 8, 1]):
+            state, _ = game.move(state, move, player % 2)
+            played.append(move)
+            # sau mỗi nước đi, mặt nạ chỉ loại đúng các ô đã đánh (kể cả các chữ số 0 đứng đầu)
+            expected = np.ones(9, dtype=bool)
+            expected[played] = False
+            np.testing.assert_equal(game.legal_moves_mask(state), expected)
+            assert game.empty_count(state) == 9 - len(played)
+            # một phiên bản khác chưa từng thấy các trạng thái này cho cùng kết quả
+            np.testing.assert_equal(other.legal_moves_mask(state), expected)
+            assert other.empty_count(state) == 9 - len(played)
+
+
 class TestStatesToTrainingBatch:
     def test_states_to_training_batch(self, game):
         states = [int('001010221'), int('101222001')]
@@ -97,6 +122,16 @@ class TestStatesToTrainingBatch:
 
         np.testing.assert_equal(batch, [batch_state_1, batch_state_2])
 
+    def test_states_to_training_batch_out(self, game):
+        states = [int('001010221'), int('101222001')]
+        who_moves = [1, 0]
+        out = np.full((4,) + game.obs_shape, 7.0, dtype=np.float32)
+        batch = game.states_to_training_batch(states, who_moves, out=out)
+        assert batch.base is out or batch.base is out.base
+        np.testing.assert_equal(batch, game.states_to_training_batch(states, who_moves))
+        # các hàng thừa của bộ đệm không bị chạm đến
+        np.testing.assert_equal(out[2:], 7.0)
+
 
 class TestMove:
     def test_moves(self, game):
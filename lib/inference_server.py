@@ -0,0 +1,174 @@
+"""
+Máy chủ suy luận: một tiến trình duy nhất giữ mạng nơ-ron và đánh giá lá cho nhiều
+cây MCTS ở các tiến trình khác. Các yêu cầu nhỏ của khách được gộp thành lô động
+(tối đa max_batch trạng thái hoặc chờ tối đa max_wait giây) trước khi đưa vào mạng.
+"""
+import queue
+import time
+from multiprocessing.process import BaseProcess
+from typing import List, Optional, Tuple
+
+import numpy as np
+import torch
+import torch.multiprocessing as mp
+
+import config as cfg
+from lib.evaluator import Evaluator
+from lib.game.game import BaseGame
+from lib.model import Net, SharedWeights
+
+
+def _server_loop(game: BaseGame, weights: SharedWeights, requests, responses: List,
+                 stats, device: str, threads: int, max_batch: int, max_wait: float) -> None:
+    """
+    Vòng lặp của tiến trình máy chủ: nhận yêu cầu đầu tiên, gom thêm cho tới khi đủ
+    max_batch trạng thái hoặc hết max_wait giây, đánh giá cả lô và trả kết quả cho từng khách.
+    Yêu cầu None là tín hiệu dừng.
+    """
+    torch.set_num_threads(threads)
+    net = Net(game.obs_shape, game.action_space).to(device)
+    # mọi khách dùng chung một bộ nhớ đệm đánh giá trong tiến trình máy chủ
+    evaluator = Evaluator(net, game, device, batch_size=max_batch)
+    version = -1
+    while True:
+        request = requests.get()
+        if request is None:
+            return
+        pending = [request]
+        size = len(request[2])
+        deadline = time.time() + max_wait
+        stop = False
+        while size < max_batch:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            try:
+                request = requests.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if request is None:
+                stop = True
+                break
+            pending.append(request)
+            size += len(request[2])
+
+        # nạp trọng số mới (nếu có) cũng đổi phiên bản của mạng, bộ nhớ đệm tự bỏ các mục cũ
+        version = weights.load_into(net, version)
+        states = [state for _, _, req_states, _ in pending for state in req_states]
+        players = [player for _, _, _, req_players in pending for player in req_players]
+        probs, values = evaluator(states, players)
+        offset = 0
+        for client_id, request_id, req_states, _ in pending:
+            end = offset + len(req_states)
+            responses[client_id].put((request_id, probs[offset:end], values[offset:end]))
+            offset = end
+        with stats.get_lock():
+            stats[0] += 1
+            stats[1] += len(states)
+        if stop:
+            return
+
+
+def _served_remotely(batch: torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor]:
+    """
+    Mạng của InferenceClient: lá được đánh giá ở tiến trình máy chủ nên khách không bao giờ
+    gọi mạng tại chỗ
+    """
+    raise RuntimeError("InferenceClient đánh giá lá ở máy chủ suy luận, không có mạng tại chỗ")
+
+
+class InferenceClient(Evaluator):
+    """
+    Bộ đánh giá phía khách: gửi lô lá tới máy chủ suy luận và chờ kết quả. Dùng được ở mọi
+    chỗ nhận Evaluator (MCTS.search_batch, play_game, ...). Mỗi khách chỉ được dùng bởi
+    một luồng tại một thời điểm.
+    """
+
+    def __init__(self, game: BaseGame, client_id: int, requests, responses):
+        # mạng và bộ nhớ đệm nằm ở máy chủ (nơi biết phiên bản trọng số), khách không cần
+        # bộ đệm đầu vào vì trạng thái được gửi đi ở dạng MCTS
+        super().__init__(_served_remotely, game, batch_size=0, use_cache=False)
+        self.client_id = client_id
+        self._requests = requests
+        self._responses = responses
+        self._request_id = 0
+
+    def _evaluate(self, states: List[int], players: List[int]) -> Tuple[np.ndarray, np.ndarray]:
+        self._request_id += 1
+        request_id = self._request_id
+        self._requests.put((self.client_id, request_id, list(states), list(players)))
+        response_id, probs, values = self._responses.get()
+        assert response_id == request_id, "phản hồi không khớp yêu cầu"
+        return probs, values
+
+
+class InferenceServer:
+    """
+    Tiến trình máy chủ suy luận cùng các kênh (hàng đợi tiến trình) cho một số khách cố định.
+    Trọng số được cập nhật bằng publish() qua bộ nhớ dùng chung (SharedWeights).
+    """
+
+    def __init__(self, game: BaseGame, net: Net, clients: int, device: str = "cpu",
+                 threads: int = cfg.INFERENCE_THREADS, max_batch: int = cfg.INFERENCE_MAX_BATCH,
+                 max_wait: float = cfg.INFERENCE_MAX_WAIT, ctx=None):
+        """
+        Đối số:
+            game (BaseGame): Trò chơi
+            net (Net): Mạng có trọng số ban đầu
+            clients (int): Số khách, mỗi khách có hàng đợi phản hồi riêng
+            device (str, tùy chọn): Thiết bị PyTorch của máy chủ. Mặc định là "cpu".
+            threads (int, tùy chọn): Số luồng torch của máy chủ. Mặc định là cfg.INFERENCE_THREADS.
+            max_batch (int, tùy chọn): Số trạng thái tối đa mỗi lô. Mặc định là cfg.INFERENCE_MAX_BATCH.
+            max_wait (float, tùy chọn): Thời gian chờ gom lô tối đa (giây) tính từ yêu cầu đầu tiên.
+            Mặc định là cfg.INFERENCE_MAX_WAIT.
+            ctx (multiprocessing context, tùy chọn): Ngữ cảnh tạo tiến trình, phải trùng với
+            ngữ cảnh của các tiến trình khách. Mặc định là "spawn".
+        """
+        self.game = game
+        self._ctx = ctx or mp.get_context("spawn")
+        self.weights = SharedWeights(net, self._ctx)
+        self._requests = self._ctx.Queue()
+        self._responses = [self._ctx.Queue() for _ in range(clients)]
+        # số lô và số trạng thái đã đánh giá
+        self._stats = self._ctx.Array('q', 2)
+        self._args = (device, threads, max_batch, max_wait)
+        self._process: Optional[BaseProcess] = None
+
+    def client(self, client_id: int) -> InferenceClient:
+        """
+        Trả về:
+            InferenceClient: Khách thứ client_id, có thể chuyển cho tiến trình con khi khởi tạo
+        """
+        return InferenceClient(self.game, client_id, self._requests, self._responses[client_id])
+
+    def publish(self, net: Net) -> int:
+        return self.weights.publish(net)
+
+    def mean_batch_size(self) -> float:
+        """
+        Trả về:
+            float: Số trạng thái trung bình mỗi lần gọi mạng, 0 nếu chưa có lô nào
+        """
+        batches, states = self._stats[0], self._stats[1]
+        return states / batches if batches else 0.0
+
+    def start(self) -> None:
+        process = self._ctx.Process(
+            target=_server_loop, daemon=True,
+            args=(self.game, self.weights, self._requests, self._responses, self._stats) + self._args)
+        process.start()
+        self._process = process
+
+    def stop(self) -> None:
+        if self._process is None:
+            return
+        self._requests.put(None)
+        self._process.join()
+        self._process = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
@@ -1,21 +1,27 @@
 """
 Triển khai MCTS (Monte Carlo Tree Search) cho môi trường trò chơi.
 """
+import bisect
+import sys
+import time
 import math as m
+from concurrent.futures import Future, ThreadPoolExecutor
 import numpy as np
-import torch
-import torch.nn.functional as F
-from typing import Tuple, List, Dict, Optional
+from typing import Callable, Tuple, List, Dict, Optional, Union
 
 import config as cfg
 from lib.model import Net
+from lib.evaluator import Evaluator, as_evaluator
 from lib.game.game import BaseGame
 
 StateInt = int
-VisitCount = Dict[StateInt, List[int]]
-Value = Dict[StateInt, List[float]]
-ValueAverage = Dict[StateInt, List[float]]
-Probs = Dict[StateInt, List[float]]
+# Cạnh đã đi qua: (người chơi, trạng thái con, giá trị nếu trạng thái con là kết thúc)
+Edge = Tuple[int, StateInt, Optional[float]]
+
+VisitCount = Dict[StateInt, np.ndarray]
+Value = Dict[StateInt, np.ndarray]
+ValueAverage = Dict[StateInt, np.ndarray]
+Probs = Dict[StateInt, np.ndarray]
 
 # Triển khai MCTS
 class MCTS:
@@ -23,8 +29,69 @@ class MCTS:
     Lớp lưu giữ số liệu thống kê cho mọi trạng thái gặp phải trong quá trình tìm kiếm
     """
 
-    def __init__(self, game: BaseGame):
+    def __init__(self, game: BaseGame, virtual_loss: int = cfg.VIRTUAL_LOSS,
+                 adaptive_virtual_loss: bool = cfg.VIRTUAL_LOSS_ADAPTIVE,
+                 seed: Optional[int] = None, max_nodes: int = cfg.MCTS_MAX_NODES,
+                 max_bytes: int = cfg.MCTS_MAX_BYTES, eviction: str = cfg.MCTS_EVICTION,
+                 pipeline: bool = cfg.MCTS_PIPELINE):
+        """
+        Đối số:
+            game (BaseGame): Trò chơi
+            virtual_loss (int, tùy chọn): Số lượt thua ảo cộng vào mỗi cạnh của đường đi
+            trong lúc gom lá, để các lượt duyệt trong cùng một lô tỏa ra các lá khác nhau.
+            0 để tắt. Mặc định là cfg.VIRTUAL_LOSS.
+            adaptive_virtual_loss (bool, tùy chọn): Tăng/giảm thua ảo sau mỗi lô để tỷ lệ
+            lấp đầy lô đạt cfg.BATCH_FILL_TARGET. Mặc định là cfg.VIRTUAL_LOSS_ADAPTIVE.
+            seed (int, tùy chọn): Hạt giống cho bộ sinh số ngẫu nhiên của cây (nhiễu Dirichlet
+            ở gốc). Mặc định là None (không cố định).
+            max_nodes (int, tùy chọn): Số nút tối đa của cây, 0 - không giới hạn.
+            Mặc định là cfg.MCTS_MAX_NODES.
+            max_bytes (int, tùy chọn): Bộ nhớ ước tính tối đa của cây (byte), 0 - không giới hạn.
+            Mặc định là cfg.MCTS_MAX_BYTES.
+            eviction (str, tùy chọn): Cách chọn nút để loại khi vượt giới hạn: "lru" - các nút
+            lâu chưa được sao lưu nhất, "visits" - các nút ít lượt truy cập nhất.
+            Mặc định là cfg.MCTS_EVICTION.
+            pipeline (bool, tùy chọn): search_batch gom lô lá tiếp theo trong khi lô hiện tại
+            đang được mạng đánh giá ở luồng nền (search_pipelined). Mặc định là cfg.MCTS_PIPELINE.
+        """
+        if eviction not in ("lru", "visits"):
+            raise ValueError("Cách loại nút không hợp lệ: %s" % eviction)
         self.c_puct = cfg.C_PUCT
+        self.virtual_loss = virtual_loss
+        self.adaptive_virtual_loss = adaptive_virtual_loss
+        self.rng = np.random.default_rng(seed)
+
+        # Phiên tìm kiếm hiện tại: trạng thái gốc và vector nhiễu Dirichlet của nó,
+        # lấy mẫu một lần khi bắt đầu tìm kiếm cho một nước đi
+        self._root_state: Optional[StateInt] = None
+        self._root_noise: Optional[np.ndarray] = None
+
+        # Số lá khác nhau đã gửi tới mạng và tổng số chỗ trong các lô,
+        # dùng để tính tỷ lệ lấp đầy lô
+        self.batch_leaves = 0
+        self.batch_slots = 0
+
+        # Tổng số nút đã tạo (kể cả các nút đã được giải phóng khi đổi gốc)
+        self.nodes_created = 0
+
+        # Giới hạn bộ nhớ và số nút đã bị loại vì vượt giới hạn
+        self.max_nodes = max_nodes
+        self.max_bytes = max_bytes
+        self.eviction = eviction
+        self.evicted_nodes = 0
+
+        self.pipeline = pipeline
+        # Các lá đang được đánh giá ở luồng nền, chưa thành nút, và số lượt truy cập ảo
+        # mà các đường đi của lô đó đang cộng vào gốc
+        self._inflight: set = set()
+        self._inflight_visits = 0
+        # Luồng nền đánh giá lô lá của tìm kiếm đường ống, tạo khi cần và dừng bằng close()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        # Đồng hồ logic tăng sau mỗi lô nhỏ, dùng cho cách loại "lru"
+        self.tick = 0
+        # Lần cuối mỗi nút được tạo hoặc sao lưu, state_int -> tick
+        self.last_touched: Dict[StateInt, int] = {}
 
         # Số lần truy cập vào mỗi trạng thái, state_int -> [N(s, a)]
         self.visit_count: VisitCount = {}
@@ -37,6 +104,16 @@ class MCTS:
 
         # xác suất trước của các hành động, state_int -> [P(s,a)]
         self.probs: Probs = {}
+
+        # Tổng số lần truy cập của mỗi trạng thái, state_int -> sum_a N(s, a)
+        self.visit_total: Dict[StateInt, int] = {}
+
+        # Mặt nạ hành động hợp lệ của mỗi trạng thái, lưu khi tạo nút
+        self.legal: Dict[StateInt, np.ndarray] = {}
+
+        # Bộ nhớ đệm cạnh của mỗi nút: state_int -> {hành động: (người chơi, trạng thái con,
+        # giá trị kết thúc)}, điền lần đầu một cạnh được đi qua để khỏi gọi lại game.move
+        self.children: Dict[StateInt, Dict[int, Edge]] = {}
         self.game = game
 
     # Hàm xoá dữ liệu thống kê cho mọi trạng thái
@@ -45,63 +122,400 @@ class MCTS:
         self.value.clear()
         self.value_avg.clear()
         self.probs.clear()
+        self.visit_total.clear()
+        self.legal.clear()
+        self.last_touched.clear()
+        self.children.clear()
+        self._root_state = None
+        self._root_noise = None
+
+    def close(self) -> None:
+        """
+        Dừng luồng nền của tìm kiếm đường ống (nếu có), gọi khi không dùng cây nữa.
+        Cây vẫn dùng được sau đó, luồng được tạo lại ở lần tìm kiếm đường ống tiếp theo.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
 
     def __len__(self):
         return len(self.value)
 
-    def _add_noise(self, probs: List[float]) -> List[float]:
+    def reroot(self, state_int: StateInt, player: int) -> int:
+        """
+        Chuyển gốc của cây sang trạng thái vừa đạt được sau nước đi thực tế và giải phóng
+        mọi nút không còn đi tới được từ gốc mới, để cây chỉ giữ lại cây con còn có ích.
+        Nếu gốc mới chưa có trong cây (ví dụ trạng thái kết thúc), toàn bộ cây được xoá.
+
+        Đối số:
+            state_int (int): Trạng thái gốc mới
+            player (int): Người chơi đến lượt tại gốc mới
+
+        Trả về:
+            int: Số nút đã được giải phóng
+        """
+        nodes = len(self)
+        if self.is_leaf(state_int):
+            self.clear()
+            return nodes
+        keep = self._reachable(state_int, player)
+        if len(keep) < nodes:
+            self._free_nodes(keep)
+        return nodes - len(keep)
+
+    def _reachable(self, state_int: StateInt, player: int) -> set:
         """
-        Thêm nhiễu vào xác suất hành động để khuyến khích khám phá
+        Tập các nút đi tới được từ một nút qua các cạnh đã được truy cập
 
         Đối số:
-            probs (list): Danh sách xác suất hành động
+            state_int (int): Trạng thái bắt đầu (phải có trong cây)
+            player (int): Người chơi đến lượt tại trạng thái đó
+
+        Trả về:
+            set: Các trạng thái đi tới được, kể cả state_int
+        """
+        keep = {state_int}
+        frontier = [(state_int, player)]
+        while frontier:
+            cur_state, cur_player = frontier.pop()
+            counts, _, _ = self._node_stats(cur_state)
+            for action in np.flatnonzero(counts).tolist():
+                child, value = self._edge_move(cur_state, action, cur_player)
+                if value is None and child not in keep and not self.is_leaf(child):
+                    keep.add(child)
+                    frontier.append((child, 1 - cur_player))
+        return keep
+
+    def _free_nodes(self, keep: set) -> None:
+        """
+        Xoá khỏi cây mọi nút không nằm trong tập cần giữ
+
+        Đối số:
+            keep (set): Các trạng thái cần giữ lại
+        """
+        for state_int in [s for s in self.probs if s not in keep]:
+            for stats in (self.visit_count, self.value, self.value_avg, self.probs,
+                          self.visit_total, self.legal, self.last_touched, self.children):
+                del stats[state_int]
+
+    def _bytes_per_node(self) -> int:
+        """
+        Ước tính số byte của một nút, dùng để đổi giới hạn bộ nhớ thành số nút
+        mà không phải duyệt cả cây như memory_stats()
+
+        Trả về:
+            int: Số byte ước tính của một nút
         """
-        alpha = cfg.ALPHA
+        action_space = self.game.action_space
+        arrays = sys.getsizeof(np.zeros(action_space, dtype=np.int64)) + \
+            2 * sys.getsizeof(np.zeros(action_space)) + \
+            sys.getsizeof(np.zeros(action_space, dtype=np.float32)) + \
+            sys.getsizeof(np.zeros(action_space, dtype=bool))
+        # mỗi nút có một mục (băm, khóa, giá trị) trong 8 dict với hệ số tải khoảng 2/3,
+        # cộng với khóa và các số nguyên tổng/lần cuối sao lưu
+        entries = 8 * 3 * 8 * 3 // 2
+        return arrays + entries + self._key_bytes() + 2 * sys.getsizeof(2 ** 62) + \
+            self._edge_bytes()
+
+    def _edge_bytes(self) -> int:
+        """
+        Kích thước ước tính bộ nhớ đệm cạnh của một nút: một dict nhỏ với một cạnh
+        (phần lớn các nút là lá mới chỉ được đi qua vài lần)
+        """
+        return sys.getsizeof({0: None}) + sys.getsizeof((0, 0, None)) + self._key_bytes()
+
+    def _edges_memory(self) -> int:
+        """
+        Trả về:
+            int: Số byte của toàn bộ bộ nhớ đệm cạnh (các khóa trạng thái con dùng chung
+            với các nút khác nên chỉ tính con trỏ)
+        """
+        total = sys.getsizeof(self.children)
+        for edges in self.children.values():
+            total += sys.getsizeof(edges) + len(edges) * sys.getsizeof((0, 0, None))
+        return total
+
+    def _edge_move(self, state_int: StateInt, action: int, player: int) -> Tuple[StateInt, Optional[float]]:
+        """
+        Đi theo một cạnh của cây: lần đầu gọi game.move và ghi nhớ trạng thái con cùng
+        giá trị kết thúc (thắng/hòa), các lần sau chỉ tra cứu.
+        Cạnh được ghi nhớ kèm người chơi, vì trạng thái ban đầu có thể được đi bởi cả hai.
+
+        Đối số:
+            state_int (int): Trạng thái của nút (đã mở rộng)
+            action (int): Hành động
+            player (int): Người chơi thực hiện hành động
+
+        Trả về:
+            Tuple[int, Optional[float]]: Trạng thái con và giá trị của nó cho người chơi
+            đến lượt tại đó nếu là trạng thái kết thúc (-1 thua, 0 hòa), None nếu không
+        """
+        edges = self.children[state_int]
+        edge = edges.get(action)
+        if edge is None or edge[0] != player:
+            child, won = self.game.move(state_int, action, player)
+            if won:
+                # Nếu ai đó thắng trò chơi, giá trị của trạng thái cuối cùng là -1 (giống như trong lượt của đối thủ)
+                value = -1.0
+            elif self.game.empty_count(child) == 0:
+                # hòa: trạng thái con không còn nước đi hợp lệ. Chỉ hỏi trò chơi một lần
+                # cho mỗi cạnh, các lần duyệt sau đọc giá trị đã ghi nhớ
+                value = 0.0
+            else:
+                value = None
+            edge = edges[action] = (player, child, value)
+        return edge[1], edge[2]
+
+    def legal_mask(self, state_int: StateInt) -> np.ndarray:
+        """
+        Mặt nạ nước đi hợp lệ của một trạng thái: đọc mặt nạ đã lưu cùng nút nếu trạng thái
+        có trong cây, nếu không hỏi trò chơi. Dùng cho các vòng chơi để khỏi giải mã lại
+        trạng thái gốc vừa được tìm kiếm.
+
+        Đối số:
+            state_int (int): Trạng thái trò chơi
+
+        Trả về:
+            np.ndarray: Mảng bool độ dài action_space, không được sửa đổi
+        """
+        if self.is_leaf(state_int):
+            return self.game.legal_moves_mask(state_int)
+        return self._selection_stats(state_int)[1]
+
+    def play(self, state_int: StateInt, action: int, player: int) -> Tuple[StateInt, Optional[float]]:
+        """
+        Thực hiện một nước đi thực tế từ trạng thái gốc: đi theo cạnh đã ghi nhớ trong cây
+        (trạng thái con và kết quả thắng/hòa đã tính khi tìm kiếm), chỉ gọi game.move
+        khi trạng thái chưa có trong cây.
+
+        Đối số:
+            state_int (int): Trạng thái hiện tại
+            action (int): Nước đi
+            player (int): Người chơi thực hiện nước đi
+
+        Trả về:
+            Tuple[int, Optional[float]]: Trạng thái mới và giá trị của nó cho người chơi đến
+            lượt tại đó nếu ván kết thúc (-1 người vừa đi thắng, 0 hòa), None nếu không
+        """
+        if not self.is_leaf(state_int):
+            return self._edge_move(state_int, action, player)
+        child, won = self.game.move(state_int, action, player)
+        if won:
+            return child, -1.0
+        return child, 0.0 if self.game.empty_count(child) == 0 else None
+
+    def _key_bytes(self) -> int:
+        """
+        Kích thước ước tính của một khóa trạng thái: lớn nhất giữa trạng thái ban đầu
+        (dạng chữ số) và một bitboard 2 bit mỗi ô
+        """
+        return sys.getsizeof(max(self.game.initial_state, 1 << (2 * self.game.action_space)))
+
+    def _node_states(self) -> List[StateInt]:
+        """
+        Trả về:
+            List[int]: Trạng thái của mọi nút trong cây
+        """
+        return list(self.probs)
+
+    def node_budget(self) -> int:
+        """
+        Số nút tối đa được phép theo max_nodes và max_bytes
+
+        Trả về:
+            int: Số nút tối đa, 0 nếu không giới hạn
+        """
+        budget = self.max_nodes
+        if self.max_bytes:
+            # chừa chỗ cho các nút được tạo trong một lô trước khi bị loại
+            node_bytes = self._bytes_per_node() * (1 + cfg.MCTS_EVICT_FRACTION)
+            by_bytes = max(1, int(self.max_bytes // node_bytes))
+            budget = min(budget, by_bytes) if budget else by_bytes
+        return budget
+
+    def _eviction_keys(self, states: List[StateInt]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Đối số:
+            states (List[int]): Các trạng thái của cây
+
+        Trả về:
+            Tuple[np.ndarray, np.ndarray]: tổng số lượt truy cập và lần cuối được sao lưu của mỗi nút
+        """
+        visits = np.fromiter((self.visit_total[s] for s in states), dtype=np.int64, count=len(states))
+        touched = np.fromiter((self.last_touched[s] for s in states), dtype=np.int64, count=len(states))
+        return visits, touched
+
+    def _enforce_budget(self, protect: Tuple[StateInt, ...] = ()) -> int:
+        """
+        Loại bớt nút khi cây vượt giới hạn, xuống còn (1 - cfg.MCTS_EVICT_FRACTION) giới hạn.
+        Chỉ được gọi giữa các lô nhỏ, khi không còn đường đi nào mang thua ảo hoặc chờ sao lưu
+        (trừ các nút trong protect), nên số liệu của các nút còn lại không bị sai lệch.
+        Gốc của phiên tìm kiếm luôn được giữ.
+
+        Đối số:
+            protect (Tuple[int], tùy chọn): Các nút không được loại, ví dụ các nút trên đường đi
+            của lô đang được đánh giá ở luồng nền
+
+        Trả về:
+            int: Số nút đã bị loại
+        """
+        budget = self.node_budget()
+        if not budget or len(self) <= budget:
+            return 0
+        target = max(1, int(budget * (1 - cfg.MCTS_EVICT_FRACTION)))
+        states = self._node_states()
+        visits, touched = self._eviction_keys(states)
+        # np.lexsort sắp theo khóa cuối cùng trước: các nút nên giữ nhất nằm ở cuối
+        if self.eviction == "lru":
+            order = np.lexsort((visits, touched))
+        else:
+            order = np.lexsort((touched, visits))
+        keep = {states[i] for i in order[-target:].tolist()}
+        keep.update(protect)
+        if self._root_state is not None and not self.is_leaf(self._root_state):
+            keep.add(self._root_state)
+        evicted = len(states) - len(keep)
+        self._free_nodes(keep)
+        self.evicted_nodes += evicted
+        return evicted
+
+    def batch_fill_ratio(self) -> float:
+        """
+        Tỷ lệ lấp đầy lô: số lá khác nhau thực sự được gửi tới mạng chia cho tổng
+        batch_size của các lô nhỏ kể từ lần đặt lại gần nhất
+
+        Trả về:
+            float: Giá trị trong [0, 1], 0 nếu chưa có lô nào
+        """
+        return self.batch_leaves / self.batch_slots if self.batch_slots else 0.0
+
+    def reset_batch_stats(self) -> None:
+        """
+        Đặt lại bộ đếm của tỷ lệ lấp đầy lô
+        """
+        self.batch_leaves = 0
+        self.batch_slots = 0
+
+    def memory_stats(self) -> Dict[str, float]:
+        """
+        Ước lượng bộ nhớ mà cây đang chiếm giữ
+
+        Trả về:
+            Dict[str, float]: số nút ("nodes"), tổng số byte ("bytes")
+            và số byte trung bình mỗi nút ("bytes_per_node")
+        """
+        total = sum(sys.getsizeof(d) for d in (self.visit_count, self.value, self.value_avg,
+                                               self.probs, self.visit_total, self.legal,
+                                               self.last_touched))
+        total += self._edges_memory()
+        for state_int, counts in self.visit_count.items():
+            total += sys.getsizeof(state_int)
+            for values in (counts, self.value[state_int], self.value_avg[state_int],
+                           self.probs[state_int], self.legal[state_int]):
+                total += sys.getsizeof(values)
+        nodes = len(self)
+        return {
+            "nodes": nodes,
+            "bytes": total,
+            "bytes_per_node": total / nodes if nodes else 0.0,
+        }
+
+    def _node_stats(self, state_int: StateInt) -> Tuple:
+        """
+        Số liệu thống kê của một nút đã mở rộng
+
+        Đối số:
+            state_int (int): Trạng thái trò chơi của nút
+
+        Trả về:
+            Tuple: (N(s, .), Q(s, .), P(s, .)) của nút
+        """
+        return self.visit_count[state_int], self.value_avg[state_int], self.probs[state_int]
+
+    def _selection_stats(self, state_int: StateInt) -> Tuple[int, np.ndarray]:
+        """
+        Dữ liệu phụ được lưu sẵn cho bước chọn hành động
+
+        Đối số:
+            state_int (int): Trạng thái trò chơi của nút
+
+        Trả về:
+            Tuple[int, np.ndarray]: tổng số lần truy cập và mặt nạ hành động hợp lệ của nút
+        """
+        return self.visit_total[state_int], self.legal[state_int]
+
+    def begin_search(self, state_int: StateInt, noise: bool = True) -> None:
+        """
+        Bắt đầu một phiên tìm kiếm cho nước đi tại trạng thái gốc: lấy mẫu vector nhiễu
+        Dirichlet một lần, dùng lại cho mọi lượt duyệt đi qua gốc trong phiên này
+
+        Đối số:
+            state_int (int): Trạng thái gốc của lượt tìm kiếm
+            noise (bool, tùy chọn): Thêm nhiễu Dirichlet tại gốc. False cho các tìm kiếm
+            không cần khám phá (ví dụ nước đi rẻ khi giới hạn số lượt mô phỏng). Mặc định là True.
+        """
+        self._root_state = state_int
+        self._root_noise = self.rng.dirichlet(
+            [cfg.ALPHA] * self.game.action_space) if noise else None
+
+    def _add_noise(self, probs: np.ndarray, state_int: StateInt) -> np.ndarray:
+        """
+        Thêm nhiễu của phiên tìm kiếm vào xác suất hành động tại gốc để khuyến khích khám phá.
+        Nếu chưa có phiên cho gốc này (gọi trực tiếp search_minibatch), một phiên mới được bắt đầu.
+
+        Đối số:
+            probs (np.ndarray): Mảng xác suất hành động
+            state_int (int): Trạng thái gốc
+        """
+        if self._root_state != state_int:
+            self.begin_search(state_int)
+        if self._root_noise is None:
+            return probs
         explore = cfg.EXPLORE
-        noises = np.random.dirichlet(
-            [alpha] * self.game.action_space)
-        probs_with_noise = [
-            (1 - explore) * prob + explore * noise
-            for prob, noise in zip(probs, noises)
-        ]
-        return probs_with_noise
+        return (1 - explore) * probs + explore * self._root_noise
 
-    def _calculate_upper_bound(self, values_avg: List[float], probs: List[float],
-                               counts: List[int]) -> List[float]:
+    def _calculate_upper_bound(self, values_avg: np.ndarray, probs: np.ndarray,
+                               counts: np.ndarray, total: int) -> np.ndarray:
         """
         Tính điểm cho mỗi hành động tại trạng thái trò chơi hiện tại
         từ các giá trị trung bình, xác suất & số lần đếm.
 
         Đối số:
-            values_avg (List[float]): Q(s, a) trong bài báo — Giá trị hành động trung bình.
+            values_avg (np.ndarray): Q(s, a) trong bài báo — Giá trị hành động trung bình.
             Đây là kết quả trò chơi trung bình trên các mô phỏng hiện tại đã thực hiện hành động a.
-            probs (List[float]): P(s,a) — Xác suất trước đó được lấy từ mạng.
-            counts (List[int]): N(s,a) — Số lần truy cập hoặc số lần chúng ta đã thực hiện
+            probs (np.ndarray): P(s,a) — Xác suất trước đó được lấy từ mạng.
+            counts (np.ndarray): N(s,a) — Số lần truy cập hoặc số lần chúng ta đã thực hiện
             hành động này với trạng thái này trong các mô phỏng hiện tại
+            total (int): Tổng N(s, a) trên mọi hành động, được lưu sẵn cho mỗi nút
         Trả về:
-            (List[float])
+            (np.ndarray)
         """
-        total_sqrt = m.sqrt(sum(counts))
-        return [
-            value + self.c_puct * prob * total_sqrt/(1+count)
-            for value, prob, count in
-            zip(values_avg, probs, counts)
-        ]
-    
-    def _mask_invalid_actions(self, scores: List[float], cur_state: int) -> None:
+        return values_avg + (self.c_puct * m.sqrt(total)) * probs / (1 + counts)
+
+    def _select_action(self, state_int: StateInt, is_root: bool) -> int:
         """
-        Thay thế các hành động không hợp lệ bằng mặt nạ để ngăn chúng được chọn
+        Chọn hành động có điểm PUCT cao nhất trong số các hành động hợp lệ của nút,
+        bằng một biểu thức NumPy trên các mảng đã lưu
 
         Đối số:
-            điểm (danh sách float): Danh sách điểm không được che cho mỗi hành động
-            cur_state (int): Trạng thái của trò chơi
+            state_int (int): Trạng thái của nút (đã mở rộng)
+            is_root (bool): Nút có phải là gốc của lượt tìm kiếm hay không (để thêm nhiễu)
+
+        Trả về:
+            int: Hành động được chọn
         """
-        invalid_actions = self.game.invalid_moves(cur_state)
-        for invalid in invalid_actions:
-            scores[invalid] = -np.inf
+        counts, values_avg, probs = self._node_stats(state_int)
+        total, legal = self._selection_stats(state_int)
+
+        # Trong nút gốc(lần di chuyển đầu tiên), thêm nhiễu vào xác suất
+        if is_root:
+            probs = self._add_noise(probs, state_int)
 
-    def find_leaf(self, state_int: StateInt,
-                  player: int) -> Tuple[Optional[float], StateInt, int, List[StateInt], List[int]]:
+        scores = self._calculate_upper_bound(values_avg, probs, counts, total)
+        return int(np.argmax(np.where(legal, scores, -np.inf)))
+
+    def find_leaf(self, state_int: StateInt, player: int, root_action: Optional[int] = None
+                  ) -> Tuple[Optional[float], StateInt, int, List[StateInt], List[int]]:
         """
         Duyệt cây trò chơi từ trạng thái trò chơi cho đến khi kết thúc trò chơi hoặc nút lá
         (trạng thái mà chúng ta chưa từng thấy trước đây), theo dõi tất cả các trạng thái đã truy cập
@@ -111,6 +525,8 @@ class MCTS:
         Đối số:
             state_int (int): trạng thái nút gốc
             người chơi (int): người chơi di chuyển tại nút gốc
+            root_action (int, tùy chọn): Hành động bắt buộc tại gốc (tìm kiếm Gumbel),
+            None để chọn theo PUCT
 
         Trả về:
             value (float): Không có nếu nút lá, nếu không (kết thúc trò chơi) bằng kết quả trò chơi cho người chơi tại lá
@@ -127,30 +543,16 @@ class MCTS:
 
         while not self.is_leaf(cur_state):
             states.append(cur_state)
-            
-            counts = self.visit_count[cur_state]
-            probs = self.probs[cur_state]
-            values_avg = self.value_avg[cur_state]
-
-            # Trong nút gốc(lần di chuyển đầu tiên), thêm nhiễu vào xác suất
-            if cur_state == state_int:
-                probs = self._add_noise(probs)
-
-            scores = self._calculate_upper_bound(values_avg, probs, counts)
-            self._mask_invalid_actions(scores, cur_state)
 
             # chọn và ghi lại hành động với điểm cao nhất
-            action = int(np.argmax(scores))
+            if root_action is not None and cur_state == state_int:
+                action = root_action
+            else:
+                action = self._select_action(cur_state, cur_state == state_int)
             actions.append(action)
-            cur_state, won = self.game.move(
-                cur_state, action, cur_player)
-            if won:
-                # Nếu ai đó thắng trò chơi, giá trị của trạng thái cuối cùng là -1 (giống như trong lượt của đối thủ)
-                value = -1.0
+            # trạng thái con và giá trị kết thúc (thắng/hòa) được ghi nhớ trên cạnh
+            cur_state, value = self._edge_move(cur_state, action, cur_player)
             cur_player = 1-cur_player
-            # Kiểm tra xem có phải là hòa không
-            if value is None and len(self.game.possible_moves(cur_state)) == 0:
-                value = 0.0
         
         return value, cur_state, cur_player, states, actions
 
@@ -169,7 +571,8 @@ class MCTS:
 
 
     def search_batch(self, count: int, batch_size: int, state_int: StateInt,
-                     player: int, net: Net, device: str = "cpu"):
+                     player: int, net: Union[Evaluator, Net], device: str = "cpu",
+                     noise: bool = True):
         """
         Thực hiện một số tìm kiếm MCTS từ trạng thái trò chơi đã cho
 
@@ -178,32 +581,136 @@ class MCTS:
             batch_size (int): [description]
             state_int (int): [description]
             player (int): [description]
-            net (Net): [description]
+            net (Evaluator hoặc Net): Bộ đánh giá, hoặc mạng nơ-ron sẽ được bọc trong một
+            Evaluator cho lượt tìm kiếm này
             device (str, tùy chọn): [description]. Mặc định là "cpu".
+            noise (bool, tùy chọn): Thêm nhiễu Dirichlet tại gốc. Mặc định là True.
         """
+        evaluator = as_evaluator(net, self.game, device)
+        if self.pipeline:
+            self.search_pipelined(count, batch_size, state_int, player, evaluator, noise=noise)
+            return
+        self.begin_search(state_int, noise)
         for _ in range(count):
             self.search_minibatch(batch_size, state_int,
-                                  player, net, device)
-    
-    def _create_node(self, leaf_state: int, prob: List[float]):
+                                  player, evaluator)
+
+    def search_budget(self, batch_size: int, state_int: StateInt, player: int,
+                      net: Union[Evaluator, Net], device: str = "cpu",
+                      time_limit: Optional[float] = None, max_visits: Optional[int] = None,
+                      max_searches: Optional[int] = None, early_stop: bool = cfg.MCTS_EARLY_STOP,
+                      noise: bool = True) -> int:
+        """
+        Tìm kiếm theo ngân sách: chạy các lô nhỏ cho tới khi hết thời gian, đủ số lượt truy cập
+        gốc hoặc đủ số lô nhỏ (giới hạn nào đến trước). Với early_stop, dừng sớm khi hành động
+        được truy cập nhiều nhất tại gốc không thể bị vượt trong phần ngân sách còn lại
+        (ước lượng theo tốc độ tìm kiếm đến lúc đó với giới hạn thời gian).
+        Với self.pipeline, các lô nhỏ chạy theo đường ống như search_batch.
+
+        Đối số:
+            batch_size (int): Số lượt duyệt mỗi lô nhỏ
+            state_int (int): Trạng thái gốc
+            player (int): Người chơi đến lượt tại gốc
+            net (Evaluator hoặc Net): Bộ đánh giá (hoặc mạng nơ-ron)
+            device (str, tùy chọn): Thiết bị PyTorch khi net là mạng nơ-ron. Mặc định là "cpu".
+            time_limit (float, tùy chọn): Thời gian tìm kiếm tối đa (giây)
+            max_visits (int, tùy chọn): Số lượt truy cập gốc tối đa thêm vào trong lần tìm kiếm này
+            max_searches (int, tùy chọn): Số lô nhỏ tối đa
+            early_stop (bool, tùy chọn): Dừng sớm khi kết quả đã ngã ngũ. Mặc định là cfg.MCTS_EARLY_STOP.
+            noise (bool, tùy chọn): Thêm nhiễu Dirichlet tại gốc. Mặc định là True.
+
+        Trả về:
+            int: Số lô nhỏ đã chạy
+        """
+        assert time_limit or max_visits or max_searches, "cần ít nhất một giới hạn"
+        evaluator = as_evaluator(net, self.game, device)
+        start = time.perf_counter()
+        start_visits = self._root_visits(state_int)
+
+        def exhausted(searches: int) -> bool:
+            elapsed = time.perf_counter() - start
+            visits = self._root_visits(state_int) - start_visits
+            remaining = m.inf
+            if max_searches:
+                remaining = min(remaining, (max_searches - searches) * batch_size)
+            if max_visits:
+                remaining = min(remaining, max_visits - visits)
+            if time_limit:
+                # không bắt đầu lô nhỏ mới nếu theo thời gian trung bình mỗi lô nó sẽ vượt giới hạn
+                if elapsed >= time_limit or (searches and elapsed + elapsed / searches > time_limit):
+                    return True
+                if visits > 0:
+                    remaining = min(remaining, visits / elapsed * (time_limit - elapsed))
+            if remaining <= 0:
+                return True
+            return early_stop and not self.is_leaf(state_int) and self._root_decided(state_int, remaining)
+
+        if self.pipeline:
+            return self.search_pipelined(max_searches or sys.maxsize, batch_size, state_int, player,
+                                         evaluator, noise=noise, stop=exhausted)
+        self.begin_search(state_int, noise)
+        searches = 0
+        while not exhausted(searches):
+            self.search_minibatch(batch_size, state_int, player, evaluator)
+            searches += 1
+        return searches
+
+    def _root_visits(self, state_int: StateInt) -> int:
+        """
+        Số lượt truy cập thật của gốc: không tính thua ảo của lô đang được đánh giá ở luồng nền
+        trong tìm kiếm đường ống
+
+        Đối số:
+            state_int (int): Trạng thái gốc
+
+        Trả về:
+            int: Tổng N(s, a) của gốc, 0 nếu gốc chưa được mở rộng
+        """
+        if self.is_leaf(state_int):
+            return 0
+        return int(self._selection_stats(state_int)[0]) - self._inflight_visits
+
+    def _root_decided(self, state_int: StateInt, remaining: float) -> bool:
+        """
+        Hành động được truy cập nhiều nhất tại gốc có còn bị vượt được không
+
+        Đối số:
+            state_int (int): Trạng thái gốc
+            remaining (float): Số lượt truy cập gốc còn có thể thêm
+
+        Trả về:
+            bool: True nếu cách biệt với hành động thứ hai lớn hơn remaining
+        """
+        counts = np.asarray(self._node_stats(state_int)[0])
+        if len(counts) < 2:
+            return True
+        second, best = np.partition(counts, -2)[-2:]
+        return best - second > remaining
+
+    def _create_node(self, leaf_state: int, prob: Union[List[float], np.ndarray]):
         """
         Tạo một nút mới trong cây trạng thái trò chơi
 
         Đối số:
             leaf_state (int): Trạng thái trò chơi của nút lá mới
-            prob (List[float]): Xác suất trước của mỗi hành động ở trạng thái đó
+            prob (List[float] hoặc np.ndarray): Xác suất trước của mỗi hành động ở trạng thái đó
             được truy vấn từ mạng nơ-ron
         """
         action_space = self.game.action_space
-        self.visit_count[leaf_state] = [0]*action_space
-        self.value[leaf_state] = [0.0]*action_space
-        self.value_avg[leaf_state] = [0.0]*action_space
-        self.probs[leaf_state] = prob
+        self.visit_count[leaf_state] = np.zeros(action_space, dtype=np.int64)
+        self.value[leaf_state] = np.zeros(action_space)
+        self.value_avg[leaf_state] = np.zeros(action_space)
+        # sao chép để không giữ lại cả lô đầu ra của mạng
+        self.probs[leaf_state] = np.array(prob, dtype=np.float32)
+        self.visit_total[leaf_state] = 0
+        self.legal[leaf_state] = self.game.legal_moves_mask(leaf_state)
+        self.last_touched[leaf_state] = self.tick
+        self.children[leaf_state] = {}
+        self.nodes_created += 1
 
     def _expand_tree(self, expand_states: List[StateInt], expand_players: List[int],
                      expand_queue: List[Tuple[int, List[int], List[int]]],
-                     backup_queue: List,
-                     net: Net, device: str = "cpu") -> None:
+                     backup_queue: List, evaluator: Evaluator) -> None:
         """
         Với hàng đợi các trạng thái trò chơi chưa gặp, hãy truy vấn hàng loạt mạng
         để có được xác suất dự đoán cho từng hành động và giá trị dự đoán
@@ -218,18 +725,22 @@ class MCTS:
             quy trình sao lưu
             backup_queue (List): Hàng đợi giá trị, trạng thái và hành động để thực hiện
             quy trình sao lưu sau.
-            net (Net): Mạng nơ-ron để truy vấn xác suất hành động và giá trị trạng thái trò chơi từ
-            device (str): cpu hoặc gpu cho PyTorch
-        """
-        batch_v = self.game.states_to_training_batch(
-            expand_states, expand_players)
-        batch_tensor = torch.tensor(batch_v).to(device)
-        logits_v, values_v = net(batch_tensor)
-        probs_v = F.softmax(logits_v, dim=1)
-        values = values_v.data.cpu().numpy()[:, 0]
-        probs = probs_v.data.cpu().numpy()
-
-        # tạo các nút
+            evaluator (Evaluator): Bộ đánh giá để truy vấn xác suất hành động và giá trị trạng thái trò chơi
+        """
+        probs, values = evaluator(expand_states, expand_players)
+        self._create_nodes(expand_queue, probs, values, backup_queue)
+
+    def _create_nodes(self, expand_queue: List[Tuple[int, List[int], List[int]]],
+                      probs: np.ndarray, values: np.ndarray, backup_queue: List) -> None:
+        """
+        Tạo các nút từ kết quả đánh giá của mạng và xếp các đường đi vào hàng đợi sao lưu
+
+        Đối số:
+            expand_queue (List[(int, List(int), List(int))]): Các lá cùng đường đi tới chúng
+            probs (np.ndarray): Xác suất chính sách của mỗi lá
+            values (np.ndarray): Giá trị của mỗi lá
+            backup_queue (List): Hàng đợi giá trị, trạng thái và hành động để sao lưu
+        """
         for (leaf_state, states, actions), value, prob in zip(expand_queue, values, probs):
             self._create_node(leaf_state, prob)
             backup_queue.append((value, states, actions))
@@ -252,33 +763,76 @@ class MCTS:
         for state_int, action in zip(states[::-1],
                                      actions[::-1]):
             self.visit_count[state_int][action] += 1
+            self.visit_total[state_int] = self.visit_total.get(state_int, 0) + 1
+            self.last_touched[state_int] = self.tick
             self.value[state_int][action] += cur_value
             # update the average value with new value
             self.value_avg[state_int][action] = (self.value[state_int][action] /
                                                  self.visit_count[state_int][action])
             cur_value = -cur_value # đảo ngược giá trị cho người chơi tiếp theo
 
-    def search_minibatch(self, batch_size: int, state_int: StateInt, player: int,
-                         net: Net, device: str = "cpu") -> None:
+    def _apply_virtual_loss(self, states: List[StateInt], actions: List[int], visits: int) -> None:
         """
-        Thực hiện một số tìm kiếm MCTS. Mạng nơ-ron PyTorch được truy vấn theo từng đợt,
-        do đó, thực hiện MCTS theo từng đợt cũng thuận tiện hơn.
+        Cộng (hoặc gỡ bỏ nếu visits < 0) các lượt thua ảo vào các cạnh của một đường đi:
+        mỗi lượt ảo tăng N(s, a) thêm 1 và giảm W(s, a) đi 1, làm Q(s, a) giảm và
+        U(s, a) nhỏ đi để các lượt duyệt tiếp theo trong lô chọn nhánh khác
 
         Đối số:
-            batch_size (int): Số lượng tìm kiếm trong đợt này
+            states (List[int]): Danh sách các trạng thái của đường đi
+            actions (List[int]): Danh sách các hành động tương ứng
+            visits (int): Số lượt thua ảo, âm để gỡ bỏ
+        """
+        for state_int, action in zip(states, actions):
+            self.visit_count[state_int][action] += visits
+            self.visit_total[state_int] += visits
+            self.value[state_int][action] -= visits
+            count = self.visit_count[state_int][action]
+            self.value_avg[state_int][action] = self.value[state_int][action] / count if count else 0.0
+
+    def _adapt_virtual_loss(self, fill_ratio: float) -> None:
+        """
+        Điều chỉnh thua ảo theo tỷ lệ lấp đầy của lô vừa gom: tăng gấp đôi khi lô còn
+        nhiều lá trùng, giảm dần khi đã đạt mục tiêu để không làm lệch tìm kiếm quá mức
+
+        Đối số:
+            fill_ratio (float): Tỷ lệ lấp đầy của lô vừa gom
+        """
+        if fill_ratio < cfg.BATCH_FILL_TARGET:
+            self.virtual_loss = min(max(1, self.virtual_loss * 2), cfg.VIRTUAL_LOSS_MAX)
+        elif self.virtual_loss > 1:
+            self.virtual_loss -= 1
+
+    def _collect_leaves(self, batch_size: int, state_int: StateInt, player: int,
+                        root_actions: Optional[List[int]] = None) -> Tuple:
+        """
+        Giai đoạn gom lá của một lô nhỏ: thực hiện batch_size lượt duyệt, áp dụng thua ảo
+        lên đường đi của mỗi lượt để lượt sau tránh đi lại đúng đường đó
+
+        Đối số:
+            batch_size (int): Số lượt duyệt
             state_int (int): Trạng thái trò chơi ở dạng MCTS
             player (int): Người chơi đến lượt thực hiện nước đi
-            net (Net): Mạng nơ-ron để lấy giá trị chính sách cho các trạng thái chưa gặp
-            device (str, tùy chọn): Thiết bị PyTorch. Mặc định là "cpu".
+            root_actions (List[int], tùy chọn): Hành động bắt buộc tại gốc của từng lượt duyệt
+
+        Trả về:
+            Tuple: (backup_queue, expand_states, expand_players, expand_queue, paths),
+            paths là các đường đi đang mang thua ảo cần gỡ bỏ khi sao lưu
         """
         backup_queue = []
         expand_states = []
         expand_players = []
         expand_queue = []
-        planned = set()
-        for _ in range(batch_size):
+        paths = []
+        # các lá đang được đánh giá ở luồng nền được coi như đã lên kế hoạch
+        planned = set(self._inflight)
+        virtual_loss = self.virtual_loss
+        for idx in range(batch_size):
+            root_action = None if root_actions is None else root_actions[idx]
             value, leaf_state, leaf_player, states, actions = \
-                self.find_leaf(state_int, player)
+                self.find_leaf(state_int, player, root_action)
+            if virtual_loss:
+                self._apply_virtual_loss(states, actions, virtual_loss)
+                paths.append((states, actions, virtual_loss))
             if value is not None:
                 # reached terminal game state, can backup with actual reward
                 backup_queue.append((value, states, actions))
@@ -290,15 +844,278 @@ class MCTS:
                     expand_queue.append((leaf_state, states,
                                          actions))
 
-        # mở rộng các nút
-        if expand_queue:
-            self._expand_tree(expand_states, expand_players,
-                              expand_queue, backup_queue, net, device)
-        
-        # thực hiện sao lưu các tìm kiếm
+        self.batch_leaves += len(expand_states)
+        self.batch_slots += batch_size
+        if self.adaptive_virtual_loss:
+            self._adapt_virtual_loss(len(expand_states) / batch_size)
+        return backup_queue, expand_states, expand_players, expand_queue, paths
+
+    def _apply_results(self, backup_queue: List, paths: List) -> None:
+        """
+        Giai đoạn sao lưu của một lô nhỏ: gỡ bỏ thua ảo rồi sao lưu các giá trị thật
+
+        Đối số:
+            backup_queue (List): Hàng đợi (giá trị, trạng thái, hành động) cần sao lưu
+            paths (List): Các đường đi (trạng thái, hành động, số lượt ảo) đang mang thua ảo
+        """
+        for states, actions, virtual_loss in paths:
+            self._apply_virtual_loss(states, actions, -virtual_loss)
         for value, states, actions in backup_queue:
             self._backup(value, states, actions)
 
+    def search_minibatch(self, batch_size: int, state_int: StateInt, player: int,
+                         net: Union[Evaluator, Net], device: str = "cpu",
+                         root_actions: Optional[List[int]] = None) -> None:
+        """
+        Thực hiện một số tìm kiếm MCTS. Mạng nơ-ron PyTorch được truy vấn theo từng đợt,
+        do đó, thực hiện MCTS theo từng đợt cũng thuận tiện hơn.
+
+        Đối số:
+            batch_size (int): Số lượng tìm kiếm trong đợt này
+            state_int (int): Trạng thái trò chơi ở dạng MCTS
+            player (int): Người chơi đến lượt thực hiện nước đi
+            net (Evaluator hoặc Net): Bộ đánh giá (hoặc mạng nơ-ron) để lấy giá trị chính sách
+            cho các trạng thái chưa gặp
+            device (str, tùy chọn): Thiết bị PyTorch khi net là mạng nơ-ron. Mặc định là "cpu".
+            root_actions (List[int], tùy chọn): Hành động bắt buộc tại gốc của từng lượt duyệt
+        """
+        self.tick += 1
+        backup_queue, expand_states, expand_players, expand_queue, paths = \
+            self._collect_leaves(batch_size, state_int, player, root_actions)
+
+        # mở rộng các nút
+        if expand_queue:
+            self._expand_tree(expand_states, expand_players, expand_queue,
+                              backup_queue, as_evaluator(net, self.game, device))
+
+        # gỡ bỏ thua ảo và thực hiện sao lưu các tìm kiếm
+        self._apply_results(backup_queue, paths)
+
+        # giữa hai lô không còn đường đi nào dở dang, có thể loại nút an toàn
+        self._enforce_budget()
+
+    def search_pipelined(self, count: int, batch_size: int, state_int: StateInt,
+                         player: int, evaluator: Evaluator, noise: bool = True,
+                         stop: Optional[Callable[[int], bool]] = None) -> int:
+        """
+        Tìm kiếm theo đường ống: trong khi lô lá thứ k được mạng đánh giá ở luồng nền
+        (PyTorch nhả GIL trong các phép tích chập), luồng chính duyệt cây để gom lô k+1.
+        Thua ảo trên đường đi của lô k và tập lá đang chờ đánh giá giữ cho hai lô không
+        trùng nhau. Kết quả của lô k được tạo nút và sao lưu trước khi gửi lô k+2.
+
+        Đối số:
+            count (int): Số lô nhỏ
+            batch_size (int): Số lượt duyệt mỗi lô
+            state_int (int): Trạng thái gốc
+            player (int): Người chơi đến lượt tại gốc
+            evaluator (Evaluator): Bộ đánh giá, chỉ được gọi từ luồng nền
+            noise (bool, tùy chọn): Thêm nhiễu Dirichlet tại gốc. Mặc định là True.
+            stop (Callable[[int], bool], tùy chọn): Được gọi với số lô nhỏ đã bắt đầu trước khi
+            gom mỗi lô mới, trả về True để dừng (tìm kiếm theo ngân sách). Mặc định là None.
+
+        Trả về:
+            int: Số lô nhỏ đã chạy
+        """
+        self.begin_search(state_int, noise)
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mcts-eval")
+        executor = self._executor
+        pending = None
+        searches = 0
+        while searches < count and not (stop is not None and stop(searches)):
+            searches += 1
+            if pending is None and self.is_leaf(state_int):
+                # gốc chưa được mở rộng: mọi lượt duyệt đều dừng ở gốc, không có gì để chồng lấp
+                self.search_minibatch(batch_size, state_int, player, evaluator)
+                continue
+            self.tick += 1
+            collected = self._collect_leaves(batch_size, state_int, player)
+            _, expand_states, expand_players, _, paths = collected
+            future = None
+            if expand_states:
+                future = executor.submit(evaluator, expand_states, expand_players)
+                self._inflight.update(expand_states)
+            if pending is not None:
+                # lô vừa gom chưa được sao lưu: mọi nút trên các đường đi của nó, kể cả các lượt
+                # duyệt bị bỏ vì trùng lá nhưng vẫn mang thua ảo, phải được giữ khi loại nút
+                backup_queue, _, _, expand_queue, _ = collected
+                protect = {s for _, states, _ in backup_queue + expand_queue for s in states}
+                protect.update(s for states, _, _ in paths for s in states)
+                self._finish_pipelined(*pending, protect=tuple(protect))
+            pending = (future, collected)
+            # mọi đường đi của lô bắt đầu từ gốc (gốc đã được mở rộng)
+            self._inflight_visits = sum(visits for _, _, visits in paths)
+        if pending is not None:
+            self._finish_pipelined(*pending)
+            self._inflight_visits = 0
+        return searches
+
+    def _finish_pipelined(self, future: Optional[Future], collected: Tuple,
+                          protect: Tuple[StateInt, ...] = ()) -> None:
+        """
+        Chờ kết quả đánh giá của một lô trong đường ống, tạo nút và sao lưu
+
+        Đối số:
+            future (Future): Kết quả đánh giá (None nếu lô không có lá mới)
+            collected (Tuple): Kết quả của _collect_leaves cho lô này
+            protect (Tuple[int], tùy chọn): Các nút trên đường đi của lô tiếp theo,
+            không được loại khi cây vượt giới hạn
+        """
+        backup_queue, expand_states, _, expand_queue, paths = collected
+        if future is not None:
+            probs, values = future.result()
+            self._inflight.difference_update(expand_states)
+            self._create_nodes(expand_queue, probs, values, backup_queue)
+        self._apply_results(backup_queue, paths)
+        self._enforce_budget(protect)
+
+    def search_gumbel(self, simulations: int, state_int: StateInt, player: int,
+                      net: Union[Evaluator, Net], device: str = "cpu", top_k: int = cfg.GUMBEL_TOP_K,
+                      sample: bool = True) -> Tuple[int, np.ndarray]:
+        """
+        Tìm kiếm tại gốc bằng Gumbel và chia đôi tuần tự (Gumbel AlphaZero): lấy top_k hành động
+        theo g + logit với nhiễu Gumbel g, rồi qua ceil(log2(top_k)) vòng, chia đều ngân sách cho
+        các hành động còn lại (các lượt duyệt bắt buộc đi qua hành động đó) và giữ lại một nửa có
+        g + logit + sigma(q) cao nhất. Bên dưới gốc vẫn chọn theo PUCT. Với ngân sách nhỏ, top_k
+        được giảm để mọi vòng đều có lượt duyệt; số lượt truy cập gốc được sao lưu thực tế luôn
+        đúng bằng simulations. Cho chính sách cải thiện được cả với 8-32 lượt mô phỏng.
+
+        Đối số:
+            simulations (int): Tổng số lượt duyệt
+            state_int (int): Trạng thái gốc
+            player (int): Người chơi đến lượt tại gốc
+            net (Evaluator hoặc Net): Bộ đánh giá (hoặc mạng nơ-ron)
+            device (str, tùy chọn): Thiết bị PyTorch khi net là mạng nơ-ron. Mặc định là "cpu".
+            top_k (int, tùy chọn): Số hành động được xét tại gốc. Mặc định là cfg.GUMBEL_TOP_K.
+            sample (bool, tùy chọn): Thêm nhiễu Gumbel (tự chơi). False để chọn tất định (đánh giá).
+            Mặc định là True.
+
+        Trả về:
+            int: Hành động được chọn
+            np.ndarray: Chính sách cải thiện softmax(logit + sigma(q hoàn chỉnh)), dùng làm mục tiêu huấn luyện
+        """
+        evaluator = as_evaluator(net, self.game, device)
+        # phiên tìm kiếm mới cho gốc này: gốc được giữ khi loại nút, nhiễu Gumbel thay cho Dirichlet
+        self.begin_search(state_int, noise=False)
+        root_value = None
+        if self.is_leaf(state_int):
+            self.tick += 1
+            probs, values = evaluator([state_int], [player])
+            self._create_node(state_int, probs[0])
+            root_value = float(values[0])
+
+        _, legal = self._selection_stats(state_int)
+        legal_actions = np.flatnonzero(legal)
+        priors = np.asarray(self._node_stats(state_int)[2], dtype=np.float64)
+        logits = np.full(self.game.action_space, -np.inf)
+        logits[legal_actions] = np.log(np.maximum(priors[legal_actions], 1e-12))
+        gumbel = self.rng.gumbel(size=self.game.action_space) if sample else np.zeros(self.game.action_space)
+
+        # mỗi hành động được xét cần ít nhất một lượt duyệt ở mỗi vòng nó còn lại,
+        # nên top_k được giảm cho tới khi cả lịch chia đôi vừa ngân sách
+        k = max(1, min(top_k, len(legal_actions), simulations))
+        while k > 1 and sum(self._gumbel_sizes(k)) > simulations:
+            k -= 1
+        order = np.argsort(-(gumbel + logits)[legal_actions], kind="stable")
+        candidates = legal_actions[order[:k]]
+        sizes = self._gumbel_sizes(k)
+        budget = simulations
+        for phase, size in enumerate(sizes):
+            # phần tối thiểu cần giữ lại cho các vòng sau
+            reserved = sum(sizes[phase + 1:])
+            if phase == len(sizes) - 1:
+                # vòng cuối dùng hết ngân sách còn lại, phần dư cho các hành động xếp trên
+                visits = [budget // size + (1 if idx < budget % size else 0) for idx in range(size)]
+            else:
+                per_action = budget // ((len(sizes) - phase) * size)
+                per_action = max(1, min(per_action, (budget - reserved) // size))
+                visits = [per_action] * size
+            budget -= sum(visits)
+            self._gumbel_visit(state_int, player, evaluator, candidates, visits)
+            if len(candidates) > 1:
+                scores = (gumbel + logits + self._gumbel_sigma(state_int, priors, legal, root_value))[candidates]
+                candidates = candidates[np.argsort(-scores, kind="stable")[:max(1, len(candidates) // 2)]]
+
+        sigma = self._gumbel_sigma(state_int, priors, legal, root_value)
+        action = int(candidates[np.argmax((gumbel + logits + sigma)[candidates])])
+        improved = np.where(legal, logits + sigma, -np.inf)
+        improved = np.exp(improved - improved[legal].max())
+        return action, improved / improved.sum()
+
+    @staticmethod
+    def _gumbel_sizes(k: int) -> List[int]:
+        """
+        Số hành động còn lại ở mỗi vòng chia đôi bắt đầu từ k hành động
+
+        Đối số:
+            k (int): Số hành động được xét tại gốc
+
+        Trả về:
+            List[int]: Số hành động của mỗi vòng trong ceil(log2(k)) vòng (ít nhất một vòng)
+        """
+        sizes = [k]
+        for _ in range(max(1, m.ceil(m.log2(k))) - 1):
+            sizes.append(max(1, sizes[-1] // 2))
+        return sizes
+
+    def _gumbel_visit(self, state_int: StateInt, player: int, evaluator: Evaluator,
+                      actions: np.ndarray, visits: List[int]) -> None:
+        """
+        Thêm đúng visits[i] lượt truy cập gốc vào actions[i]. Các lượt duyệt bắt buộc trùng
+        một lá chưa mở rộng bị bỏ trong lô nhỏ nên không được sao lưu; các lô tiếp theo
+        bù phần còn thiếu cho tới khi số lượt truy cập thực tế của gốc đủ
+
+        Đối số:
+            state_int (int): Trạng thái gốc (đã mở rộng)
+            player (int): Người chơi đến lượt tại gốc
+            evaluator (Evaluator): Bộ đánh giá
+            actions (np.ndarray): Các hành động tại gốc
+            visits (List[int]): Số lượt truy cập cần thêm cho mỗi hành động
+        """
+        counts = np.asarray(self._node_stats(state_int)[0])
+        targets = [int(counts[action]) + extra for action, extra in zip(actions, visits)]
+        while True:
+            counts = np.asarray(self._node_stats(state_int)[0])
+            root_actions = [int(action) for action, target in zip(actions, targets)
+                            for _ in range(target - int(counts[action]))]
+            if not root_actions:
+                return
+            self.search_minibatch(len(root_actions), state_int, player, evaluator,
+                                  root_actions=root_actions)
+
+    def _gumbel_sigma(self, state_int: StateInt, priors: np.ndarray, legal: np.ndarray,
+                      root_value: Optional[float]) -> np.ndarray:
+        """
+        sigma(q hoàn chỉnh) = (c_visit + max N) * c_scale * q, trong đó q của hành động chưa
+        được thăm được thay bằng giá trị trộn v_mix và mọi q được đưa về [0, 1] theo min-max
+
+        Đối số:
+            state_int (int): Trạng thái gốc
+            priors (np.ndarray): Xác suất tiên nghiệm của gốc
+            legal (np.ndarray): Mặt nạ hành động hợp lệ
+            root_value (float): Giá trị mạng của gốc, None thì dùng Q trung bình của gốc
+
+        Trả về:
+            np.ndarray: sigma cho mọi hành động
+        """
+        counts, values_avg, _ = self._node_stats(state_int)
+        counts = np.asarray(counts, dtype=np.float64)
+        q = np.asarray(values_avg, dtype=np.float64)
+        visited = counts > 0
+        total = counts.sum()
+        if root_value is None:
+            root_value = float((q * counts).sum() / total) if total else 0.0
+        v_mix = root_value
+        if visited.any():
+            visited_prior = priors[visited].sum()
+            weighted_q = ((priors[visited] * q[visited]).sum() / visited_prior
+                          if visited_prior > 0 else q[visited].mean())
+            v_mix = (root_value + total * weighted_q) / (1 + total)
+        completed = np.where(visited, q, v_mix)
+        low, high = completed[legal].min(), completed[legal].max()
+        completed = (completed - low) / max(high - low, 1e-8)
+        return (cfg.GUMBEL_C_VISIT + counts.max()) * cfg.GUMBEL_C_SCALE * completed
+
     def get_policy_value(self, state_int: StateInt, tau: int = 1) -> Tuple[List[float], List[float]]:
         """
         Trích xuất chính sách và giá trị hành động theo trạng thái
@@ -315,13 +1132,448 @@ class MCTS:
             List[float]: Danh sách các giá trị cho mỗi hành động trong tổng số
             không gian hành động
         """
-        counts = self.visit_count[state_int]
+        counts, values_avg, priors = self._node_stats(state_int)
+        total, legal = self._selection_stats(state_int)
+        if total == 0:
+            # gốc vừa được mở rộng, chưa có lượt truy cập (ví dụ tìm kiếm rẻ chỉ một lô nhỏ):
+            # dùng xác suất tiên nghiệm của mạng trên các nước hợp lệ thay cho số lượt truy cập
+            counts = np.where(legal, priors, 0.0)
         if tau == 0:
             probs = [0.0] * self.game.action_space
-            probs[np.argmax(counts)] = 1.0
+            probs[int(np.argmax(counts))] = 1.0
         else:
-            counts_adjusted = [count ** (1.0 / tau) for count in counts]
-            total = sum(counts_adjusted)
-            probs = [count / total for count in counts_adjusted]
-        values = self.value_avg[state_int]
-        return probs, values
\ No newline at end of file
+            counts_adjusted = np.asarray(counts, dtype=np.float64) ** (1.0 / tau)
+            probs = (counts_adjusted / counts_adjusted.sum()).tolist()
+        values = np.asarray(values_avg, dtype=np.float64).tolist()
+        return probs, values
+
+
+class ArrayMCTS(MCTS):
+    """
+    MCTS với kho nút dựa trên mảng NumPy cấp phát trước thay cho bốn dict
+    chứa danh sách Python: một bảng chỉ số state_int -> hàng, và các ma trận
+    liền khối N/W/Q/P (mỗi hàng là một nút) được nới rộng theo từng khối.
+    Giữ nguyên API công khai search_batch/get_policy_value của MCTS, tốn ít
+    bộ nhớ hơn nhiều lần và cho phép vector hóa việc chọn và sao lưu.
+    """
+
+    def __init__(self, game: BaseGame, chunk_size: int = cfg.MCTS_NODE_CHUNK, **kwargs):
+        """
+        Đối số:
+            game (BaseGame): Trò chơi
+            chunk_size (int, tùy chọn): Số nút tối thiểu được thêm mỗi lần nới rộng
+            các ma trận. Mặc định là cfg.MCTS_NODE_CHUNK.
+            **kwargs: Các tùy chọn tìm kiếm của MCTS (xem MCTS.__init__)
+        """
+        super().__init__(game, **kwargs)
+        self.chunk_size = chunk_size
+        # state_int -> chỉ số hàng trong các ma trận
+        self.node_index: Dict[StateInt, int] = {}
+        shape = (0, game.action_space)
+        # ma trận N/W/Q/P, mỗi hàng là một nút, được nới rộng bởi _allocate
+        self._counts = np.zeros(shape, dtype=np.int32)
+        self._value = np.zeros(shape, dtype=np.float32)
+        self._value_avg = np.zeros(shape, dtype=np.float32)
+        self._probs = np.zeros(shape, dtype=np.float32)
+        # tổng số lần truy cập, lần cuối được sao lưu và mặt nạ hành động hợp lệ của mỗi nút
+        self._totals = np.zeros(0, dtype=np.int64)
+        self._touched = np.zeros(0, dtype=np.int64)
+        self._legal = np.zeros(shape, dtype=bool)
+
+    @staticmethod
+    def _resized(matrix: np.ndarray, capacity: int, used: int) -> np.ndarray:
+        """
+        Bản sao của một ma trận với capacity hàng, giữ lại used hàng đầu tiên
+
+        Đối số:
+            matrix (np.ndarray): Ma trận hiện tại
+            capacity (int): Số hàng mới
+            used (int): Số hàng đang được dùng
+
+        Trả về:
+            np.ndarray: Ma trận mới cùng kiểu dữ liệu, các hàng còn lại bằng 0
+        """
+        resized = np.zeros((capacity,) + matrix.shape[1:], dtype=matrix.dtype)
+        resized[:used] = matrix[:used]
+        return resized
+
+    def _allocate(self, capacity: int) -> None:
+        """
+        Cấp phát (lại) các ma trận với sức chứa cho trước, giữ lại dữ liệu hiện có
+
+        Đối số:
+            capacity (int): Số nút tối đa
+        """
+        used = len(self.node_index)
+        self._counts = self._resized(self._counts, capacity, used)
+        self._value = self._resized(self._value, capacity, used)
+        self._value_avg = self._resized(self._value_avg, capacity, used)
+        self._probs = self._resized(self._probs, capacity, used)
+        self._totals = self._resized(self._totals, capacity, used)
+        self._touched = self._resized(self._touched, capacity, used)
+        self._legal = self._resized(self._legal, capacity, used)
+
+    @property
+    def capacity(self) -> int:
+        return self._counts.shape[0]
+
+    def clear(self):
+        super().clear()
+        self.node_index.clear()
+        self._allocate(0)
+
+    def __len__(self):
+        return len(self.node_index)
+
+    def memory_stats(self) -> Dict[str, float]:
+        """
+        Bộ nhớ của các ma trận (kể cả phần đã cấp phát nhưng chưa dùng) và bảng chỉ số
+
+        Trả về:
+            Dict[str, float]: số nút ("nodes"), sức chứa ("capacity"), tổng số byte
+            ("bytes") và số byte trung bình mỗi nút ("bytes_per_node")
+        """
+        total = self._counts.nbytes + self._value.nbytes + self._value_avg.nbytes + \
+            self._probs.nbytes + self._totals.nbytes + self._touched.nbytes + self._legal.nbytes
+        total += sys.getsizeof(self.node_index)
+        total += sum(sys.getsizeof(state_int) for state_int in self.node_index)
+        total += self._edges_memory()
+        nodes = len(self)
+        return {
+            "nodes": nodes,
+            "capacity": self.capacity,
+            "bytes": total,
+            "bytes_per_node": total / nodes if nodes else 0.0,
+        }
+
+    def is_leaf(self, state_int: StateInt) -> bool:
+        return state_int not in self.node_index
+
+    def _node_stats(self, state_int: StateInt) -> Tuple:
+        idx = self.node_index[state_int]
+        return self._counts[idx], self._value_avg[idx], self._probs[idx]
+
+    def _selection_stats(self, state_int: StateInt) -> Tuple[int, np.ndarray]:
+        idx = self.node_index[state_int]
+        return self._totals[idx], self._legal[idx]
+
+    def _create_node(self, leaf_state: int, prob: Union[List[float], np.ndarray]):
+        """
+        Ghi nút mới vào hàng trống tiếp theo, nới rộng các ma trận nếu cần
+
+        Đối số:
+            leaf_state (int): Trạng thái trò chơi của nút lá mới
+            prob (List[float] hoặc np.ndarray): Xác suất trước của mỗi hành động ở trạng thái đó
+        """
+        idx = len(self.node_index)
+        if idx >= self.capacity:
+            capacity = self.capacity + max(self.chunk_size, self.capacity // 2)
+            budget = self.node_budget()
+            if budget:
+                # chỉ chừa thêm phần sẽ bị loại sau lô, để bộ nhớ không vượt xa giới hạn.
+                # Khi một lô lớn so với giới hạn đã vượt qua mức này, vẫn nới theo cấp số
+                # thay vì từng hàng một (mỗi lần nới là một lần sao chép cả ma trận)
+                limit = budget + int(budget * cfg.MCTS_EVICT_FRACTION) + 1
+                if idx < limit:
+                    capacity = min(capacity, limit)
+            self._allocate(capacity)
+        self.node_index[leaf_state] = idx
+        self._counts[idx] = 0
+        self._value[idx] = 0.0
+        self._value_avg[idx] = 0.0
+        self._probs[idx] = prob
+        self._totals[idx] = 0
+        self._touched[idx] = self.tick
+        self._legal[idx] = self.game.legal_moves_mask(leaf_state)
+        self.children[leaf_state] = {}
+        self.nodes_created += 1
+
+    def _free_nodes(self, keep: set) -> None:
+        """
+        Dồn các hàng cần giữ lên đầu các ma trận (giữ thứ tự cũ) và thu nhỏ
+        các ma trận khi phần lớn sức chứa không còn được dùng
+
+        Đối số:
+            keep (set): Các trạng thái cần giữ lại
+        """
+        kept = sorted((self.node_index[s], s) for s in keep)
+        rows = np.fromiter((idx for idx, _ in kept), dtype=np.int64, count=len(kept))
+        used = len(kept)
+        for matrix in (self._counts, self._value, self._value_avg,
+                       self._probs, self._totals, self._touched, self._legal):
+            matrix[:used] = matrix[rows]
+        self.node_index = {s: idx for idx, (_, s) in enumerate(kept)}
+        self.children = {s: self.children[s] for _, s in kept}
+        if used * 4 < self.capacity and self.capacity > self.chunk_size:
+            self._allocate(max(self.chunk_size, used * 2))
+
+    def _backup(self, value: float, states: List[StateInt], actions: List[int]):
+        """
+        Sao lưu cả đường đi bằng một phép gán theo chỉ số: giá trị đổi dấu ở mỗi lượt,
+        bắt đầu bằng -value tại trạng thái cuối cùng của đường đi
+
+        Đối số:
+            value (float): Giá trị của trạng thái lá
+            states (List[int]): Danh sách các trạng thái trò chơi cần sao lưu
+            actions (List[int]): Danh sách các hành động tương ứng
+        """
+        if not states:
+            return
+        rows = np.fromiter((self.node_index[s] for s in states), dtype=np.int64, count=len(states))
+        cols = np.asarray(actions, dtype=np.int64)
+        # trạng thái cuối cùng nhận -value, các trạng thái phía trước đổi dấu xen kẽ
+        signs = np.where(np.arange(len(states))[::-1] % 2 == 0, -1.0, 1.0)
+        np.add.at(self._counts, (rows, cols), 1)
+        np.add.at(self._totals, rows, 1)
+        self._touched[rows] = self.tick
+        np.add.at(self._value, (rows, cols), signs * value)
+        self._value_avg[rows, cols] = self._value[rows, cols] / self._counts[rows, cols]
+
+    def _node_states(self) -> List[StateInt]:
+        return list(self.node_index)
+
+    def _bytes_per_node(self) -> int:
+        row = sum(matrix.itemsize * int(np.prod(matrix.shape[1:]))
+                  for matrix in (self._counts, self._value, self._value_avg,
+                                 self._probs, self._totals, self._touched, self._legal))
+        # cộng với một mục và khóa trong bảng chỉ số và bộ nhớ đệm cạnh
+        return row + 2 * 3 * 8 * 3 // 2 + self._key_bytes() + self._edge_bytes()
+
+    def _eviction_keys(self, states: List[StateInt]) -> Tuple[np.ndarray, np.ndarray]:
+        rows = np.fromiter((self.node_index[s] for s in states), dtype=np.int64, count=len(states))
+        return self._totals[rows], self._touched[rows]
+
+    def _apply_virtual_loss(self, states: List[StateInt], actions: List[int], visits: int) -> None:
+        if not states:
+            return
+        rows = np.fromiter((self.node_index[s] for s in states), dtype=np.int64, count=len(states))
+        cols = np.asarray(actions, dtype=np.int64)
+        np.add.at(self._counts, (rows, cols), visits)
+        np.add.at(self._totals, rows, visits)
+        np.add.at(self._value, (rows, cols), -visits)
+        counts = self._counts[rows, cols]
+        self._value_avg[rows, cols] = np.where(
+            counts > 0, self._value[rows, cols] / np.maximum(counts, 1), 0.0)
+
+
+class SparseMCTS(MCTS):
+    """
+    MCTS với kho nút thưa: mỗi nút chỉ giữ các mảng N/W/Q/P gọn trên các hành động hợp lệ
+    của nó, kèm mảng chỉ số ô trên bàn cờ tương ứng (self.legal giữ mảng chỉ số này thay cho
+    mặt nạ). Bộ nhớ mỗi nút tỷ lệ với số ô trống thay vì cả không gian hành động, xác suất trước
+    chỉ lưu phần của các nước hợp lệ, và bước chọn hành động không cần che các nước không hợp lệ.
+    Các hàm đọc số liệu (_node_stats, _selection_stats) trả về mảng đầy đủ theo không gian hành
+    động để giữ nguyên API công khai.
+    """
+
+    def __init__(self, game: BaseGame, **kwargs):
+        """
+        Đối số:
+            game (BaseGame): Trò chơi
+            **kwargs: Các tùy chọn tìm kiếm của MCTS (xem MCTS.__init__)
+        """
+        super().__init__(game, **kwargs)
+        self._action_dtype = np.int16 if game.action_space < 2 ** 15 else np.int32
+        # tổng số hành động hợp lệ của mọi nút, để ước tính bộ nhớ mà không duyệt cả cây
+        self._legal_total = 0
+
+    def clear(self):
+        super().clear()
+        self._legal_total = 0
+
+    def _scatter(self, state_int: StateInt, values: np.ndarray) -> np.ndarray:
+        """
+        Đưa một mảng gọn của nút về mảng đầy đủ theo không gian hành động (0 ở các nước không hợp lệ)
+        """
+        full = np.zeros(self.game.action_space, dtype=values.dtype)
+        full[self.legal[state_int]] = values
+        return full
+
+    def _node_stats(self, state_int: StateInt) -> Tuple:
+        return (self._scatter(state_int, self.visit_count[state_int]),
+                self._scatter(state_int, self.value_avg[state_int]),
+                self._scatter(state_int, self.probs[state_int]))
+
+    def _selection_stats(self, state_int: StateInt) -> Tuple[int, np.ndarray]:
+        legal = np.zeros(self.game.action_space, dtype=bool)
+        legal[self.legal[state_int]] = True
+        return self.visit_total[state_int], legal
+
+    def _add_noise(self, probs: np.ndarray, state_int: StateInt) -> np.ndarray:
+        if self._root_state != state_int:
+            self.begin_search(state_int)
+        if self._root_noise is None:
+            return probs
+        explore = cfg.EXPLORE
+        return (1 - explore) * probs + explore * self._root_noise[self.legal[state_int]]
+
+    def _select_action(self, state_int: StateInt, is_root: bool) -> int:
+        """
+        Chọn hành động có điểm PUCT cao nhất trên các mảng gọn của nút: mọi phần tử đều là
+        nước hợp lệ nên không cần mặt nạ, chỉ số được đổi lại thành ô trên bàn cờ
+
+        Đối số:
+            state_int (int): Trạng thái của nút (đã mở rộng)
+            is_root (bool): Nút có phải là gốc của lượt tìm kiếm hay không (để thêm nhiễu)
+
+        Trả về:
+            int: Hành động được chọn
+        """
+        probs = self.probs[state_int]
+        if is_root:
+            probs = self._add_noise(probs, state_int)
+        scores = self._calculate_upper_bound(self.value_avg[state_int], probs,
+                                             self.visit_count[state_int], self.visit_total[state_int])
+        return int(self.legal[state_int][np.argmax(scores)])
+
+    def _create_node(self, leaf_state: int, prob: Union[List[float], np.ndarray]):
+        """
+        Tạo nút mới chỉ với các hành động hợp lệ. Xác suất trước là phần đầu ra của mạng
+        tại các nước hợp lệ (không chuẩn hóa lại, giống các kho nút khác)
+
+        Đối số:
+            leaf_state (int): Trạng thái trò chơi của nút lá mới
+            prob (List[float] hoặc np.ndarray): Xác suất trước của mỗi hành động ở trạng thái đó
+        """
+        actions = np.flatnonzero(self.game.legal_moves_mask(leaf_state)).astype(self._action_dtype)
+        size = len(actions)
+        self.visit_count[leaf_state] = np.zeros(size, dtype=np.int32)
+        self.value[leaf_state] = np.zeros(size, dtype=np.float32)
+        self.value_avg[leaf_state] = np.zeros(size, dtype=np.float32)
+        # phép lấy theo chỉ số tạo mảng mới nên không giữ lại cả lô đầu ra của mạng
+        self.probs[leaf_state] = np.asarray(prob, dtype=np.float32)[actions]
+        self.visit_total[leaf_state] = 0
+        self.legal[leaf_state] = actions
+        self.last_touched[leaf_state] = self.tick
+        self.children[leaf_state] = {}
+        self.nodes_created += 1
+        self._legal_total += size
+
+    def _free_nodes(self, keep: set) -> None:
+        self._legal_total -= sum(len(actions) for state_int, actions in self.legal.items()
+                                 if state_int not in keep)
+        super()._free_nodes(keep)
+
+    def _backup(self, value: float, states: List[StateInt], actions: List[int]):
+        """
+        Như MCTS._backup, ô trên bàn cờ được đổi thành chỉ số trong các mảng gọn của nút
+        bằng tìm kiếm nhị phân trên mảng chỉ số (đã sắp tăng dần). Phép tính trên từng phần tử
+        dùng số Python, nhanh hơn phép tính vô hướng của NumPy giữa int32 và float32
+        """
+        cur_value = -value
+        for state_int, action in zip(states[::-1], actions[::-1]):
+            idx = bisect.bisect_left(self.legal[state_int], action)
+            counts, values = self.visit_count[state_int], self.value[state_int]
+            count = int(counts[idx]) + 1
+            total = float(values[idx]) + cur_value
+            counts[idx] = count
+            values[idx] = total
+            self.value_avg[state_int][idx] = total / count
+            self.visit_total[state_int] += 1
+            self.last_touched[state_int] = self.tick
+            cur_value = -cur_value
+
+    def _apply_virtual_loss(self, states: List[StateInt], actions: List[int], visits: int) -> None:
+        for state_int, action in zip(states, actions):
+            idx = bisect.bisect_left(self.legal[state_int], action)
+            counts, values = self.visit_count[state_int], self.value[state_int]
+            count = int(counts[idx]) + visits
+            total = float(values[idx]) - visits
+            counts[idx] = count
+            values[idx] = total
+            self.value_avg[state_int][idx] = total / count if count else 0.0
+            self.visit_total[state_int] += visits
+
+    def _bytes_per_node(self) -> int:
+        nodes = len(self)
+        # số hành động hợp lệ trung bình, cả không gian hành động khi cây còn rỗng
+        size = self._legal_total / nodes if nodes else self.game.action_space
+        itemsize = 3 * 4 + 4 + np.dtype(self._action_dtype).itemsize
+        arrays = 4 * sys.getsizeof(np.zeros(0, dtype=np.float32)) + \
+            sys.getsizeof(np.zeros(0, dtype=self._action_dtype)) + int(size * itemsize)
+        entries = 8 * 3 * 8 * 3 // 2
+        return arrays + entries + self._key_bytes() + 2 * sys.getsizeof(2 ** 62) + \
+            self._edge_bytes()
+
+
+def make_mcts(game: BaseGame, store: str = cfg.MCTS_NODE_STORE, **kwargs) -> MCTS:
+    """
+    Tạo cây MCTS với kho nút được chọn
+
+    Đối số:
+        game (BaseGame): Trò chơi
+        store (str, tùy chọn): "dict" - bốn dict chứa danh sách Python (MCTS),
+        "array" - ma trận NumPy cấp phát trước (ArrayMCTS), "sparse" - mảng gọn chỉ trên các
+        hành động hợp lệ (SparseMCTS). Mặc định là cfg.MCTS_NODE_STORE.
+        **kwargs: Các tùy chọn tìm kiếm chuyển cho MCTS (xem MCTS.__init__)
+
+    Trả về:
+        MCTS: Cây tìm kiếm mới
+    """
+    if store == "dict":
+        return MCTS(game, **kwargs)
+    if store == "array":
+        return ArrayMCTS(game, **kwargs)
+    if store == "sparse":
+        return SparseMCTS(game, **kwargs)
+    raise ValueError("Kho nút MCTS không hợp lệ: %s" % store)
+
+
+def search_lockstep(trees: List[MCTS], count: Union[int, List[int]], batch_size: int,
+                    states: List[StateInt], players: List[int], net: Union[Evaluator, Net],
+                    device: str = "cpu", noise: Union[bool, List[bool]] = True) -> int:
+    """
+    Tìm kiếm đồng thời trên nhiều cây (mỗi ván một cây). Mỗi vòng, mọi cây gom lô lá
+    của mình như search_minibatch, các lá được gộp lại và đánh giá bằng một lần gọi mạng,
+    rồi kết quả được chia về từng cây để tạo nút và sao lưu. Mỗi cây cho kết quả
+    như khi gọi search_batch riêng lẻ, chỉ khác là lô gửi tới mạng lớn hơn nhiều lần.
+
+    Đối số:
+        trees (List[MCTS]): Các cây, mỗi cây xuất hiện một lần
+        count (int hoặc List[int]): Số lô nhỏ cho mỗi cây, hoặc riêng cho từng cây;
+        cây đã đủ số lô của mình đứng ngoài các vòng sau
+        batch_size (int): Số lượt duyệt mỗi lô nhỏ của mỗi cây
+        states (List[int]): Trạng thái gốc của mỗi cây
+        players (List[int]): Người chơi đến lượt tại mỗi gốc
+        net (Evaluator hoặc Net): Bộ đánh giá (hoặc mạng nơ-ron) dùng chung
+        device (str, tùy chọn): Thiết bị PyTorch khi net là mạng nơ-ron. Mặc định là "cpu".
+        noise (bool hoặc List[bool], tùy chọn): Thêm nhiễu Dirichlet tại gốc, cho mọi cây
+        hoặc riêng cho từng cây. Mặc định là True.
+
+    Trả về:
+        int: Tổng số lá đã gửi tới mạng
+    """
+    assert len({id(tree) for tree in trees}) == len(trees), "mỗi cây chỉ được xuất hiện một lần"
+    if not trees:
+        return 0
+    evaluator = as_evaluator(net, trees[0].game, device)
+    counts = [count] * len(trees) if isinstance(count, int) else count
+    noises = [noise] * len(trees) if isinstance(noise, bool) else noise
+    for tree, state, tree_noise in zip(trees, states, noises):
+        tree.begin_search(state, tree_noise)
+    evaluated = 0
+    for round_idx in range(max(counts)):
+        active = [idx for idx, tree_count in enumerate(counts) if round_idx < tree_count]
+        collected = []
+        leaf_states, leaf_players = [], []
+        for idx in active:
+            tree, state, player = trees[idx], states[idx], players[idx]
+            tree.tick += 1
+            batch = tree._collect_leaves(batch_size, state, player)
+            collected.append(batch)
+            leaf_states.extend(batch[1])
+            leaf_players.extend(batch[2])
+
+        if leaf_states:
+            probs, values = evaluator(leaf_states, leaf_players)
+            evaluated += len(leaf_states)
+        offset = 0
+        for idx, (backup_queue, expand_states, _, expand_queue, paths) in zip(active, collected):
+            tree = trees[idx]
+            if expand_queue:
+                end = offset + len(expand_states)
+                tree._create_nodes(expand_queue, probs[offset:end], values[offset:end], backup_queue)
+                offset = end
+            tree._apply_results(backup_queue, paths)
+            tree._enforce_budget()
+    return evaluated
@@ -1,14 +1,20 @@
 import copy
+import itertools
 import numpy as np
 import torch
 import torch.nn as nn
 
 NUM_FILTERS = 128
 
+# Bộ đếm phiên bản trọng số, duy nhất trong tiến trình: mỗi lần trọng số của một mạng
+# thay đổi, mạng nhận một phiên bản mới (dùng làm khóa cho bộ nhớ đệm đánh giá)
+_weights_version = itertools.count(1)
+
 # Mạng nơ-ron để dự đoán giá trị và chính sách
 class Net(nn.Module):
     def __init__(self, input_shape, actions_n):
         super(Net, self).__init__()
+        self.version = next(_weights_version)
 
         # Khởi tạo các tham số của mạng nơ-ron
         self.conv_in = nn.Sequential(
@@ -71,6 +77,18 @@ class Net(nn.Module):
             nn.Linear(conv_policy_size, actions_n)
         )
 
+    def bump_version(self):
+        """
+        Đánh dấu trọng số đã thay đổi (sau khi huấn luyện hoặc nạp trọng số mới),
+        để các kết quả đánh giá cũ trong bộ nhớ đệm không còn được dùng
+        """
+        self.version = next(_weights_version)
+
+    def load_state_dict(self, *args, **kwargs):
+        result = super(Net, self).load_state_dict(*args, **kwargs)
+        self.bump_version()
+        return result
+
     # Lấy kích thước đầu ra của đầu giá trị
     def _get_conv_val_size(self, shape):
         o = self.conv_val(torch.zeros(1, *shape))
@@ -106,7 +124,67 @@ class NetWrapper:
     def __init__(self, model):
         self.model = model
         self.target_model = copy.deepcopy(model)
+        # bản sao có trọng số riêng, cần phiên bản riêng
+        self.target_model.bump_version()
 
     # Hàm đồng bộ hóa trọng số của mô hình với mô hình mục tiêu
     def sync(self):
         self.target_model.load_state_dict(self.model.state_dict())
+
+
+class SharedWeights:
+    """
+    Bản sao trọng số của một mạng đặt trong bộ nhớ dùng chung giữa các tiến trình, kèm số
+    phiên bản. Tiến trình huấn luyện gọi publish() khi có trọng số mới, các tiến trình khác
+    gọi load_into() để chép trọng số về mạng của mình khi phiên bản thay đổi.
+    """
+
+    def __init__(self, net: Net, ctx):
+        """
+        Đối số:
+            net (Net): Mạng có trọng số ban đầu
+            ctx (multiprocessing context): Ngữ cảnh dùng để tạo các tiến trình con
+        """
+        self.net = copy.deepcopy(net).cpu()
+        self.net.share_memory()
+        self._version = ctx.Value('i', 0)
+        self._lock = ctx.Lock()
+
+    @property
+    def version(self) -> int:
+        return self._version.value
+
+    def publish(self, net: Net) -> int:
+        """
+        Chép trọng số mới vào bộ nhớ dùng chung và tăng phiên bản
+
+        Đối số:
+            net (Net): Mạng có trọng số mới
+
+        Trả về:
+            int: Phiên bản mới
+        """
+        with self._lock:
+            shared = self.net.state_dict()
+            with torch.no_grad():
+                for name, tensor in net.state_dict().items():
+                    shared[name].copy_(tensor)
+            self._version.value += 1
+            return self._version.value
+
+    def load_into(self, net: Net, version: int) -> int:
+        """
+        Chép trọng số dùng chung vào net nếu phiên bản khác version
+
+        Đối số:
+            net (Net): Mạng nhận trọng số
+            version (int): Phiên bản trọng số net đang có (-1 nếu chưa có)
+
+        Trả về:
+            int: Phiên bản trọng số net có sau khi gọi
+        """
+        if self._version.value == version:
+            return version
+        with self._lock:
+            net.load_state_dict(self.net.state_dict())
+            return self._version.value
@@ -1,11 +1,14 @@
+import threading
+from typing import List, Optional
 import torch
 import numpy as np
 import config as cfg
 from lib import model, mcts
+from lib.evaluator import Evaluator
 
 # Lớp phiên để quản lý phiên trò chơi, bao gồm MCTS và tương tác mô hình
 class Session:
-    def __init__(self, game, model_file, player_moves_first):
+    def __init__(self, game, model_file, player_moves_first, ponder: bool = cfg.BOT_PONDER):
         self.game = game
         self.BOT_PLAYER = game.player_black
         self.USER_PLAYER = game.player_white
@@ -14,34 +17,113 @@ class Session:
             input_shape=game.obs_shape, actions_n=game.action_space)
         self.model.load_state_dict(torch.load(
             model_file, map_location=lambda storage, loc: storage))
+        self.evaluator = Evaluator(self.model, game, batch_size=cfg.BOT_MCTS_BATCH_SIZE)
         self.state = game.initial_state
+        # giá trị kết thúc của trạng thái hiện tại, đọc từ cạnh của cây (-1 thắng, 0 hòa, None chưa kết thúc)
+        self._end_value: Optional[float] = None
+        # mặt nạ nước đi hợp lệ của trạng thái hiện tại, chép từ nút gốc của cây sau mỗi nước đi
+        # (trước khi luồng suy nghĩ trước chạy) để is_valid_move không phải giải mã trạng thái
+        self._legal = game.legal_moves_mask(self.state)
         self.value = None
         self.player_moves_first = player_moves_first
-        self.moves = []
-        self.mcts_store = mcts.MCTS(game)
+        self.moves: List[int] = []
+        # cây của bot có giới hạn bộ nhớ riêng vì suy nghĩ trước có thể chạy lâu trên bàn cờ lớn
+        self.mcts_store = mcts.make_mcts(game, max_bytes=cfg.BOT_MAX_BYTES)
+        # suy nghĩ trước: tìm kiếm ở luồng nền trong lượt của người chơi
+        self.ponder = ponder
+        self._ponder_thread: Optional[threading.Thread] = None
+        self._ponder_stop = threading.Event()
+        if player_moves_first:
+            self._start_pondering()
+
+    def _start_pondering(self) -> None:
+        if not self.ponder or self._ponder_thread is not None:
+            return
+        self._ponder_stop.clear()
+        self._ponder_thread = threading.Thread(
+            target=self._ponder_loop, args=(self.state,), daemon=True)
+        self._ponder_thread.start()
+
+    def _stop_pondering(self) -> None:
+        if self._ponder_thread is None:
+            return
+        # lô nhỏ đang chạy được hoàn tất, cây không bị bỏ dở giữa chừng
+        self._ponder_stop.set()
+        self._ponder_thread.join()
+        self._ponder_thread = None
+
+    def _ponder_loop(self, state) -> None:
+        """
+        Tìm kiếm thế cờ người chơi đang cân nhắc cho tới khi người chơi đi, gốc đạt
+        cfg.BOT_PONDER_MAX_VISITS lượt truy cập hoặc cây gần chạm giới hạn bộ nhớ
+        (cfg.BOT_MAX_BYTES). Khi người chơi đi, cây con của nước đó được giữ lại (reroot)
+        nên các lượt truy cập đã tích lũy được dùng cho nước của bot.
+        """
+        budget = self.mcts_store.node_budget()
+        # dừng trước mức bị loại nút, để không loại rồi mở rộng lại liên tục
+        max_nodes = int(budget * (1 - cfg.MCTS_EVICT_FRACTION)) if budget else 0
+        while not self._ponder_stop.is_set():
+            full = max_nodes > 0 and len(self.mcts_store) >= max_nodes
+            visited = not self.mcts_store.is_leaf(state) and \
+                self.mcts_store._selection_stats(state)[0] >= cfg.BOT_PONDER_MAX_VISITS
+            if full or visited:
+                self._ponder_stop.wait(0.1)
+                continue
+            self.mcts_store.search_minibatch(
+                cfg.BOT_MCTS_BATCH_SIZE, state, self.USER_PLAYER, self.evaluator)
+
+    def close(self) -> None:
+        """
+        Dừng luồng suy nghĩ trước (nếu có) và luồng nền của cây, gọi khi bỏ phiên
+        """
+        self._stop_pondering()
+        self.mcts_store.close()
+
+    def _root_visits(self) -> int:
+        if self.mcts_store.is_leaf(self.state):
+            return 0
+        return int(self.mcts_store._selection_stats(self.state)[0])
 
     def move_player(self, move: int) -> bool:
+        self._stop_pondering()
         self.moves.append(move)
         print("Người chơi chọn nước đi:", move)
-        self.state, won = self.game.move(self.state, move, self.USER_PLAYER)
-        return won
+        self.state, self._end_value = self.mcts_store.play(self.state, move, self.USER_PLAYER)
+        # giữ lại cây con của nước đi vừa chơi, giải phóng phần còn lại
+        self.mcts_store.reroot(self.state, self.BOT_PLAYER)
+        self._legal = self.mcts_store.legal_mask(self.state).copy()
+        return self._end_value == -1.0
 
     def move_bot(self) -> bool:
-        self.mcts_store.search_batch(
-            cfg.BOT_MCTS_SEARCHES, cfg.BOT_MCTS_BATCH_SIZE, self.state, self.BOT_PLAYER, self.model)
+        # khi suy nghĩ trước, các lượt truy cập đã có ở gốc được tính vào ngân sách
+        pondered = self._root_visits() if self.ponder else 0
+        if cfg.BOT_TIME_LIMIT > 0 or cfg.BOT_MAX_VISITS > 0:
+            # ngân sách thời gian/lượt truy cập giữ thời gian phản hồi ổn định trên mọi bàn cờ
+            max_visits = max(1, cfg.BOT_MAX_VISITS - pondered) if cfg.BOT_MAX_VISITS > 0 else None
+            self.mcts_store.search_budget(
+                cfg.BOT_MCTS_BATCH_SIZE, self.state, self.BOT_PLAYER, self.evaluator,
+                time_limit=cfg.BOT_TIME_LIMIT or None, max_visits=max_visits)
+        else:
+            searches = max(1, cfg.BOT_MCTS_SEARCHES - pondered // cfg.BOT_MCTS_BATCH_SIZE)
+            self.mcts_store.search_batch(
+                searches, cfg.BOT_MCTS_BATCH_SIZE, self.state, self.BOT_PLAYER, self.evaluator)
         probs, values = self.mcts_store.get_policy_value(self.state, tau=0)
         action = np.random.choice(self.game.action_space, p=probs)
         self.value = values[action]
         self.moves.append(action)
         print("Bot chọn nước đi:", action, "với xác suất:", probs[action])
-        self.state, won = self.game.move(self.state, action, self.BOT_PLAYER)
-        return won
+        self.state, self._end_value = self.mcts_store.play(self.state, action, self.BOT_PLAYER)
+        self.mcts_store.reroot(self.state, self.USER_PLAYER)
+        self._legal = self.mcts_store.legal_mask(self.state).copy()
+        if self._end_value is None:
+            self._start_pondering()
+        return self._end_value == -1.0
 
     def is_valid_move(self, move: int) -> bool:
-        return move in self.game.possible_moves(self.state)
+        return 0 <= move < self.game.action_space and bool(self._legal[move])
 
     def is_draw(self) -> bool:
-        return len(self.game.possible_moves(self.state)) == 0
+        return self._end_value == 0.0
 
     def render(self) -> str:
         board = self.game.render(self.state)
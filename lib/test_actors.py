@@ -0,0 +1,37 @@
+import collections
+
+import pytest
+import torch
+
+from lib.actors import SelfPlayActors, _split_games
+from lib.game.tictactoe.tictactoe import TicTacToe
+from lib.model import Net
+
+
+class TestSelfPlayActors:
+    def test_split_games(self):
+        game = TicTacToe()
+        second = game.move(game.initial_state, 4, 1)[0]
+        # ván thứ hai không bắt đầu từ trạng thái ban đầu: ranh giới chỉ dựa vào số bản ghi
+        buffer = collections.deque([(second, 0, None, 1), (game.initial_state, 1, None, -1),
+                                    (second, 0, None, 0)])
+        assert [len(record) for record in _split_games(buffer, [2, 1])] == [2, 1]
+
+    @pytest.mark.parametrize("inference_server", [False, True])
+    def test_stream_games_and_publish(self, inference_server):
+        game = TicTacToe()
+        net = Net(game.obs_shape, game.action_space)
+        replay_buffer = collections.deque()
+        with SelfPlayActors(game, net, workers=2, parallel_games=2, steps_before_tau_0=2,
+                            mcts_searches=2, mcts_batch_size=4,
+                            inference_server=inference_server) as actors:
+            games, steps, _ = actors.collect(replay_buffer, 4, timeout=120)
+            assert games == 4 and len(replay_buffer) == steps + games
+
+            with torch.no_grad():
+                for param in net.parameters():
+                    param.zero_()
+            assert actors.publish(net) == 1
+            assert all((p == 0).all() for p in actors.weights.net.parameters())
+            games, _, _ = actors.collect(None, 2, timeout=120)
+            assert games == 2
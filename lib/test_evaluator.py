@@ -0,0 +1,95 @@
+import numpy as np
+import torch
+import torch.nn.functional as F
+from unittest.mock import MagicMock
+
+from lib.evaluator import EvalCache, Evaluator, as_evaluator
+from lib.game.game import BaseGame
+from lib.game.tictactoe.tictactoe import TicTacToe
+from lib.model import Net
+
+
+class TestEvaluator:
+    def test_matches_eval_forward(self):
+        game = TicTacToe()
+        net = Net(game.obs_shape, game.action_space)
+        evaluator = Evaluator(net, game, batch_size=2)
+        states = [game.initial_state, game.move(game.initial_state, 4, 1)[0]]
+        players = [1, 0]
+        probs, values = evaluator(states, players)
+        assert not net.training
+
+        with torch.no_grad():
+            batch = torch.tensor(game.states_to_training_batch(states, players))
+            logits_v, values_v = net(batch)
+        np.testing.assert_allclose(probs, F.softmax(logits_v, dim=1).numpy(), rtol=1e-5)
+        np.testing.assert_allclose(values, values_v[:, 0].numpy(), rtol=1e-5)
+
+    def test_restores_eval_mode_and_reuses_buffer(self):
+        game = TicTacToe()
+        net = Net(game.obs_shape, game.action_space)
+        evaluator = Evaluator(net, game, use_cache=False)
+        assert as_evaluator(evaluator, game) is evaluator
+
+        evaluator([game.initial_state] * 3, [0] * 3)
+        buffer = evaluator._buffer
+        net.train()
+        probs, values = evaluator([game.initial_state], [0])
+        assert not net.training
+        assert evaluator._buffer is buffer
+        assert probs.shape == (1, game.action_space) and values.shape == (1,)
+
+        evaluator([game.initial_state] * 100, [0] * 100)
+        assert evaluator._buffer.shape[0] >= 100
+
+
+class TestEvalCache:
+    def test_shared_and_invalidated_by_version(self):
+        game = TicTacToe()
+        net = Net(game.obs_shape, game.action_space)
+        cache = EvalCache(max_size=10, symmetry=False)
+        first, second = Evaluator(net, game), Evaluator(net, game)
+        first.cache = second.cache = cache
+        states = [game.initial_state, game.move(game.initial_state, 4, 1)[0]]
+        probs, values = first(states, [1, 0])
+        assert (cache.hits, cache.misses) == (0, 2)
+
+        cached_probs, cached_values = second(states, [1, 0])
+        assert (cache.hits, cache.misses) == (2, 2)
+        assert cache.hit_rate() == 0.5
+        np.testing.assert_array_equal(probs, cached_probs)
+        np.testing.assert_array_equal(values, cached_values)
+
+        net.bump_version()
+        second(states, [1, 0])
+        assert cache.misses == 4
+
+    def test_lru_size(self):
+        cache = EvalCache(max_size=2)
+        for state in range(3):
+            cache.put(state, np.zeros(1), 0.0)
+        assert len(cache) == 2 and cache.get(0) is None
+
+    def test_symmetry_maps_policy(self):
+        game = TicTacToe()
+        net = Net(game.obs_shape, game.action_space)
+        evaluator = Evaluator(net, game)
+        evaluator.cache = EvalCache(max_size=10, symmetry=True)
+        state = game.move(game.move(game.initial_state, 0, 1)[0], 5, 0)[0]
+        probs, values = evaluator([state], [1])
+
+        perms = game.tables.symmetries
+        for t in range(1, 8):
+            cells = game.state_cells(state)[perms[t]]
+            rotated = game.encode_game_state(cells.reshape(3, 3).tolist())
+            rotated_probs, rotated_values = evaluator([rotated], [1])
+            np.testing.assert_allclose(rotated_probs[0], probs[0][perms[t]], rtol=1e-6)
+            assert rotated_values[0] == values[0]
+        assert evaluator.cache.misses == 1
+
+    def test_symmetry_needs_board_tables(self):
+        # trò chơi không có bảng đối xứng: khóa thường, không gọi state_cells
+        game = MagicMock(spec=BaseGame)
+        cache = EvalCache(max_size=10, symmetry=True)
+        assert cache.key(game, 3, 123, 1) == ((3, 123, 1), None)
+        game.state_cells.assert_not_called()
@@ -0,0 +1,56 @@
+import numpy as np
+import torch
+import torch.multiprocessing as mp
+
+from lib.evaluator import Evaluator
+from lib.game.tictactoe.tictactoe import TicTacToe
+from lib.inference_server import InferenceServer
+from lib.mcts import make_mcts
+from lib.model import Net
+
+
+def _client_worker(client, states, players, results):
+    probs, values = client(states, players)
+    results.put((probs, values))
+
+
+class TestInferenceServer:
+    def test_matches_local_evaluator_and_batches_clients(self):
+        game = TicTacToe()
+        net = Net(game.obs_shape, game.action_space)
+        states = [game.initial_state, game.move(game.initial_state, 4, 1)[0]]
+        expected_probs, expected_values = Evaluator(net, game, use_cache=False)(states, [1, 0])
+
+        ctx = mp.get_context("spawn")
+        # lô đủ lớn và thời gian chờ dài để hai khách được gộp vào cùng một lô
+        with InferenceServer(game, net, clients=2, max_batch=4, max_wait=5.0, ctx=ctx) as server:
+            results = ctx.Queue()
+            workers = [ctx.Process(target=_client_worker,
+                                   args=(server.client(idx), states, [1, 0], results))
+                       for idx in range(2)]
+            for worker in workers:
+                worker.start()
+            for _ in workers:
+                probs, values = results.get(timeout=60)
+                np.testing.assert_allclose(probs, expected_probs, rtol=1e-5)
+                np.testing.assert_allclose(values, expected_values, rtol=1e-5)
+            for worker in workers:
+                worker.join()
+            assert server.mean_batch_size() == 4
+
+    def test_publish_and_mcts_client(self):
+        game = TicTacToe()
+        net = Net(game.obs_shape, game.action_space)
+        with InferenceServer(game, net, clients=1, max_wait=0.0) as server:
+            client = server.client(0)
+            tree = make_mcts(game, "dict", seed=0)
+            tree.search_batch(2, 4, game.initial_state, 1, client)
+            assert len(tree) > 1
+
+            with torch.no_grad():
+                for param in net.parameters():
+                    param.zero_()
+            server.publish(net)
+            probs, values = client([game.initial_state], [1])
+            np.testing.assert_allclose(probs, np.full((1, 9), 1 / 9), rtol=1e-5)
+            assert values[0] == 0
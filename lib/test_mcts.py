@@ -1,6 +1,10 @@
 import pytest
+import numpy as np
+import torch
 from unittest.mock import MagicMock, patch
-from lib.mcts import MCTS
+from lib.mcts import MCTS, ArrayMCTS, make_mcts, search_lockstep
+from lib.game.caro_5x5.caro_5x5 import Caro5x5
+from lib.game.tictactoe.tictactoe import TicTacToe
 
 @pytest.fixture
 def tree():
@@ -37,3 +41,493 @@ class TestBackup:
         # Giá trị trung bình trên visit_count
         assert tree.value_avg == {
             1: [0.0, 0.15], 2: [0.4, 0.0], 3: [-0.2, 0.0]}
+
+
+def uniform_net(batch):
+    """Mạng giả: xác suất đều cho mọi hành động, giá trị 0 cho mọi trạng thái"""
+    return torch.zeros(batch.shape[0], 9), torch.zeros(batch.shape[0], 1)
+
+
+@pytest.fixture
+def array_tree(tree):
+    """Cùng cây với fixture tree nhưng lưu trong ArrayMCTS"""
+    tree.game.action_space = 2
+    tree.game.legal_moves_mask.return_value = np.ones(2, dtype=bool)
+    array_tree = ArrayMCTS(tree.game, chunk_size=2)
+    for state_int in (1, 2, 3):
+        array_tree._create_node(state_int, tree.probs[state_int])
+        idx = array_tree.node_index[state_int]
+        array_tree._counts[idx] = tree.visit_count[state_int]
+        array_tree._value[idx] = tree.value[state_int]
+        array_tree._value_avg[idx] = tree.value_avg[state_int]
+    return array_tree
+
+
+class TestArrayMCTS:
+    def test_back_up(self, tree, array_tree):
+        tree._backup(0.2, [1, 2, 3], [1, 0, 0])
+        array_tree._backup(0.2, [1, 2, 3], [1, 0, 0])
+        assert array_tree.capacity >= 3
+        for state_int in (1, 2, 3):
+            counts, values_avg, probs = array_tree._node_stats(state_int)
+            assert counts.tolist() == tree.visit_count[state_int]
+            np.testing.assert_allclose(values_avg, tree.value_avg[state_int], rtol=1e-6)
+            np.testing.assert_allclose(probs, tree.probs[state_int], rtol=1e-6)
+
+    def test_search_same_as_dict_store(self):
+        game = TicTacToe()
+        stores = [make_mcts(game, "dict", seed=0), make_mcts(game, "array", seed=0)]
+        for store in stores:
+            store.search_batch(5, 8, game.initial_state, 0, uniform_net)
+        assert len(stores[0]) == len(stores[1])
+        probs_dict, values_dict = stores[0].get_policy_value(game.initial_state)
+        probs_array, values_array = stores[1].get_policy_value(game.initial_state)
+        np.testing.assert_allclose(probs_dict, probs_array)
+        np.testing.assert_allclose(values_dict, values_array, rtol=1e-6)
+
+    def test_selection_stats(self):
+        game = TicTacToe()
+        store = make_mcts(game, "array")
+        store.search_batch(3, 8, game.initial_state, 0, uniform_net)
+        total, legal = store._selection_stats(game.initial_state)
+        counts, _, _ = store._node_stats(game.initial_state)
+        assert total == counts.sum()
+        assert legal.tolist() == game.legal_moves_mask(game.initial_state).tolist()
+
+    def test_memory_stats(self):
+        game = TicTacToe()
+        store = make_mcts(game, "array")
+        store.search_batch(2, 8, game.initial_state, 0, uniform_net)
+        stats = store.memory_stats()
+        assert stats["nodes"] == len(store) > 0
+        assert stats["capacity"] >= stats["nodes"]
+        assert stats["bytes_per_node"] > 0
+        store.clear()
+        assert len(store) == 0 and store.is_leaf(game.initial_state)
+
+    def test_grows_geometrically_past_budget(self):
+        # một lô lớn so với giới hạn tạo nhiều nút trước khi kịp loại bớt
+        game = TicTacToe()
+        store = ArrayMCTS(game, chunk_size=4, max_nodes=10)
+        with patch.object(store, "_allocate", wraps=store._allocate) as allocate:
+            for state in range(200):
+                store._create_node(state, np.full(9, 1 / 9))
+        assert len(store) == 200 and store.capacity >= 200
+        assert allocate.call_count < 15
+
+
+class TestSparseMCTS:
+    def test_search_same_as_dict_store(self):
+        game = TicTacToe()
+        state = game.move(game.move(game.initial_state, 4, 1)[0], 0, 0)[0]
+        stores = [make_mcts(game, "dict", seed=0), make_mcts(game, "sparse", seed=0)]
+        for store in stores:
+            store.search_batch(5, 8, state, 1, uniform_net)
+        assert len(stores[0]) == len(stores[1])
+        probs_dict, values_dict = stores[0].get_policy_value(state)
+        probs_sparse, values_sparse = stores[1].get_policy_value(state)
+        np.testing.assert_allclose(probs_dict, probs_sparse)
+        np.testing.assert_allclose(values_dict, values_sparse, rtol=1e-6)
+
+    def test_stores_only_legal_actions(self):
+        game = TicTacToe()
+        state = game.move(game.move(game.initial_state, 4, 1)[0], 0, 0)[0]
+        tree = make_mcts(game, "sparse", seed=0)
+        tree.search_batch(3, 8, state, 1, uniform_net)
+        for state_int in tree._node_states():
+            actions = tree.legal[state_int]
+            assert actions.tolist() == np.flatnonzero(game.legal_moves_mask(state_int)).tolist()
+            assert len(tree.visit_count[state_int]) == len(tree.probs[state_int]) == len(actions)
+            counts, _, probs = tree._node_stats(state_int)
+            # các nước không hợp lệ không bao giờ được chọn và không có xác suất trước
+            assert not np.asarray(counts)[~game.legal_moves_mask(state_int)].any()
+            assert not np.asarray(probs)[~game.legal_moves_mask(state_int)].any()
+
+    def test_less_memory_than_dict_store(self):
+        game = TicTacToe()
+        state = game.initial_state
+        for action, player in ((4, 1), (0, 0), (8, 1), (2, 0)):
+            state = game.move(state, action, player)[0]
+        stats = {}
+        for store in ("dict", "sparse"):
+            tree = make_mcts(game, store, seed=0)
+            tree.search_batch(3, 8, state, 1, uniform_net)
+            stats[store] = tree.memory_stats()["bytes_per_node"]
+            assert tree._bytes_per_node() > 0
+        assert stats["sparse"] < stats["dict"]
+
+
+class TestSelectAction:
+    @pytest.mark.parametrize("store", ["dict", "array", "sparse"])
+    def test_skips_illegal_and_matches_formula(self, store):
+        game = TicTacToe()
+        tree = make_mcts(game, store)
+        state = game.move(game.initial_state, 4, 1)[0]
+        probs = np.zeros(9, dtype=np.float32)
+        probs[4] = 1.0  # ô đã có quân nhưng xác suất trước cao nhất
+        tree._create_node(state, probs)
+        assert tree._select_action(state, is_root=False) != 4
+
+        tree._backup(0.5, [state], [0])
+        tree._backup(-0.5, [state], [8])
+        counts, values_avg, probs = tree._node_stats(state)
+        total, legal = tree._selection_stats(state)
+        assert total == 2
+        scores = [values_avg[a] + tree.c_puct * probs[a] * np.sqrt(total) / (1 + counts[a])
+                  if legal[a] else -np.inf for a in range(9)]
+        assert tree._select_action(state, is_root=False) == int(np.argmax(scores))
+
+
+class TestVirtualLoss:
+    @pytest.mark.parametrize("store", ["dict", "array", "sparse"])
+    def test_fills_batch_and_is_reverted(self, store):
+        game = TicTacToe()
+        fill = {}
+        for virtual_loss in (0, 3):
+            tree = make_mcts(game, store, virtual_loss=virtual_loss, seed=0)
+            tree.search_batch(4, 8, game.initial_state, 1, uniform_net)
+            fill[virtual_loss] = tree.batch_fill_ratio()
+            # không còn thua ảo nào sót lại sau khi sao lưu
+            for state_int in list(tree.node_index if store == "array" else tree.probs):
+                counts, values_avg, _ = tree._node_stats(state_int)
+                total, _ = tree._selection_stats(state_int)
+                assert (np.asarray(counts) >= 0).all()
+                assert total == np.sum(counts)
+        assert fill[3] > fill[0]
+
+    def test_adaptive(self):
+        game = TicTacToe()
+        tree = make_mcts(game, "array", virtual_loss=1, adaptive_virtual_loss=True)
+        # lô đầu tiên chỉ có một lá (gốc) nên thua ảo được tăng lên
+        tree.search_minibatch(8, game.initial_state, 1, uniform_net)
+        assert tree.virtual_loss == 2
+        tree.reset_batch_stats()
+        assert tree.batch_fill_ratio() == 0.0
+
+
+class TestRootNoise:
+    def test_sampled_once_per_search(self):
+        game = TicTacToe()
+        tree = make_mcts(game, "array", seed=0)
+        tree.rng = MagicMock(wraps=tree.rng)
+        tree.search_batch(4, 8, game.initial_state, 1, uniform_net)
+        assert tree.rng.dirichlet.call_count == 1
+        tree.search_batch(4, 8, game.initial_state, 1, uniform_net)
+        assert tree.rng.dirichlet.call_count == 2
+
+    def test_reproducible_with_seed(self):
+        game = TicTacToe()
+        policies = []
+        for _ in range(2):
+            tree = make_mcts(game, "dict", seed=7)
+            tree.search_batch(4, 8, game.initial_state, 1, uniform_net)
+            policies.append(tree.get_policy_value(game.initial_state)[0])
+        assert policies[0] == policies[1]
+
+
+class TestReroot:
+    @pytest.mark.parametrize("store", ["dict", "array", "sparse"])
+    def test_keeps_only_subtree(self, store):
+        game = TicTacToe()
+        tree = make_mcts(game, store, seed=0)
+        tree.search_batch(6, 8, game.initial_state, 1, uniform_net)
+        counts, _, _ = tree._node_stats(game.initial_state)
+        action = int(np.argmax(counts))
+        child, _ = game.move(game.initial_state, action, 1)
+        expected = tree._reachable(child, 0)
+        before = {s: [np.array(x) for x in tree._node_stats(s)] for s in expected}
+        nodes = len(tree)
+
+        freed = tree.reroot(child, 0)
+        assert freed == nodes - len(expected)
+        assert len(tree) == len(expected)
+        assert tree.is_leaf(game.initial_state)
+        for state_int, stats in before.items():
+            for old, new in zip(stats, tree._node_stats(state_int)):
+                np.testing.assert_array_equal(old, new)
+        # cây vẫn tìm kiếm tiếp được từ gốc mới
+        tree.search_batch(2, 8, child, 0, uniform_net)
+
+    def test_unknown_root_clears(self):
+        game = TicTacToe()
+        tree = make_mcts(game, "array")
+        tree.search_batch(2, 8, game.initial_state, 1, uniform_net)
+        assert tree.reroot(12345, 0) > 0
+        assert len(tree) == 0
+
+
+class TestMemoryBudget:
+    @pytest.mark.parametrize("store", ["dict", "array", "sparse"])
+    @pytest.mark.parametrize("eviction", ["lru", "visits"])
+    def test_stays_under_budget(self, store, eviction):
+        game = TicTacToe()
+        tree = make_mcts(game, store, seed=0, max_nodes=20, eviction=eviction)
+        for _ in range(10):
+            tree.search_minibatch(8, game.initial_state, 1, uniform_net)
+            assert len(tree) <= 20
+            # số liệu của các nút còn lại vẫn nhất quán sau khi loại
+            for state_int in tree._node_states():
+                counts, _, _ = tree._node_stats(state_int)
+                total, _ = tree._selection_stats(state_int)
+                assert total == np.sum(counts)
+        assert tree.evicted_nodes > 0
+        assert not tree.is_leaf(game.initial_state)
+
+    def test_byte_budget(self):
+        game = TicTacToe()
+        tree = make_mcts(game, "array", max_bytes=30 * 1024)
+        assert tree.node_budget() < 30 * 1024 // tree._bytes_per_node()
+        tree.search_batch(20, 8, game.initial_state, 1, uniform_net)
+        assert len(tree) <= tree.node_budget()
+        assert tree.memory_stats()["bytes"] <= 30 * 1024
+
+    def test_invalid_policy(self):
+        with pytest.raises(ValueError):
+            make_mcts(TicTacToe(), "dict", eviction="random")
+
+
+class TestEdgeCache:
+    @pytest.mark.parametrize("store", ["dict", "array", "sparse"])
+    def test_repeated_descent_skips_move(self, store):
+        game = TicTacToe()
+        tree = make_mcts(game, store, seed=0)
+        tree.search_batch(4, 8, game.initial_state, 1, uniform_net)
+        leaf = tree.find_leaf(game.initial_state, 1)
+        with patch.object(game, "move", wraps=game.move) as move:
+            assert tree.find_leaf(game.initial_state, 1)[1:] == leaf[1:]
+            assert move.call_count == 0
+
+    def test_edge_keeps_player_and_terminal_value(self):
+        game = TicTacToe()
+        tree = make_mcts(game, "dict")
+        # người chơi 1 đã có 0 và 1, nước 2 thắng
+        state = game.encode_game_state([[1, 1, 2], [0, 0, 2], [2, 2, 2]])
+        tree._create_node(state, np.full(9, 1 / 9))
+        assert tree._edge_move(state, 2, 1) == (game.move(state, 2, 1)[0], -1.0)
+        assert tree._edge_move(state, 2, 0) == (game.move(state, 2, 0)[0], None)
+
+    def test_draw_asks_game_about_child(self):
+        # trò chơi mà nước đi không lấp ô nào: chỉ hòa khi trạng thái con hết nước đi hợp lệ
+        game = MagicMock()
+        game.action_space = 2
+        game.legal_moves_mask.return_value = np.ones(2, dtype=bool)
+        game.move.return_value = (7, False)
+        game.empty_count.return_value = 2
+        tree = MCTS(game)
+        tree._create_node(1, [0.5, 0.5])
+        assert tree._edge_move(1, 0, 0) == (7, None)
+        game.empty_count.return_value = 0
+        assert tree._edge_move(1, 1, 0) == (7, 0.0)
+        game.empty_count.assert_called_with(7)
+
+    @pytest.mark.parametrize("store", ["dict", "array", "sparse"])
+    def test_play_follows_edges(self, store):
+        game = TicTacToe()
+        tree = make_mcts(game, store, seed=0)
+        tree.search_batch(2, 8, game.initial_state, 1, uniform_net)
+        np.testing.assert_equal(tree.legal_mask(game.initial_state), np.ones(9, dtype=bool))
+        expected = (game.move(game.initial_state, 4, 1)[0], None)
+        assert tree.play(game.initial_state, 4, 1) == expected
+        with patch.object(game, "move", wraps=game.move) as move:
+            assert tree.play(game.initial_state, 4, 1) == expected
+            assert move.call_count == 0
+        # trạng thái chưa có trong cây: hỏi trò chơi
+        state = game.encode_game_state([[1, 1, 2], [0, 0, 2], [2, 2, 2]])
+        assert tree.play(state, 2, 1) == (game.move(state, 2, 1)[0], -1.0)
+        np.testing.assert_equal(tree.legal_mask(state), game.legal_moves_mask(state))
+
+
+class TestPipelinedSearch:
+    @pytest.mark.parametrize("store", ["dict", "array", "sparse"])
+    def test_tree_consistent(self, store):
+        game = TicTacToe()
+        tree = make_mcts(game, store, seed=0, pipeline=True)
+        tree.search_batch(6, 8, game.initial_state, 1, uniform_net)
+        assert not tree._inflight
+        assert tree.nodes_created == len(tree)
+        tree.close()
+        assert tree._executor is None
+        for state in tree._node_states():
+            counts, _, _ = tree._node_stats(state)
+            assert (np.asarray(counts) >= 0).all()
+            assert tree._selection_stats(state)[0] == np.sum(counts)
+
+    def test_inflight_leaves_not_expanded_twice(self):
+        game = TicTacToe()
+        tree = make_mcts(game, "dict", seed=0, pipeline=True)
+        evaluated = []
+
+        def counting_net(batch):
+            evaluated.append(batch.shape[0])
+            return uniform_net(batch)
+
+        tree.search_batch(6, 8, game.initial_state, 1, counting_net)
+        # mỗi lá chỉ được gửi đánh giá một lần, kể cả khi lô sau gặp lại nó
+        assert sum(evaluated) == tree.nodes_created
+        assert 0 < tree._selection_stats(game.initial_state)[0] <= 6 * 8
+
+    @pytest.mark.parametrize("game_cls", [TicTacToe, Caro5x5])
+    def test_budget_keeps_inflight_paths(self, game_cls):
+        game = game_cls()
+
+        def net(batch):
+            return torch.randn(batch.shape[0], game.action_space), torch.rand(batch.shape[0], 1) * 2 - 1
+
+        # với giới hạn nhỏ, việc loại nút giữa hai lô không được xoá các nút còn mang thua ảo
+        # của lô đang chờ, kể cả các lượt duyệt bị bỏ vì trùng lá
+        for seed in range(20):
+            torch.manual_seed(seed)
+            tree = make_mcts(game, "dict", seed=seed, pipeline=True, max_nodes=20, virtual_loss=1)
+            tree.search_batch(40, 32, game.initial_state, 1, net)
+            assert len(tree) <= 20
+            assert not tree._inflight
+            for state in tree._node_states():
+                counts, _, _ = tree._node_stats(state)
+                assert (np.asarray(counts) >= 0).all()
+                assert tree._selection_stats(state)[0] == np.sum(counts)
+
+
+class TestLockstepSearch:
+    @pytest.mark.parametrize("store", ["dict", "array", "sparse"])
+    def test_matches_separate_searches(self, store):
+        game = TicTacToe()
+        other = game.move(game.initial_state, 4, 1)[0]
+        states, players = [game.initial_state, other], [1, 0]
+        separate = [make_mcts(game, store, seed=i) for i in range(2)]
+        for tree, state, player in zip(separate, states, players):
+            tree.search_batch(4, 8, state, player, uniform_net)
+        merged = [make_mcts(game, store, seed=i) for i in range(2)]
+        calls = []
+
+        def counting_net(batch):
+            calls.append(batch.shape[0])
+            return uniform_net(batch)
+
+        evaluated = search_lockstep(merged, 4, 8, states, players, counting_net)
+        assert len(calls) == 4 and sum(calls) == evaluated
+        for a, b, state in zip(separate, merged, states):
+            assert len(a) == len(b)
+            np.testing.assert_array_equal(a._node_stats(state)[0], b._node_stats(state)[0])
+
+    def test_per_tree_counts(self):
+        game = TicTacToe()
+        trees = [make_mcts(game, "dict", seed=i) for i in range(2)]
+        search_lockstep(trees, [4, 1], 8, [game.initial_state] * 2, [1, 1], uniform_net)
+        totals = [tree._selection_stats(game.initial_state)[0] for tree in trees]
+        # cây thứ hai chỉ chạy một lô nhỏ: gốc được mở rộng, chưa có lượt truy cập nào
+        assert totals[0] > 0 and totals[1] == 0
+
+    def test_rejects_shared_tree(self):
+        game = TicTacToe()
+        tree = make_mcts(game, "dict")
+        with pytest.raises(AssertionError):
+            search_lockstep([tree, tree], 1, 1, [game.initial_state] * 2, [0, 0], uniform_net)
+
+
+class TestGumbelSearch:
+    @pytest.mark.parametrize("store", ["dict", "array", "sparse"])
+    def test_budget_and_policy(self, store):
+        game = TicTacToe()
+        tree = make_mcts(game, store, seed=0)
+        action, policy = tree.search_gumbel(16, game.initial_state, 1, uniform_net, top_k=4)
+        counts = np.asarray(tree._node_stats(game.initial_state)[0])
+        # chỉ top_k hành động được thăm, tổng số lượt đúng bằng ngân sách
+        assert counts.sum() == 16 and np.count_nonzero(counts) <= 4
+        assert counts[action] > 0
+        assert policy.shape == (9,) and np.isclose(policy.sum(), 1.0)
+
+    @pytest.mark.parametrize("simulations, top_k", [(32, 4), (64, 8), (8, 16), (3, 16)])
+    def test_spends_whole_budget(self, simulations, top_k):
+        game = Caro5x5()
+
+        def net(batch):
+            return torch.randn(batch.shape[0], game.action_space), torch.rand(batch.shape[0], 1) * 2 - 1
+
+        torch.manual_seed(0)
+        tree = make_mcts(game, "dict", seed=0)
+        tree.search_gumbel(simulations, game.initial_state, 1, net, top_k=top_k)
+        counts = np.asarray(tree._node_stats(game.initial_state)[0])
+        # các lượt duyệt bắt buộc trùng lá được bù, nên số lượt truy cập gốc đúng bằng ngân sách
+        assert counts.sum() == simulations
+        # kể cả khi ngân sách không lớn hơn top_k, các vòng chia đôi vẫn dồn lượt cho hành động tốt
+        assert counts.max() > 1
+
+    def test_finds_winning_move(self):
+        game = TicTacToe()
+        # người chơi 1 thắng ngay bằng nước 2
+        state = game.encode_game_state([[1, 1, 2], [0, 0, 2], [2, 2, 2]])
+        tree = make_mcts(game, "dict", seed=0)
+        action, policy = tree.search_gumbel(8, state, 1, uniform_net, sample=False)
+        assert action == 2
+        assert policy[2] == policy.max()
+        assert policy[[0, 1, 3, 4]].sum() == 0
+
+    def test_starts_search_session(self):
+        game = TicTacToe()
+        tree = make_mcts(game, "dict", seed=0, max_nodes=8)
+        tree.search_batch(2, 8, game.initial_state, 1, uniform_net)
+        state = game.move(game.initial_state, 4, 1)[0]
+        tree.search_gumbel(16, state, 0, uniform_net, top_k=4)
+        # gốc Gumbel thay cho gốc cũ trong phiên tìm kiếm, nên không bị loại khi vượt giới hạn
+        assert tree._root_state == state and tree._root_noise is None
+        assert not tree.is_leaf(state)
+        assert tree._node_stats(state)[0].sum() == 16
+
+
+class TestPolicyValue:
+    def test_unvisited_root_uses_legal_priors(self):
+        game = TicTacToe()
+        state = game.move(game.initial_state, 0, 1)[0]
+        tree = make_mcts(game, "dict", seed=0)
+        tree.search_batch(1, 4, state, 0, uniform_net)
+        probs, _ = tree.get_policy_value(state, tau=1)
+        assert probs[0] == 0 and np.isclose(sum(probs), 1.0)
+        probs, _ = tree.get_policy_value(state, tau=0)
+        assert probs[0] == 0 and max(probs) == 1.0
+
+
+class TestSearchBudget:
+    def test_visit_limit(self):
+        game = TicTacToe()
+        tree = make_mcts(game, "dict", seed=0)
+        searches = tree.search_budget(4, game.initial_state, 1, uniform_net, max_visits=20, early_stop=False)
+        visits = tree._selection_stats(game.initial_state)[0]
+        # lô đầu chỉ mở rộng gốc, mỗi lô sau thêm tối đa 4 lượt truy cập
+        assert 20 <= visits <= 23 and searches >= 6
+
+    def test_time_limit(self):
+        game = TicTacToe()
+        tree = make_mcts(game, "dict", seed=0)
+        with patch("lib.mcts.time.perf_counter", side_effect=[0.0] + [0.1 * i for i in range(1, 100)]):
+            searches = tree.search_budget(4, game.initial_state, 1, uniform_net, time_limit=0.46,
+                                          early_stop=False)
+        assert searches == 3
+
+    def test_early_stop(self):
+        game = TicTacToe()
+        tree = make_mcts(game, "dict", seed=0)
+        tree._create_node(game.initial_state, np.full(9, 1 / 9))
+        for _ in range(10):
+            tree._backup(0.0, [game.initial_state], [4])
+        tree._backup(0.0, [game.initial_state], [0])
+        # cách biệt 9 lượt: với tối đa 8 lượt còn lại không cần tìm kiếm thêm
+        assert tree._root_decided(game.initial_state, 8)
+        assert not tree._root_decided(game.initial_state, 9)
+        assert tree.search_budget(4, game.initial_state, 1, uniform_net, max_visits=8) == 0
+        assert tree.search_budget(4, game.initial_state, 1, uniform_net, max_visits=8, early_stop=False) == 2
+
+    def test_no_noise(self):
+        game = TicTacToe()
+        tree = make_mcts(game, "dict", seed=0)
+        tree.search_budget(4, game.initial_state, 1, uniform_net, max_visits=12, early_stop=False, noise=False)
+        assert tree._root_noise is None
+
+    def test_pipeline_visit_limit(self):
+        game = TicTacToe()
+        tree = make_mcts(game, "dict", seed=0, pipeline=True)
+        searches = tree.search_budget(4, game.initial_state, 1, uniform_net, max_visits=20, early_stop=False)
+        visits = tree._selection_stats(game.initial_state)[0]
+        # các lô chạy qua luồng nền; lô đang đánh giá không được tính vào lượt truy cập thật
+        assert tree._executor is not None and tree._inflight_visits == 0
+        assert 20 <= visits <= 27 and searches >= 6
+        tree.close()
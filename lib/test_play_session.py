@@ -0,0 +1,61 @@
+import time
+
+import torch
+from unittest.mock import patch
+
+from lib.game.tictactoe.tictactoe import TicTacToe
+from lib.model import Net
+from lib.play_session import Session
+
+
+def make_session(tmp_path, ponder):
+    game = TicTacToe()
+    model_file = tmp_path / "model.dat"
+    torch.save(Net(game.obs_shape, game.action_space).state_dict(), model_file)
+    return Session(game, str(model_file), player_moves_first=True, ponder=ponder)
+
+
+class TestPondering:
+    def test_pondered_subtree_carries_over(self, tmp_path):
+        with patch("config.BOT_PONDER_MAX_VISITS", 200), patch("config.BOT_MCTS_BATCH_SIZE", 4):
+            session = make_session(tmp_path, ponder=True)
+            deadline = time.time() + 30
+            while session._root_visits() < 200 and time.time() < deadline:
+                time.sleep(0.01)
+            assert session._root_visits() >= 200
+
+            session.move_player(4)
+            assert session._ponder_thread is None
+            # cây con của nước đi vừa chơi được giữ lại với các lượt truy cập đã tích lũy
+            assert session._root_visits() > 0
+
+            with patch.object(session.mcts_store, "search_batch",
+                              wraps=session.mcts_store.search_batch) as search:
+                session.move_bot()
+            # nước đi của bot chỉ cần bù phần ngân sách còn thiếu
+            assert search.call_args[0][0] < 200
+            assert session._ponder_thread is not None
+            session.close()
+            assert session._ponder_thread is None
+
+    def test_disabled_by_default(self, tmp_path):
+        session = make_session(tmp_path, ponder=False)
+        assert session._ponder_thread is None
+        session.move_player(4)
+        session.move_bot()
+        assert session._ponder_thread is None
+
+    def test_stops_near_memory_budget(self, tmp_path):
+        with patch("config.BOT_PONDER_MAX_VISITS", 10 ** 6), patch("config.BOT_MCTS_BATCH_SIZE", 4):
+            session = make_session(tmp_path, ponder=False)
+            session.mcts_store.max_nodes = 50
+            session.ponder = True
+            session._start_pondering()
+            deadline = time.time() + 30
+            while len(session.mcts_store) < 45 and time.time() < deadline:
+                time.sleep(0.01)
+            time.sleep(0.3)
+            # suy nghĩ trước tạm dừng trước khi cây phải loại nút
+            assert 45 <= len(session.mcts_store) < 50
+            assert session.mcts_store.evicted_nodes == 0
+            session.close()
@@ -0,0 +1,68 @@
+import collections
+
+import numpy as np
+import pytest
+
+from lib.game.tictactoe.tictactoe import TicTacToe
+from lib.mcts import make_mcts
+from lib.model import Net
+from lib.utils import play_game, play_games_lockstep
+
+
+def record_searches(stores):
+    """Ghi lại cờ nhiễu của mỗi phiên tìm kiếm và tau của mỗi lần chọn nước đi"""
+    noises, taus = [], []
+    for store in stores:
+        begin_search, get_policy_value = store.begin_search, store.get_policy_value
+
+        def spy_begin(state_int, noise=True, begin_search=begin_search):
+            noises.append(noise)
+            begin_search(state_int, noise)
+
+        def spy_policy(state_int, tau=1, get_policy_value=get_policy_value):
+            taus.append(tau)
+            return get_policy_value(state_int, tau=tau)
+
+        store.begin_search, store.get_policy_value = spy_begin, spy_policy
+    return noises, taus
+
+
+class TestPlayoutCap:
+    @pytest.mark.parametrize("full_search_fraction", [0.0, 1.0])
+    def test_cheap_moves_are_greedy_without_noise(self, full_search_fraction):
+        game = TicTacToe()
+        net = Net(game.obs_shape, game.action_space)
+        stores = [make_mcts(game, seed=0)]
+        noises, taus = record_searches(stores)
+        buffer = collections.deque()
+        play_game(game, stores[0], buffer, net, net, steps_before_tau_0=100, mcts_searches=2,
+                  mcts_batch_size=4, full_search_fraction=full_search_fraction, cheap_searches=1)
+        full = full_search_fraction >= 1.0
+        assert noises and all(noise == full for noise in noises)
+        assert taus and all(tau == (1 if full else 0) for tau in taus)
+        assert all((probs is None) != full for _, _, probs, _ in buffer)
+
+    def test_lockstep_cheap_moves(self):
+        game = TicTacToe()
+        net = Net(game.obs_shape, game.action_space)
+        stores = [make_mcts(game, seed=i) for i in range(2)]
+        noises, taus = record_searches(stores)
+        play_games_lockstep(game, stores, None, net, episodes=2, steps_before_tau_0=100,
+                            mcts_searches=2, mcts_batch_size=4, full_search_fraction=0.0,
+                            cheap_searches=1)
+        assert noises and not any(noises)
+        assert taus and not any(taus)
+
+    def test_lockstep_episode_lengths(self):
+        game = TicTacToe()
+        net = Net(game.obs_shape, game.action_space)
+        stores = [make_mcts(game, seed=i) for i in range(2)]
+        buffer: collections.deque = collections.deque()
+        lengths: list = []
+        results, steps = play_games_lockstep(game, stores, buffer, net, episodes=3, steps_before_tau_0=100,
+                                             mcts_searches=2, mcts_batch_size=4, episode_lengths=lengths)
+        # mỗi ván ghi liền nhau số nước đi của nó, bản ghi cuối của mỗi ván là nước đầu tiên
+        assert len(lengths) == len(results) == 3 and sum(lengths) == len(buffer)
+        assert sum(lengths) == steps + 3
+        ends = np.cumsum(lengths) - 1
+        assert all(buffer[i][0] == game.initial_state for i in ends)
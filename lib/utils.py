@@ -1,8 +1,10 @@
 import collections
 import numpy as np
-from typing import Union, Tuple, Dict
+from typing import Union, Tuple, Dict, List, Optional
 import torch
+import config as cfg
 from lib import mcts, model
+from lib.evaluator import Evaluator, as_evaluator
 from lib.game.game import BaseGame
 
 
@@ -24,9 +26,12 @@ def update_counts(counts_dict: Dict, key: Union[str, Tuple[str, str]], counts: T
 
 
 def play_game(game: BaseGame, mcts_stores, replay_buffer: Union[collections.deque, None],
-              net1: model.Net, net2: model.Net,
+              net1: Union[model.Net, Evaluator], net2: Union[model.Net, Evaluator],
               steps_before_tau_0: int, mcts_searches: int, mcts_batch_size: int,
-              net1_plays_first: bool = None, device: str = "cpu"):
+              net1_plays_first: bool = None, device: str = "cpu",
+              reroot: bool = cfg.MCTS_REROOT, gumbel_simulations: int = cfg.GUMBEL_SIMULATIONS,
+              full_search_fraction: float = 1.0, cheap_searches: int = cfg.PLAYOUT_CHEAP_SEARCHES,
+              time_limit: float = 0.0, max_visits: int = 0):
     """
     Chơi một trò chơi duy nhất, ghi nhớ các chuyển tiếp vào bộ đệm phát lại
     :param net1: player1
@@ -35,14 +40,30 @@ def play_game(game: BaseGame, mcts_stores, replay_buffer: Union[collections.dequ
     Đối số:
         game ([type]): [description]
         mcts_stores ([type]): có thể là None hoặc một MCTS hoặc hai MCTS cho từng net
-        replay_buffer (deque): xếp hàng với (trạng thái, xác suất, giá trị), nếu None, không có gì được lưu trữ
-        net1 (model.Net): [description]
-        net2 (model.Net): [description]
+        replay_buffer (deque): xếp hàng với (trạng thái, người chơi, xác suất, giá trị), nếu None, không có gì
+        được lưu trữ; xác suất là None với các nước đi chỉ được tìm kiếm rẻ
+        net1 (model.Net hoặc Evaluator): [description]. Mạng nơ-ron được bọc trong Evaluator
+        net2 (model.Net hoặc Evaluator): [description]
         steps_before_tau_0 ([type]): [description]
         mcts_searches (int): [description]
         mcts_batch_size (int): [description]
         net1_plays_first (bool, tùy chọn): [description]. Mặc định là None.
         device (str, tùy chọn): [description]. Mặc định là "cpu".
+        reroot (bool, tùy chọn): Sau mỗi nước đi, chuyển gốc các cây MCTS sang trạng thái mới
+        và giải phóng các nút không còn đi tới được. Mặc định là cfg.MCTS_REROOT.
+        gumbel_simulations (int, tùy chọn): Nếu > 0, mỗi nước đi dùng tìm kiếm Gumbel
+        (MCTS.search_gumbel) với số lượt duyệt này thay cho mcts_searches x mcts_batch_size;
+        chính sách cải thiện được lưu làm mục tiêu huấn luyện. Mặc định là cfg.GUMBEL_SIMULATIONS.
+        full_search_fraction (float, tùy chọn): Tỷ lệ nước đi được tìm kiếm đầy đủ (mcts_searches lô nhỏ);
+        các nước còn lại chỉ tìm kiếm cheap_searches lô nhỏ không có nhiễu Dirichlet, chơi nước tốt
+        nhất (tau = 0) và được lưu với xác suất None (không có mục tiêu chính sách, chỉ huấn luyện
+        giá trị). Chỉ áp dụng cho tìm kiếm PUCT. Mặc định là 1.0.
+        cheap_searches (int, tùy chọn): Số lô nhỏ của một nước đi rẻ. Mặc định là cfg.PLAYOUT_CHEAP_SEARCHES.
+        time_limit (float, tùy chọn): Nếu > 0, thời gian tìm kiếm tối đa mỗi nước đi (giây) thay cho
+        mcts_searches lô nhỏ (MCTS.search_budget); nước đi rẻ dừng thêm ở cheap_searches lô nhỏ.
+        Mặc định là 0.0.
+        max_visits (int, tùy chọn): Nếu > 0, số lượt truy cập gốc tối đa mỗi nước đi thay cho
+        mcts_searches lô nhỏ; dùng cùng time_limit thì giới hạn nào đến trước. Mặc định là 0.
 
     Trả về:
         [int]: giá trị cho trò chơi liên quan đến net_1 (+1 nếu p1 thắng, -1 nếu thua, 0 nếu hòa)
@@ -50,19 +71,26 @@ def play_game(game: BaseGame, mcts_stores, replay_buffer: Union[collections.dequ
     """
     assert isinstance(replay_buffer, (collections.deque, type(None)))
     assert isinstance(mcts_stores, (mcts.MCTS, type(None), list))
-    assert isinstance(net1, model.Net)
-    assert isinstance(net2, model.Net)
+    assert isinstance(net1, (model.Net, Evaluator))
+    assert isinstance(net2, (model.Net, Evaluator))
     assert isinstance(steps_before_tau_0, int) and steps_before_tau_0 >= 0
     assert isinstance(mcts_searches, int) and mcts_searches > 0
     assert isinstance(mcts_batch_size, int) and mcts_batch_size > 0
 
+    # các cây do play_game tự tạo được đóng khi ván kết thúc
+    own_stores = mcts_stores is None
     if mcts_stores is None:
-        mcts_stores = [mcts.MCTS(game), mcts.MCTS(game)]
+        mcts_stores = [mcts.make_mcts(game), mcts.make_mcts(game)]
     elif isinstance(mcts_stores, mcts.MCTS):
         mcts_stores = [mcts_stores, mcts_stores]
+    # khi tự chơi cả hai người chơi dùng chung một cây, chỉ cần đổi gốc một lần
+    reroot_stores = mcts_stores[:1] if mcts_stores[0] is mcts_stores[1] else mcts_stores
 
     state = game.initial_state
-    nets = [net1, net2]
+    # tự chơi dùng cùng một mạng cho cả hai bên, chỉ cần một bộ đánh giá
+    evaluator1 = as_evaluator(net1, game, device)
+    evaluator2 = evaluator1 if net2 is net1 else as_evaluator(net2, game, device)
+    nets = [evaluator1, evaluator2]
     if net1_plays_first is None:
         cur_player = np.random.choice(2)
     else:
@@ -75,23 +103,47 @@ def play_game(game: BaseGame, mcts_stores, replay_buffer: Union[collections.dequ
     net1_result = None
 
     while result is None:
-        mcts_stores[cur_player].search_batch(
-            mcts_searches, mcts_batch_size, state,
-            cur_player, nets[cur_player], device=device)
-        probs, _ = mcts_stores[cur_player].get_policy_value(
-            state, tau=tau)
+        if gumbel_simulations > 0:
+            # nhiễu Gumbel thay cho lấy mẫu theo tau, tắt khi chơi tất định (tau = 0)
+            action, probs = mcts_stores[cur_player].search_gumbel(
+                gumbel_simulations, state, cur_player, nets[cur_player], sample=tau > 0)
+            probs = probs.tolist()
+        else:
+            full_search = full_search_fraction >= 1.0 or np.random.random() < full_search_fraction
+            # nước đi rẻ chỉ để tiếp tục ván: không thêm nhiễu khám phá tại gốc
+            if time_limit > 0 or max_visits > 0:
+                # nước đi rẻ vẫn chịu ngân sách, nhưng không quá cheap_searches lô nhỏ
+                mcts_stores[cur_player].search_budget(
+                    mcts_batch_size, state, cur_player, nets[cur_player],
+                    time_limit=time_limit or None, max_visits=max_visits or None,
+                    max_searches=None if full_search else cheap_searches, noise=full_search)
+            else:
+                mcts_stores[cur_player].search_batch(
+                    mcts_searches if full_search else cheap_searches, mcts_batch_size, state,
+                    cur_player, nets[cur_player], device=device, noise=full_search)
+            # và chơi nước tốt nhất (tau = 0) để không làm hỏng mục tiêu giá trị của ván
+            probs, _ = mcts_stores[cur_player].get_policy_value(
+                state, tau=tau if full_search else 0)
+            action = np.random.choice(game.action_space, p=probs)
+            if not full_search:
+                # tìm kiếm rẻ chỉ để tiếp tục ván, không dùng làm mục tiêu chính sách
+                probs = None
         game_history.append((state, cur_player, probs))
-        action = np.random.choice(game.action_space, p=probs)
-        if action not in game.possible_moves(state):
+        # mặt nạ hợp lệ và kết quả thắng/hòa được đọc từ nút gốc và cạnh của cây vừa tìm kiếm
+        tree = mcts_stores[cur_player]
+        if not tree.legal_mask(state)[action]:
             print("Đã chọn hành động không thể thực hiện được")
-        state, won = game.move(state, action, cur_player)
-        if won:
+        state, end_value = tree.play(state, action, cur_player)
+        if reroot:
+            for store in reroot_stores:
+                store.reroot(state, 1 - cur_player)
+        if end_value == -1.0:
             result = 1
             net1_result = 1 if cur_player == 0 else -1
             break
         cur_player = 1-cur_player
         # check the draw case
-        if len(game.possible_moves(state)) == 0:
+        if end_value == 0.0:
             result = 0
             net1_result = 0
             break
@@ -106,9 +158,107 @@ def play_game(game: BaseGame, mcts_stores, replay_buffer: Union[collections.dequ
             )
             result = -result
 
+    if own_stores:
+        for store in mcts_stores:
+            store.close()
     return net1_result, step
 
 
+def play_games_lockstep(game: BaseGame, mcts_stores: List[mcts.MCTS],
+                        replay_buffer: Union[collections.deque, None],
+                        net: Union[model.Net, Evaluator], episodes: int,
+                        steps_before_tau_0: int, mcts_searches: int, mcts_batch_size: int,
+                        device: str = "cpu", reroot: bool = cfg.MCTS_REROOT,
+                        full_search_fraction: float = 1.0,
+                        cheap_searches: int = cfg.PLAYOUT_CHEAP_SEARCHES,
+                        episode_lengths: Optional[List[int]] = None) -> Tuple[List[int], int]:
+    """
+    Tự chơi nhiều ván cùng lúc theo nhịp: mỗi cây trong mcts_stores giữ một ván, ở mỗi nước đi
+    mọi ván tìm kiếm cùng nhau (mcts.search_lockstep) nên lá của tất cả các cây được đánh giá
+    trong một lần gọi mạng. Ván nào kết thúc được thay bằng ván mới cho tới khi đủ episodes ván.
+    Mỗi ván được chơi và ghi vào bộ đệm phát lại giống như play_game với net1 = net2 = net
+    (chỉ với tìm kiếm PUCT, cfg.GUMBEL_SIMULATIONS không áp dụng ở đây).
+
+    Đối số:
+        game (BaseGame): Trò chơi
+        mcts_stores (List[MCTS]): Các cây, mỗi cây dành cho một ván đang chơi; số cây là số ván song song
+        replay_buffer (deque): Hàng đợi (trạng thái, người chơi, xác suất, giá trị), nếu None, không có gì được lưu trữ
+        net (model.Net hoặc Evaluator): Mạng nơ-ron chơi cho cả hai bên
+        episodes (int): Tổng số ván cần chơi
+        steps_before_tau_0 (int): Số nước đi đầu mỗi ván chọn hành động theo phân phối lượt truy cập
+        mcts_searches (int): Số lô nhỏ mỗi nước đi
+        mcts_batch_size (int): Số lượt duyệt mỗi lô nhỏ của mỗi cây
+        device (str, tùy chọn): Thiết bị PyTorch. Mặc định là "cpu".
+        reroot (bool, tùy chọn): Sau mỗi nước đi, chuyển gốc cây sang trạng thái mới.
+        Mặc định là cfg.MCTS_REROOT.
+        full_search_fraction (float, tùy chọn): Tỷ lệ nước đi được tìm kiếm đầy đủ, như play_game.
+        Mặc định là 1.0.
+        cheap_searches (int, tùy chọn): Số lô nhỏ của một nước đi rẻ. Mặc định là cfg.PLAYOUT_CHEAP_SEARCHES.
+        episode_lengths (List[int], tùy chọn): Nếu có, số bản ghi mỗi ván đã ghi liền nhau vào
+        replay_buffer được thêm vào đây, theo thứ tự kết thúc (ranh giới giữa các ván). Mặc định là None.
+
+    Trả về:
+        List[int]: kết quả mỗi ván theo người chơi 0 (+1 thắng, -1 thua, 0 hòa), theo thứ tự kết thúc
+        int: tổng số bước của các ván (tính như play_game)
+    """
+    assert isinstance(replay_buffer, (collections.deque, type(None)))
+    assert isinstance(steps_before_tau_0, int) and steps_before_tau_0 >= 0
+    assert isinstance(mcts_searches, int) and mcts_searches > 0
+    assert isinstance(mcts_batch_size, int) and mcts_batch_size > 0
+
+    evaluator = as_evaluator(net, game, device)
+
+    def new_game(store: mcts.MCTS) -> Dict:
+        store.clear()
+        return {"store": store, "state": game.initial_state, "player": np.random.choice(2),
+                "step": 0, "history": []}
+
+    active = [new_game(store) for store in mcts_stores[:episodes]]
+    started = len(active)
+    results = []
+    total_steps = 0
+    while active:
+        full = [full_search_fraction >= 1.0 or np.random.random() < full_search_fraction
+                for _ in active]
+        mcts.search_lockstep([g["store"] for g in active],
+                             [mcts_searches if f else cheap_searches for f in full], mcts_batch_size,
+                             [g["state"] for g in active], [g["player"] for g in active], evaluator,
+                             noise=full)
+        playing = []
+        for g, full_search in zip(active, full):
+            store, state, player = g["store"], g["state"], g["player"]
+            # nước đi rẻ chơi tất định, như play_game
+            tau = 1 if full_search and g["step"] < steps_before_tau_0 else 0
+            probs, _ = store.get_policy_value(state, tau=tau)
+            action = np.random.choice(game.action_space, p=probs)
+            g["history"].append((state, player, probs if full_search else None))
+            state, end_value = store.play(state, action, player)
+            if reroot:
+                store.reroot(state, 1 - player)
+            g["state"] = state
+            if end_value is None:
+                g["player"] = 1 - player
+                g["step"] += 1
+                playing.append(g)
+                continue
+
+            # ván kết thúc: người vừa đi thắng hoặc hòa
+            result = 1 if end_value == -1.0 else 0
+            results.append(result if player == 0 else -result)
+            total_steps += g["step"]
+            if replay_buffer is not None:
+                for hist_state, hist_player, hist_probs in reversed(g["history"]):
+                    replay_buffer.append((hist_state, hist_player, hist_probs, result))
+                    result = -result
+                if episode_lengths is not None:
+                    episode_lengths.append(len(g["history"]))
+            if started < episodes:
+                playing.append(new_game(store))
+                started += 1
+        active = playing
+    return results, total_steps
+
+
 class TBMeanTracker:
     """
     Trình theo dõi giá trị TensorBoard: cho phép nhóm một lượng cố định các giá trị lịch sử và ghi giá trị trung bình của chúng vào TB
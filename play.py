@@ -2,10 +2,8 @@ import sys
 import time
 import argparse
 from typing import Dict, Tuple
-import torch
 
 import config as cfg
-from lib import model, utils
 from lib.game import game_provider
 
 
@@ -25,13 +23,18 @@ if __name__ == "__main__":
 
     game = game_provider.get_game(args)
 
+    # chỉ nhập torch sau khi đối số hợp lệ
+    import torch
+    from lib import model, utils
+    from lib.evaluator import Evaluator
+
     nets = []
     for fname in args.models:
         net = model.Net(game.obs_shape, game.action_space)
         net.load_state_dict(torch.load(
             fname, map_location=lambda storage, loc: storage))
         net = net.to(device)
-        nets.append((fname, net))
+        nets.append((fname, Evaluator(net, game, device, batch_size=cfg.PLAY_MCTS_BATCH_SIZE)))
 
     total_agent: Dict[str, WinLoseDraw] = {}
     total_pairs: Dict[Tuple[str, str], WinLoseDraw] = {}
@@ -48,7 +51,8 @@ if __name__ == "__main__":
                                        steps_before_tau_0=0,
                                        mcts_searches=cfg.PLAY_MCTS_SEARCHES,
                                        mcts_batch_size=cfg.PLAY_MCTS_BATCH_SIZE,
-                                       device=device)
+                                       device=device, time_limit=cfg.PLAY_TIME_LIMIT,
+                                       max_visits=cfg.PLAY_MAX_VISITS)
                 if r > 0.5:
                     wins += 1
                 elif r < -0.5:
@@ -5,54 +5,81 @@ import time
 import random
 import argparse
 import collections
-from typing import Union
-
-import torch
-import torch.optim as optim
-import torch.nn.functional as F
-from tensorboardX import SummaryWriter
+from typing import TYPE_CHECKING, List, Union
 
 import config as cfg
-from lib.model import Net, NetWrapper
-from lib.mcts import MCTS
-from lib.utils import play_game, TBMeanTracker
 from lib.game.game import BaseGame
 from lib.game import game_provider
 
-Optimizer = torch.optim.Optimizer
+# torch và các mô-đun phụ thuộc vào nó chỉ được nhập sau khi phân tích đối số,
+# để --help và lỗi đối số trả về ngay
+if TYPE_CHECKING:
+    from torch.optim import Optimizer
+    from lib.model import Net
+    from lib.mcts import MCTS
+    from lib.actors import SelfPlayActors
 
 
-def self_play(game: BaseGame, mcts_store: MCTS, replay_buffer: Union[collections.deque, None],
-              model: Net, tb_tracker, device: str) -> None:
+def self_play(game: BaseGame, mcts_stores: List["MCTS"], replay_buffer: Union[collections.deque, None],
+              model: "Net", tb_tracker, device: str) -> None:
     """
     Để mô hình (tốt nhất hiện tại) chơi với chính nó để tạo dữ liệu đào tạo.
-    Lưu trữ các nước đi vào bộ đệm phát lại.
+    Lưu trữ các nước đi vào bộ đệm phát lại. Với nhiều cây, các ván được chơi song song
+    theo nhịp và lá của mọi ván được gộp vào một lô mạng (play_games_lockstep).
 
     Đối số:
         game (Game): Trò chơi mà mạng đang được đào tạo để chơi
-        mcts_store (MCTS): Cây Monte Carlo về trạng thái và kết quả của các trò chơi đã chơi đầy đủ
+        mcts_stores (List[MCTS]): Các cây Monte Carlo, mỗi cây cho một ván chơi song song
         replay_buffer (deque): Hàng đợi các nước đi và giá trị dự đoán được thực hiện bởi
         current best net
         model (Net): Mạng nơ-ron được đào tạo để chơi trò chơi
         tb_tracker (Bộ theo dõi bảng Tensorflow) để thu thập số liệu thống kê
         device (str): cpu hoặc gpu cho PyTorch
     """
+    from lib.utils import play_game, play_games_lockstep
+    from lib.evaluator import shared_cache
+
+    eval_cache = shared_cache()
+    if eval_cache is not None:
+        eval_cache.reset_stats()
     t = time.time()
-    prev_nodes = len(mcts_store)
+    prev_nodes = sum(store.nodes_created for store in mcts_stores)
+    prev_evicted = sum(store.evicted_nodes for store in mcts_stores)
+    for store in mcts_stores:
+        store.reset_batch_stats()
     game_steps = 0
-    for _ in range(cfg.PLAY_EPISODES):
-        _, steps = play_game(game, mcts_store, replay_buffer,
-                             best_net.target_model, best_net.target_model,
-                             steps_before_tau_0=cfg.STEPS_BEFORE_TAU_0,
-                             mcts_searches=cfg.MCTS_SEARCHES,
-                             mcts_batch_size=cfg.MCTS_BATCH_SIZE, device=device)
-        game_steps += steps
-    game_nodes = len(mcts_store) - prev_nodes
+    if len(mcts_stores) > 1:
+        _, game_steps = play_games_lockstep(game, mcts_stores, replay_buffer, model,
+                                            episodes=cfg.PLAY_EPISODES,
+                                            steps_before_tau_0=cfg.STEPS_BEFORE_TAU_0,
+                                            mcts_searches=cfg.MCTS_SEARCHES,
+                                            mcts_batch_size=cfg.MCTS_BATCH_SIZE, device=device,
+                                            full_search_fraction=cfg.PLAYOUT_FULL_FRACTION)
+    else:
+        for _ in range(cfg.PLAY_EPISODES):
+            _, steps = play_game(game, mcts_stores[0], replay_buffer,
+                                 model, model,
+                                 steps_before_tau_0=cfg.STEPS_BEFORE_TAU_0,
+                                 mcts_searches=cfg.MCTS_SEARCHES,
+                                 mcts_batch_size=cfg.MCTS_BATCH_SIZE, device=device,
+                                 full_search_fraction=cfg.PLAYOUT_FULL_FRACTION,
+                                 time_limit=cfg.MCTS_TIME_LIMIT, max_visits=cfg.MCTS_MAX_VISITS)
+            game_steps += steps
+    game_nodes = sum(store.nodes_created for store in mcts_stores) - prev_nodes
     dt = time.time() - t
     speed_steps = game_steps / dt
     speed_nodes = game_nodes / dt
+    batch_slots = sum(store.batch_slots for store in mcts_stores)
+    batch_leaves = sum(store.batch_leaves for store in mcts_stores)
     tb_tracker.track("speed step", speed_steps, step_idx)
     tb_tracker.track("speed node", speed_nodes, step_idx)
+    tb_tracker.track("batch fill", batch_leaves / batch_slots if batch_slots else 0.0, step_idx)
+    tb_tracker.track("tree nodes", sum(len(store) for store in mcts_stores), step_idx)
+    tb_tracker.track("tree bytes", sum(store.memory_stats()["bytes"] for store in mcts_stores), step_idx)
+    tb_tracker.track("evicted nodes", sum(store.evicted_nodes for store in mcts_stores) - prev_evicted,
+                     step_idx)
+    if eval_cache is not None:
+        tb_tracker.track("eval cache hit", eval_cache.hit_rate(), step_idx)
     sys.stdout.flush()
     buffer_len = len(replay_buffer) if replay_buffer else 0
     print("Step %d, game steps %3d, node %4d, step/s %5.2f, node/s %6.2f, best idx %d, replay %d" % (
@@ -60,7 +87,28 @@ def self_play(game: BaseGame, mcts_store: MCTS, replay_buffer: Union[collections
         end='\r')
 
 
-def train_neural_net(game: BaseGame, replay_buffer: collections.deque, optimizer: Optimizer,
+def actor_self_play(actors: "SelfPlayActors", replay_buffer: collections.deque, tb_tracker) -> None:
+    """
+    Nhận cfg.PLAY_EPISODES ván từ các tiến trình tự chơi và lưu vào bộ đệm phát lại
+
+    Đối số:
+        actors (SelfPlayActors): Các tiến trình tự chơi đang chạy
+        replay_buffer (deque): Hàng đợi các nước đi và giá trị dự đoán
+        tb_tracker (Bộ theo dõi bảng Tensorflow) để thu thập số liệu thống kê
+    """
+    t = time.time()
+    games, game_steps, lag = actors.collect(replay_buffer, cfg.PLAY_EPISODES)
+    dt = time.time() - t
+    speed_steps = game_steps / dt
+    tb_tracker.track("speed step", speed_steps, step_idx)
+    tb_tracker.track("actor lag", lag, step_idx)
+    sys.stdout.flush()
+    print("Step %d, games %d, game steps %3d, step/s %5.2f, actor lag %.2f, best idx %d, replay %d" % (
+        step_idx, games, game_steps, speed_steps, lag, best_idx, len(replay_buffer)),
+        end='\r')
+
+
+def train_neural_net(game: BaseGame, replay_buffer: collections.deque, optimizer: "Optimizer",
                      tb_tracker, device: str) -> None:
     """
     Cung cấp một bộ đệm phát lại đủ lớn, huấn luyện mạng nơ-ron
@@ -76,8 +124,13 @@ def train_neural_net(game: BaseGame, replay_buffer: collections.deque, optimizer
         Board
         device (str): cpu hoặc gpu (đối với PyTorch)
     """
+    import torch
+    import torch.nn.functional as F
+
     TRAIN_ROUNDS = cfg.TRAIN_ROUNDS
     sum_loss = 0.0
+    # bộ đánh giá chuyển mạng sang chế độ eval khi đánh giá, bật lại chế độ train
+    net.train()
     sum_value_loss = 0.0
     sum_policy_loss = 0.0
 
@@ -92,7 +145,12 @@ def train_neural_net(game: BaseGame, replay_buffer: collections.deque, optimizer
         states_tensor = torch.tensor(states_v).to(device)
 
         optimizer.zero_grad()
-        probs_v = torch.FloatTensor(batch_probs).to(device)
+        # nước đi chỉ được tìm kiếm rẻ (xác suất None) không có mục tiêu chính sách
+        has_policy = [probs is not None for probs in batch_probs]
+        zero_probs = [0.0] * game.action_space
+        probs_v = torch.FloatTensor([zero_probs if probs is None else probs
+                                     for probs in batch_probs]).to(device)
+        policy_mask_v = torch.FloatTensor(has_policy).to(device)
         values_v = torch.FloatTensor(batch_values).to(device)
         out_logits_v, out_values_v = net(states_tensor)
 
@@ -100,9 +158,9 @@ def train_neural_net(game: BaseGame, replay_buffer: collections.deque, optimizer
         loss_value_v = F.mse_loss(out_values_v.squeeze(-1), values_v)
 
         # tính toán entropy chéo giữa các xác suất chính sách của mô hình và xác suất
-        # lấy mẫu từ MCTS
+        # lấy mẫu từ MCTS, chỉ trên các nước đi có mục tiêu chính sách
         loss_policy_v = -F.log_softmax(out_logits_v, dim=1) * probs_v
-        loss_policy_v = loss_policy_v.sum(dim=1).mean()
+        loss_policy_v = (loss_policy_v.sum(dim=1) * policy_mask_v).sum() / policy_mask_v.sum().clamp(min=1.0)
 
         loss_v = loss_policy_v + loss_value_v
         # lan truyền ngược & giảm dần độ dốc
@@ -112,6 +170,9 @@ def train_neural_net(game: BaseGame, replay_buffer: collections.deque, optimizer
         sum_value_loss += loss_value_v.item()
         sum_policy_loss += loss_policy_v.item()
 
+    # trọng số đã thay đổi, các đánh giá cũ của mạng này không còn đúng
+    net.bump_version()
+
     tb_tracker.track("total loss", sum_loss / TRAIN_ROUNDS, step_idx)
     tb_tracker.track("value loss", sum_value_loss /
                      TRAIN_ROUNDS, step_idx)
@@ -119,7 +180,7 @@ def train_neural_net(game: BaseGame, replay_buffer: collections.deque, optimizer
                      TRAIN_ROUNDS, step_idx)
 
 
-def evaluate(game: BaseGame, challenger: Net, champion: Net,
+def evaluate(game: BaseGame, challenger: "Net", champion: "Net",
              rounds: int, device: str = "cpu") -> float:
     """
     Đánh giá hiệu suất của 2 mạng nơ-ron được huấn luyện để chơi trò chơi bằng cách cho chúng
@@ -135,8 +196,11 @@ def evaluate(game: BaseGame, challenger: Net, champion: Net,
     Trả về:
         [float]: Tỷ lệ chiến thắng của challenger
     """
+    from lib.mcts import make_mcts
+    from lib.utils import play_game
+
     challenger_win, champion_win, draw = 0, 0, 0
-    mcts_stores = [MCTS(game), MCTS(game)]
+    mcts_stores = [make_mcts(game), make_mcts(game)]
 
     for r_idx in range(rounds):
         r, _ = play_game(game=game, mcts_stores=mcts_stores, replay_buffer=None,
@@ -149,6 +213,8 @@ def evaluate(game: BaseGame, challenger: Net, champion: Net,
             challenger_win += 1
         elif r == 0:
             draw += 1
+    for store in mcts_stores:
+        store.close()
     return challenger_win / (challenger_win + champion_win + draw)
 
 
@@ -168,6 +234,15 @@ def parse_args():
 
 if __name__ == "__main__":
     args = parse_args()
+    game = game_provider.get_game(args)
+
+    import torch
+    import torch.optim as optim
+    from tensorboardX import SummaryWriter
+    from lib.model import Net, NetWrapper
+    from lib.mcts import make_mcts
+    from lib.actors import SelfPlayActors
+    from lib.utils import TBMeanTracker
 
     device = "cuda" if args.cuda else "cpu"
 
@@ -175,7 +250,6 @@ if __name__ == "__main__":
     os.makedirs(saves_path, exist_ok=True)
     writer = SummaryWriter(comment="-" + args.name)
 
-    game = game_provider.get_game(args)
     model_shape = game.obs_shape
 
     net = Net(input_shape=model_shape,
@@ -186,16 +260,25 @@ if __name__ == "__main__":
     optimizer = optim.SGD(net.parameters(), lr=cfg.LEARNING_RATE, momentum=0.9)
 
     replay_buffer = collections.deque(maxlen=cfg.REPLAY_BUFFER)
-    mcts_store = MCTS(game)
+    # mỗi ván tự chơi song song có một cây riêng
+    mcts_stores = [make_mcts(game) for _ in range(max(1, cfg.PLAY_PARALLEL_GAMES))]
     step_idx = 0
     best_idx = 0
+    # các tiến trình tự chơi là tiến trình nền (daemon), tự dừng khi tiến trình huấn luyện thoát
+    actors = None
+    if cfg.SELF_PLAY_WORKERS > 0:
+        actors = SelfPlayActors(game, best_net.target_model)
+        actors.start()
 
     with TBMeanTracker(writer, batch_size=10) as tb_tracker:
         # Về mặt lý thuyết, vòng lặp đào tạo có thể tiếp tục mãi mãi
         # để tạo ra các tác nhân tốt hơn và tốt hơn 
         while True:
-            self_play(game, mcts_store, replay_buffer,
-                      best_net.target_model, tb_tracker, device)
+            if actors is not None:
+                actor_self_play(actors, replay_buffer, tb_tracker)
+            else:
+                self_play(game, mcts_stores, replay_buffer,
+                          best_net.target_model, tb_tracker, device)
             step_idx += 1
 
             if len(replay_buffer) < cfg.MIN_REPLAY_TO_TRAIN:
@@ -218,4 +301,7 @@ if __name__ == "__main__":
                     file_name = os.path.join(
                         saves_path, "best_%03d_%05d.dat" % (best_idx, step_idx))
                     torch.save(net.state_dict(), file_name)
-                    mcts_store.clear()
+                    for store in mcts_stores:
+                        store.clear()
+                    if actors is not None:
+                        actors.publish(best_net.target_model)